@@ -0,0 +1,103 @@
+import traceback
+from botocore.exceptions import ClientError
+from runtime import tabla_reportes, tabla_contadores, parsear_body, query_params, path_params, respuesta, error
+from metricas import instrumentar
+from tokens import autorizar
+from reportes import ESTADOS, ahora_ms
+from contadores import deltas_cambio, aplicar
+from triage import abierto, orden_urgencia
+
+def completar_orden(tenant_id, uuid, anterior):
+    # Reportes anteriores a la cola de triage: sin orden_urgencia no entran al índice.
+    # Se completa una sola vez; si el clasificador lo escribió antes, gana el suyo.
+    orden = orden_urgencia(anterior.get("nivel_urgencia"), anterior.get("creado_en") or ahora_ms())
+    try:
+        tabla_reportes().update_item(
+            Key={"tenant_id": tenant_id, "uuid": uuid},
+            UpdateExpression="SET orden_urgencia = :o",
+            ConditionExpression="attribute_exists(#u) AND attribute_not_exists(orden_urgencia)",
+            ExpressionAttributeNames={"#u": "uuid"},
+            ExpressionAttributeValues={":o": orden}
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            print(f"⚠️ No se pudo completar orden_urgencia de {uuid}: {str(e)}")
+    return orden
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event, "admin")
+        if denegado:
+            return denegado
+
+        body = parsear_body(event)
+        tenant_id = body.get("tenant_id") or query_params(event).get("tenant_id") or "utec"
+        uuid = path_params(event).get("uuid")
+        estado = body.get("estado")
+
+        if not uuid:
+            return error(400, "Debe enviar uuid en la ruta /reporte/{uuid}/estado")
+        if estado not in ESTADOS:
+            return error(400, f"estado debe ser uno de {list(ESTADOS)}")
+        version = None
+        if body.get("version") is not None:
+            # Vía str: rechaza también 1.5 y true, que int() aceptaría
+            try:
+                version = int(str(body["version"]))
+            except ValueError:
+                return error(400, "version debe ser un número entero")
+
+        # Update condicional: el reporte debe existir y, si el cliente envía version,
+        # no haber cambiado desde que lo leyó
+        condicion = "attribute_exists(#u)"
+        valores = {":e": estado, ":t": ahora_ms(), ":uno": 1}
+        # Cola de triage: un reporte abierto está en ella (cola = tenant), uno resuelto sale
+        if abierto(estado):
+            expresion = "SET estado = :e, actualizado_en = :t, cola = :cola ADD version :uno"
+            valores[":cola"] = tenant_id
+        else:
+            expresion = "SET estado = :e, actualizado_en = :t REMOVE cola ADD version :uno"
+        if version is not None:
+            condicion += " AND version = :v"
+            valores[":v"] = version
+
+        try:
+            response = tabla_reportes().update_item(
+                Key={"tenant_id": tenant_id, "uuid": uuid},
+                UpdateExpression=expresion,
+                ConditionExpression=condicion,
+                ExpressionAttributeNames={"#u": "uuid"},
+                ExpressionAttributeValues=valores,
+                ReturnValues="ALL_OLD"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            if ":v" in valores:
+                return error(409, "El reporte no existe o cambió desde la versión enviada")
+            return error(404, "El reporte no existe")
+
+        anterior = response["Attributes"]
+        reporte = dict(anterior, estado=estado, actualizado_en=valores[":t"],
+                       version=int(anterior.get("version", 0)) + 1)
+        reporte.pop("cola", None)
+        if abierto(estado):
+            reporte["cola"] = tenant_id
+            if "orden_urgencia" not in anterior:
+                reporte["orden_urgencia"] = completar_orden(tenant_id, uuid, anterior)
+        print(f"✅ Estado actualizado: {uuid} {anterior.get('estado')} -> {estado}")
+
+        # Mover el reporte de combinación en los contadores del tenant
+        try:
+            aplicar(tabla_contadores(), deltas_cambio(anterior, reporte))
+        except Exception as e:
+            print(f"⚠️ No se pudieron actualizar los contadores: {str(e)}")
+
+        return respuesta(200, {"mensaje": "Estado actualizado", "uuid": uuid, "reporte": reporte})
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        traceback.print_exc()
+
+        return error(500, str(e))
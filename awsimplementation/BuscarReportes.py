@@ -0,0 +1,100 @@
+import time
+import traceback
+from runtime import tabla_reportes, tabla_eliminados, tabla_contadores, query_params, respuesta, error
+from metricas import instrumentar, contar, fase, propiedad
+from tokens import autorizar
+from paginacion import codificar_cursor, decodificar_cursor, parsear_limit
+from contadores import leer_cambios
+from lotes import leer_en_lotes
+from busqueda import SOLAPE_MS, cargar, sincronizar, guardar_si_corresponde
+
+MAX_RESULTADOS = 100
+
+# Índice por tenant que vive mientras el contenedor siga "warm":
+# tenant_id -> (indice, contador de cambios visto, momento del último cambio visto)
+_indices = {}
+
+def obtener_indice(tenant_id):
+    cambios = leer_cambios(tabla_contadores(), tenant_id)
+    ahora = time.monotonic()
+    entrada = _indices.get(tenant_id)
+
+    if entrada is None:
+        contar("indice_cargado")
+        indice = cargar(tabla_reportes(), tabla_eliminados(), tenant_id)
+        ultimo_cambio = ahora
+    else:
+        indice, visto, ultimo_cambio = entrada
+        if cambios != visto:
+            ultimo_cambio = ahora
+        # Hubo escrituras, o las hubo hace poco y el GSI todavía puede estar atrasado
+        if cambios != visto or ahora - ultimo_cambio < SOLAPE_MS / 1000:
+            contar("indice_sincronizado")
+            contar("cambios_aplicados", sincronizar(indice, tabla_reportes(), tabla_eliminados(), tenant_id))
+
+    indice = guardar_si_corresponde(indice, tenant_id)
+    _indices[tenant_id] = (indice, cambios, ultimo_cambio)
+    return indice
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event)
+        if denegado:
+            return denegado
+
+        params = query_params(event)
+        tenant_id = params.get("tenant_id") or "utec"
+        consulta = (params.get("q") or "").strip()
+
+        try:
+            if not consulta:
+                raise ValueError("Debe enviar el texto a buscar en q")
+            limit = min(parsear_limit(params.get("limit"), default=20), MAX_RESULTADOS)
+            cursor = decodificar_cursor(params.get("cursor"))
+            if cursor and (cursor.get("tenant_id") != tenant_id or cursor.get("q") != consulta):
+                raise ValueError("El cursor no corresponde a la búsqueda")
+        except ValueError as e:
+            return error(400, str(e))
+        offset = int(cursor["offset"]) if cursor else 0
+
+        print(f"Buscando '{consulta}' en tenant {tenant_id} (limit={limit}, offset={offset})")
+
+        with fase("indice"):
+            indice = obtener_indice(tenant_id)
+        propiedad("documentos_indice", len(indice))
+
+        # Uno de más para saber si hay otra página
+        with fase("ranking"):
+            resultados = indice.buscar(consulta, limit + 1, offset)
+            # El total solo en la primera página (en las siguientes no cambia la búsqueda)
+            total = indice.total(consulta) if not cursor else None
+        siguiente = None
+        if len(resultados) > limit:
+            resultados = resultados[:limit]
+            siguiente = codificar_cursor({"tenant_id": tenant_id, "q": consulta, "offset": offset + limit})
+
+        # Los reportes completos en el orden del ranking; uno borrado que el índice todavía
+        # no vio simplemente no vuelve en el BatchGetItem
+        puntajes = dict(resultados)
+        orden = {uuid: i for i, (uuid, _) in enumerate(resultados)}
+        items = leer_en_lotes(tabla_reportes().name, [{"tenant_id": tenant_id, "uuid": uuid} for uuid in puntajes])
+        items.sort(key=lambda item: orden[item["uuid"]])
+        for item in items:
+            item["puntaje"] = puntajes[item["uuid"]]
+
+        print(f"Se encontraron {len(items)} reportes")
+        contar("items", len(items))
+
+        return respuesta(200, {
+            "mensaje": "Búsqueda realizada correctamente",
+            "items": items,
+            "total": total,
+            "cursor": siguiente
+        })
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        traceback.print_exc()
+
+        return error(500, str(e))
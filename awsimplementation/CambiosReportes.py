@@ -0,0 +1,62 @@
+import traceback
+from runtime import tabla_reportes, tabla_eliminados, query_params, respuesta, error
+from metricas import instrumentar, contar
+from tokens import autorizar
+from paginacion import codificar_cursor, decodificar_cursor, parsear_limit, obtener_pagina
+from cambios import parsear_watermark, requiere_resync, kwargs_actualizados, obtener_eliminados, calcular_watermark, watermark_con_solape
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event)
+        if denegado:
+            return denegado
+
+        params = query_params(event)
+        tenant_id = params.get("tenant_id") or "utec"
+
+        try:
+            desde = parsear_watermark(params.get("since"))
+            limit = parsear_limit(params.get("limit"))
+            cursor = decodificar_cursor(params.get("cursor"))
+            if cursor and cursor.get("tenant_id") != tenant_id:
+                raise ValueError("El cursor no corresponde al tenant")
+        except ValueError as e:
+            return error(400, str(e))
+
+        # Watermark fuera de la retención de lápidas: el cliente debe recargar todo
+        if requiere_resync(desde):
+            return respuesta(200, {"mensaje": "Watermark expirado", "resync": True})
+
+        print(f"Cambios para tenant {tenant_id} desde {desde} (limit={limit})")
+
+        actualizados, last_key = obtener_pagina(
+            tabla_reportes().query,
+            limit=limit,
+            cursor=cursor,
+            **kwargs_actualizados(tenant_id, desde)
+        )
+
+        # Las lápidas se envían en la primera página
+        eliminados = [] if cursor else obtener_eliminados(tabla_eliminados(), tenant_id, desde)
+
+        print(f"{len(actualizados)} actualizados, {len(eliminados)} eliminados")
+        contar("items", len(actualizados))
+        contar("eliminados", len(eliminados))
+
+        return respuesta(200, {
+            "mensaje": "Cambios obtenidos correctamente",
+            "resync": False,
+            "actualizados": actualizados,
+            "eliminados": eliminados,
+            # Guardar el watermark solo cuando cursor sea null (última página). Incluye un
+            # margen de solape: los cambios de ese margen pueden volver en el próximo delta
+            "watermark": watermark_con_solape(desde, calcular_watermark(desde, actualizados, eliminados)),
+            "cursor": codificar_cursor(last_key)
+        })
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        traceback.print_exc()
+
+        return error(500, str(e))
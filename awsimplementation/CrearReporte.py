@@ -1,77 +1,72 @@
-import json
-import boto3
-import uuid
-import os
 import traceback
+from runtime import tabla_reportes, tabla_contadores, tabla_firmas, parsear_body, respuesta, error
+from metricas import instrumentar, contar, fase
+from tokens import autorizar
+from reportes import error_validacion, construir_reporte
+from contadores import deltas, aplicar, marcar_cambios
+from duplicados import firmar, buscar_padre, registrar, adjuntar
 
-dynamodb = boto3.resource("dynamodb")
-table_name = os.environ.get("TABLE_NAME", "dev-t_reportes")
-reportes_table = dynamodb.Table(table_name)
-connections_table = dynamodb.Table(os.environ.get("CONNECTIONS_TABLE", "Connections"))
-
+@instrumentar
 def lambda_handler(event, context):
     try:
-        # El body puede venir como string o dict dependiendo de cómo lo envíe API Gateway
-        raw_body = event.get("body", "{}")
-        if isinstance(raw_body, str):
-            body = json.loads(raw_body)
-        else:
-            body = raw_body
-        
-        required = ["tipo_incidente", "ubicacion", "tipo_usuario", "descripcion"]
+        _, denegado = autorizar(event)
+        if denegado:
+            return denegado
+
+        body = parsear_body(event)
 
-        missing = [x for x in required if x not in body]
-        if missing:
-            return {"statusCode": 400, "body": json.dumps({"error": f"Faltan campos: {missing}"})}
+        invalido = error_validacion(body)
+        if invalido:
+            return error(400, invalido)
 
-        uuidv4 = str(uuid.uuid4())
-        tenant_id = body.get("tenant_id", "utec")
-        
-        # nivel_urgencia es opcional, con valor por defecto
-        nivel_urgencia = body.get("nivel_urgencia", "media")
+        reporte = construir_reporte(body)
+        uuidv4 = reporte["uuid"]
+        tenant_id = reporte["tenant_id"]
 
-        reporte = {
-            "tenant_id": tenant_id,
-            "uuid": uuidv4,
-            "tipo_incidente": body["tipo_incidente"],
-            "nivel_urgencia": nivel_urgencia,
-            "ubicacion": body["ubicacion"],
-            "tipo_usuario": body["tipo_usuario"],
-            "descripcion": body["descripcion"],
-            "estado": "pendiente"
-        }
+        # Casi-duplicado de un incidente abierto reciente (mismo tipo y ubicación, descripción
+        # parecida): no se crea otro reporte ni otra notificación, el padre suma un duplicado
+        firma = None
+        try:
+            with fase("duplicados"):
+                firma = firmar(reporte["descripcion"])
+                padre = buscar_padre(tabla_firmas(), reporte, firma, reporte["creado_en"]) if firma else None
+                duplicados = adjuntar(tabla_reportes(), tenant_id, padre, reporte["creado_en"]) if padre else None
+        except Exception as e:
+            # Best effort: ante cualquier error el reporte se crea normalmente
+            print(f"⚠️ No se pudo verificar duplicados: {str(e)}")
+            duplicados = None
+        if duplicados is not None:
+            print(f"🔁 Duplicado de {padre} ({duplicados} en total)")
+            contar("duplicados")
+            try:
+                marcar_cambios(tabla_contadores(), {tenant_id})
+            except Exception as e:
+                print(f"⚠️ No se pudo marcar el cambio: {str(e)}")
+            return respuesta(200, {"mensaje": "Reporte duplicado", "uuid": padre, "duplicado_de": padre,
+                                   "duplicados": duplicados})
 
         # Guardar en dev-t_reportes
-        reportes_table.put_item(Item=reporte)
+        tabla_reportes().put_item(Item=reporte)
         print(f"✅ Reporte guardado: {uuidv4}")
 
-        # Notificar por WebSocket a todos los conectados
+        # Candidato para los duplicados que lleguen dentro de la ventana
+        if firma:
+            try:
+                registrar(tabla_firmas(), reporte, firma)
+            except Exception as e:
+                print(f"⚠️ No se pudo registrar la firma: {str(e)}")
+
+        # Contadores agregados del tenant (ADD atómico)
         try:
-            domain = event["requestContext"]["domainName"]
-            stage = event["requestContext"]["stage"]
-            ws_endpoint = f"https://{domain}/{stage}"
-            
-            api = boto3.client("apigatewaymanagementapi", endpoint_url=ws_endpoint)
-            connections = connections_table.scan().get("Items", [])
-            
-            message = {
-                "type": "nuevoReporte",
-                "data": reporte
-            }
-            
-            for conn in connections:
-                try:
-                    api.post_to_connection(
-                        ConnectionId=conn["connectionId"],
-                        Data=json.dumps(message)
-                    )
-                except Exception as e:
-                    print(f"⚠️ Error enviando a {conn.get('connectionId', 'unknown')}: {str(e)}")
+            aplicar(tabla_contadores(), deltas([reporte]))
         except Exception as e:
-            print(f"⚠️ No se pudo notificar por WebSocket: {str(e)}")
+            print(f"⚠️ No se pudieron actualizar los contadores: {str(e)}")
+
+        # La notificación por WebSocket la hace NotificarCambios desde el stream de la tabla:
+        # la respuesta no espera el fan-out a los dashboards conectados
 
-        return {"statusCode": 200, "body": json.dumps({"mensaje": "Reporte creado", "uuid": uuidv4, "reporte": reporte})}
+        return respuesta(200, {"mensaje": "Reporte creado", "uuid": uuidv4, "reporte": reporte})
 
     except Exception as e:
         traceback.print_exc()
-        return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+        return error(500, str(e))
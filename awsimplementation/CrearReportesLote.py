@@ -0,0 +1,68 @@
+import traceback
+from runtime import tabla_reportes, tabla_contadores, parsear_body, respuesta, error
+from metricas import instrumentar, contar
+from tokens import autorizar
+from reportes import error_validacion, construir_reporte
+from lotes import escribir_en_lotes
+from contadores import deltas, aplicar
+
+MAX_REPORTES_LOTE = 5000
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event, "admin")
+        if denegado:
+            return denegado
+
+        body = parsear_body(event)
+        entradas = body.get("reportes") if isinstance(body, dict) else body
+
+        if not isinstance(entradas, list) or not entradas:
+            return error(400, "Debe enviar una lista no vacía en 'reportes'")
+        if len(entradas) > MAX_REPORTES_LOTE:
+            return error(400, f"Máximo {MAX_REPORTES_LOTE} reportes por lote")
+
+        # Validar con las mismas reglas que CrearReporte
+        resultados = []
+        reportes = []
+        for indice, entrada in enumerate(entradas):
+            invalido = error_validacion(entrada)
+            if invalido:
+                resultados.append({"indice": indice, "estado": "invalido", "error": invalido})
+                continue
+            reporte = construir_reporte(entrada)
+            reportes.append(reporte)
+            resultados.append({"indice": indice, "estado": "creado", "uuid": reporte["uuid"]})
+
+        # BatchWriteItem en chunks de 25 con reintentos
+        table = tabla_reportes()
+        fallidos = escribir_en_lotes(table.name, [{"PutRequest": {"Item": r}} for r in reportes])
+        uuids_fallidos = {f["PutRequest"]["Item"]["uuid"] for f in fallidos}
+        for resultado in resultados:
+            if resultado.get("uuid") in uuids_fallidos:
+                resultado["estado"] = "error"
+                resultado["error"] = "No se pudo guardar el reporte"
+        creados = [r for r in reportes if r["uuid"] not in uuids_fallidos]
+        print(f"✅ Lote guardado: {len(creados)} de {len(entradas)} reportes")
+        contar("items", len(creados))
+
+        # Un solo ADD por combinación, no uno por reporte
+        try:
+            aplicar(tabla_contadores(), deltas(creados))
+        except Exception as e:
+            print(f"⚠️ No se pudieron actualizar los contadores: {str(e)}")
+
+        # NotificarCambios agrupa las altas de cada tenant en frames nuevosReportes
+
+        status_code = 200 if len(creados) == len(entradas) else 207
+        return respuesta(status_code, {
+            "mensaje": "Lote procesado",
+            "creados": len(creados),
+            "fallidos": len(entradas) - len(creados),
+            "resultados": resultados
+        })
+
+    except Exception as e:
+        traceback.print_exc()
+        return error(500, str(e))
@@ -1,78 +1,75 @@
-import boto3
-import os
-import json
 import traceback
+from botocore.exceptions import ClientError
+from runtime import tabla_reportes, tabla_eliminados, tabla_contadores, query_params, path_params, respuesta, error
+from metricas import instrumentar, contar
+from tokens import autorizar
+from cambios import construir_lapida
+from contadores import deltas, aplicar
 
+@instrumentar
 def lambda_handler(event, context):
     try:
-        path_params = event.get("pathParameters") or {}
-        query_params = event.get("queryStringParameters") or {}
+        _, denegado = autorizar(event, "admin")
+        if denegado:
+            return denegado
 
-        tenant_id = query_params.get("tenant_id") or "utec"
-        uuid = path_params.get("uuid")
+        tenant_id = query_params(event).get("tenant_id") or "utec"
+        uuid = path_params(event).get("uuid")
 
         print(f"🔍 Intentando eliminar: tenant_id={tenant_id}, uuid={uuid}")
 
         if not uuid:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({"error": "Debe enviar uuid en la ruta /reporte/{uuid}"})
-            }
+            return error(400, "Debe enviar uuid en la ruta /reporte/{uuid}")
 
-        nombre_tabla = os.environ.get("TABLE_NAME", "dev-t_reportes")
-        print(f"📊 Tabla: {nombre_tabla}")
-        
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(nombre_tabla)
+        table = tabla_reportes()
+        print(f"📊 Tabla: {table.name}")
 
-        # Validación previa - verificar que existe
-        existing = table.get_item(
-            Key={"tenant_id": tenant_id, "uuid": uuid}
-        )
-        
-        if "Item" not in existing:
+        # Delete condicional: valida existencia y elimina en un solo round trip
+        try:
+            response = table.delete_item(
+                Key={"tenant_id": tenant_id, "uuid": uuid},
+                ConditionExpression="attribute_exists(#u)",
+                ExpressionAttributeNames={"#u": "uuid"},
+                ReturnValues="ALL_OLD"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
             print(f"⚠️ Reporte no encontrado: {uuid}")
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({"error": "El reporte no existe"})
-            }
+            return error(404, "El reporte no existe")
 
-        # Eliminar
-        table.delete_item(
-            Key={"tenant_id": tenant_id, "uuid": uuid}
-        )
-        
         print(f"✅ Reporte eliminado correctamente: {uuid}")
 
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "mensaje": "Reporte eliminado correctamente",
-                "uuid": uuid
-            })
-        }
+        # La eliminación cuenta como una escritura más: los lectores que reciban
+        # esta versión descartan sus copias cacheadas del reporte
+        reporte = response.get("Attributes") or {}
+        version = int(reporte.get("version", 0)) + 1
+
+        # Lápida para que los clientes con sync incremental se enteren del borrado. El
+        # reporte ya no existe: si la lápida falla no se responde 500 (el cliente creería
+        # que no se borró), queda en el log y en la métrica. Los dashboards conectados se
+        # enteran igual por el REMOVE del stream.
+        try:
+            tabla_eliminados().put_item(Item=construir_lapida(tenant_id, uuid, version))
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la lápida de {uuid}: {str(e)}")
+            contar("lapidas_fallidas")
+
+        # El delete condicional devolvió el reporte: se descuenta de su combinación
+        try:
+            aplicar(tabla_contadores(), deltas([reporte], signo=-1))
+        except Exception as e:
+            print(f"⚠️ No se pudieron actualizar los contadores: {str(e)}")
+
+        return respuesta(200, {
+            "mensaje": "Reporte eliminado correctamente",
+            "uuid": uuid,
+            "version": version,
+            "reporte": reporte
+        })
 
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         traceback.print_exc()
-        
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({"error": str(e)})
-        }
+
+        return error(500, str(e))
@@ -0,0 +1,138 @@
+import time
+import traceback
+from boto3.dynamodb.conditions import Attr
+from runtime import tabla_reportes, tabla_eliminados, tabla_contadores, parsear_body, respuesta, error
+from metricas import instrumentar, contar
+from tokens import autorizar
+from reportes import construir_filtro, elegir_indice, kwargs_filtrados, ahora_ms
+from cambios import construir_lapida
+from lotes import escribir_en_lotes, leer_en_lotes
+from contadores import DIMENSIONES, deltas, aplicar
+from paginacion import paginas_con_cursor, codificar_cursor, decodificar_cursor
+
+MAX_UUIDS_LOTE = 5000
+MAX_WORKERS = 8
+# Margen para responder antes del timeout de la Lambda
+MARGEN_TIMEOUT_MS = 3000
+# Lo necesario para lápidas y contadores de cada reporte eliminado
+PROYECCION = {
+    "ProjectionExpression": ", ".join(["#u", "version", *DIMENSIONES]),
+    "ExpressionAttributeNames": {"#u": "uuid"}
+}
+
+def eliminar(table, tenant_id, items):
+    requests = [{"DeleteRequest": {"Key": {"tenant_id": tenant_id, "uuid": i["uuid"]}}} for i in items]
+    fallidos = escribir_en_lotes(table.name, requests, max_workers=MAX_WORKERS)
+
+    # Lápidas de los borrados exitosos para la sincronización incremental
+    uuids_fallidos = {f["DeleteRequest"]["Key"]["uuid"] for f in fallidos}
+    eliminado_en = ahora_ms()
+    lapidas = [
+        {"PutRequest": {"Item": construir_lapida(tenant_id, i["uuid"], int(i.get("version", 0)) + 1, eliminado_en)}}
+        for i in items if i["uuid"] not in uuids_fallidos
+    ]
+    escribir_en_lotes(tabla_eliminados().name, lapidas, max_workers=MAX_WORKERS)
+
+    # Contadores: un ADD negativo por combinación. BatchWriteItem no confirma que el
+    # item existiera, así que dos borrados simultáneos del mismo reporte descuentan dos veces.
+    try:
+        eliminados = [dict(i, tenant_id=tenant_id) for i in items if i["uuid"] not in uuids_fallidos]
+        aplicar(tabla_contadores(), deltas(eliminados, signo=-1))
+    except Exception as e:
+        print(f"⚠️ No se pudieron actualizar los contadores: {str(e)}")
+
+    return len(requests) - len(fallidos), len(fallidos)
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event, "admin")
+        if denegado:
+            return denegado
+
+        inicio = time.perf_counter()
+        body = parsear_body(event)
+        if not isinstance(body, dict):
+            return error(400, "El body debe ser un objeto con uuids o filtro")
+        tenant_id = body.get("tenant_id") or "utec"
+        uuids = body.get("uuids")
+        filtros = body.get("filtro")
+
+        table = tabla_reportes()
+        resumen = {"encontrados": 0, "eliminados": 0, "fallidos": 0, "paginas": 0}
+        cursor = None
+
+        if uuids is not None:
+            # Modo lista: uuids explícitos
+            if not isinstance(uuids, list) or not uuids:
+                return error(400, "uuids debe ser una lista no vacía")
+            if len(uuids) > MAX_UUIDS_LOTE:
+                return error(400, f"Máximo {MAX_UUIDS_LOTE} uuids por lote")
+            uuids = list(dict.fromkeys(str(u) for u in uuids))
+            # Solo se borran (y descuentan) los que existen
+            keys = [{"tenant_id": tenant_id, "uuid": u} for u in uuids]
+            items = leer_en_lotes(table.name, keys, max_workers=MAX_WORKERS, **PROYECCION)
+            resumen["encontrados"] = len(items)
+            if items:
+                resumen["eliminados"], resumen["fallidos"] = eliminar(table, tenant_id, items)
+
+        elif filtros:
+            # Modo filtro: query del tenant página a página, borrando cada página en lote
+            antes_de = None
+            try:
+                # antes_de: epoch en milisegundos, compara contra creado_en
+                if filtros.get("antes_de") not in (None, ""):
+                    antes_de = Attr("creado_en").lt(int(filtros["antes_de"]))
+            except (TypeError, ValueError):
+                return error(400, "antes_de debe ser un timestamp en milisegundos")
+            if construir_filtro(filtros) is None and antes_de is None:
+                return error(400, "El filtro no contiene campos válidos")
+            try:
+                start_key = decodificar_cursor(body.get("cursor"))
+                if start_key and start_key.get("tenant_id") != tenant_id:
+                    raise ValueError("El cursor no corresponde al tenant")
+                # Por el GSI del filtro si tiene (p. ej. estado=resuelto): no lee el resto del tenant
+                campo = elegir_indice(filtros, cursor=start_key)
+            except ValueError as e:
+                return error(400, str(e))
+
+            query_kwargs = {**kwargs_filtrados(tenant_id, filtros, campo), **PROYECCION}
+            if antes_de is not None:
+                filtro = query_kwargs.get("FilterExpression")
+                query_kwargs["FilterExpression"] = antes_de if filtro is None else filtro & antes_de
+            if start_key:
+                query_kwargs["ExclusiveStartKey"] = start_key
+
+            for pagina, last_key in paginas_con_cursor(table.query, **query_kwargs):
+                resumen["paginas"] += 1
+                resumen["encontrados"] += len(pagina)
+                if pagina:
+                    eliminados, fallidos = eliminar(table, tenant_id, pagina)
+                    resumen["eliminados"] += eliminados
+                    resumen["fallidos"] += fallidos
+
+                # Si se acaba el tiempo, devolver un cursor para continuar: el LastEvaluatedKey
+                # de la query (con la clave del GSI si se usó uno), así la siguiente llamada
+                # retoma en el mismo índice justo después de esta página
+                if context and context.get_remaining_time_in_millis() < MARGEN_TIMEOUT_MS and last_key:
+                    cursor = codificar_cursor(last_key)
+                    break
+
+        else:
+            return error(400, "Debe enviar 'uuids' o 'filtro'")
+
+        resumen["duracion_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+        contar("items", resumen["eliminados"])
+        print(f"🗑️ Eliminación en lote ({tenant_id}): {resumen}")
+
+        return respuesta(200, {
+            "mensaje": "Eliminación en lote completada" if cursor is None else "Eliminación en lote parcial",
+            "resumen": resumen,
+            "cursor": cursor
+        })
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        traceback.print_exc()
+
+        return error(500, str(e))
@@ -0,0 +1,33 @@
+import traceback
+from runtime import tabla_contadores, query_params, respuesta, error
+from metricas import instrumentar
+from tokens import autorizar
+from contadores import leer_contadores, resumir
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event)
+        if denegado:
+            return denegado
+
+        params = query_params(event)
+        tenant_id = params.get("tenant_id") or "utec"
+
+        # Una query por clave sobre los contadores del tenant: el costo no depende
+        # de cuántos reportes tenga. ?estado=&nivel_urgencia=&tipo_incidente= filtran.
+        items = leer_contadores(tabla_contadores(), tenant_id)
+        resumen = resumir(items, params)
+        print(f"📊 Estadísticas de {tenant_id}: {len(items)} contadores, total {resumen['total']}")
+
+        return respuesta(200, {
+            "mensaje": "Estadísticas obtenidas correctamente",
+            "tenant_id": tenant_id,
+            **resumen
+        })
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        traceback.print_exc()
+
+        return error(500, str(e))
@@ -0,0 +1,45 @@
+import time
+import traceback
+from runtime import path_params, respuesta, error
+from metricas import instrumentar, contar
+from tokens import autorizar
+from registro import TABLAS, MAX_CUENTAS_IMPORTACION, parsear_cuentas, importar
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event, "admin")
+        if denegado:
+            return denegado
+
+        # /auth/importar/{rol}: usuario o admin
+        rol = path_params(event).get("rol")
+        if rol not in TABLAS:
+            return error(400, f"rol debe ser uno de {list(TABLAS)}")
+
+        try:
+            entradas = parsear_cuentas(event)
+        except ValueError as e:
+            return error(400, f"No se pudo leer el archivo: {str(e)}")
+        if not isinstance(entradas, list) or not entradas:
+            return error(400, "Debe enviar un CSV o una lista no vacía en 'cuentas'")
+        if len(entradas) > MAX_CUENTAS_IMPORTACION:
+            return error(400, f"Máximo {MAX_CUENTAS_IMPORTACION} cuentas por importación")
+
+        inicio = time.perf_counter()
+        resultados, resumen = importar(rol, entradas)
+        resumen["duracion_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+        print(f"👥 Importación de {rol}s: {resumen}")
+        contar("items", resumen["creado"])
+
+        status_code = 200 if resumen["creado"] == len(entradas) else 207
+        return respuesta(status_code, {
+            "mensaje": "Importación procesada",
+            "resumen": resumen,
+            "resultados": resultados
+        })
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        traceback.print_exc()
+        return error(500, str(e))
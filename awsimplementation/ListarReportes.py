@@ -1,46 +1,80 @@
-import boto3
-import os
-import json
 import traceback
-from boto3.dynamodb.conditions import Key
+from runtime import tabla_reportes, tabla_contadores, query_params, header, respuesta, no_modificado, error
+from metricas import instrumentar, contar, propiedad
+from tokens import autorizar
+from paginacion import codificar_cursor, decodificar_cursor, parsear_limit, proyeccion, obtener_pagina
+from contadores import leer_cambios, leer_contadores
+from reportes import FILTROS_PERMITIDOS, campos_indexados, elegir_indice, kwargs_filtrados
+from etags import etag_coleccion, coincide
 
+@instrumentar
 def lambda_handler(event, context):
     try:
+        _, denegado = autorizar(event)
+        if denegado:
+            return denegado
+
         # Obtener tenant_id desde query params
-        query_params = event.get("queryStringParameters") or {}
-        tenant_id = query_params.get("tenant_id") or "utec"
-        
-        print(f"Listando reportes para tenant: {tenant_id}")
-
-        nombre_tabla = os.environ.get("TABLE_NAME", "dev-t_reportes")
-        print(f"Usando tabla: {nombre_tabla}")
-        
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(nombre_tabla)
-
-        # Query por tenant_id (HASH KEY)
-        response = table.query(
-            KeyConditionExpression=Key('tenant_id').eq(tenant_id)
+        params = query_params(event)
+        tenant_id = params.get("tenant_id") or "utec"
+
+        # Paginación: limit, cursor (LastEvaluatedKey opaco) y fields (proyección)
+        try:
+            limit = parsear_limit(params.get("limit"))
+            cursor = decodificar_cursor(params.get("cursor"))
+            if cursor and cursor.get("tenant_id") != tenant_id:
+                raise ValueError("El cursor no corresponde al tenant")
+        except ValueError as e:
+            return error(400, str(e))
+
+        # ETag de la colección: se lee antes que los items (y las escrituras lo marcan
+        # después), así una página nunca queda asociada a un ETag más nuevo que ella
+        etag = etag_coleccion(tenant_id, leer_cambios(tabla_contadores(), tenant_id), params)
+        if coincide(header(event, "If-None-Match"), etag):
+            contar("no_modificado")
+            return no_modificado(etag)
+
+        # ?estado=&nivel_urgencia=&tipo_incidente= van por su GSI; tipo_usuario y ubicacion filtran.
+        # Índice: el del cursor en las páginas siguientes; si no, el filtro más selectivo.
+        filtros = {c: params[c] for c in FILTROS_PERMITIDOS if params.get(c) not in (None, "")}
+        try:
+            contadores = None
+            if len(campos_indexados(filtros)) > 1 and not cursor:
+                contadores = leer_contadores(tabla_contadores(), tenant_id)
+            campo = elegir_indice(filtros, contadores, cursor)
+        except ValueError as e:
+            return error(400, str(e))
+
+        print(f"Listando reportes para tenant: {tenant_id} (limit={limit}, filtros={filtros}, indice={campo})")
+        if filtros and campo is None:
+            # Lee todos los reportes del tenant y descarta: conviene un índice si se vuelve frecuente
+            print(f"⚠️ Filtro sin índice: {sorted(filtros)}")
+            contar("filtro_sin_indice")
+        propiedad("indice", campo or "tabla")
+
+        table = tabla_reportes()
+        print(f"Usando tabla: {table.name}")
+
+        # Query por tenant_id (HASH KEY), por el GSI del filtro elegido si hay uno
+        items, last_key = obtener_pagina(
+            table.query,
+            limit=limit,
+            cursor=cursor,
+            **kwargs_filtrados(tenant_id, filtros, campo),
+            **proyeccion(params.get("fields"))
         )
 
-        items = response.get("Items", [])
         print(f"Se encontraron {len(items)} reportes")
+        contar("items", len(items))
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({
-                "mensaje": "Reportes obtenidos correctamente",
-                "items": items
-            })
-        }
+        return respuesta(200, {
+            "mensaje": "Reportes obtenidos correctamente",
+            "items": items,
+            "cursor": codificar_cursor(last_key)
+        }, {"ETag": etag, "Cache-Control": "no-cache"})
 
     except Exception as e:
         print(f"Error: {str(e)}")
         traceback.print_exc()
-        
-        return {
-            "statusCode": 500,
-            "body": json.dumps({
-                "error": str(e)
-            })
-        }
+
+        return error(500, str(e))
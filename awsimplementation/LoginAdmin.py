@@ -1,89 +1,45 @@
-import boto3
-import json
 import traceback
+from runtime import obtener_tabla, parsear_body, respuesta, error
+from metricas import instrumentar
+from tokens import emitir_token
 
-dynamodb = boto3.resource("dynamodb")
-admins_table = dynamodb.Table("admins")
-
+@instrumentar
 def lambda_handler(event, context):
     try:
-        # Parsear body
-        raw_body = event.get("body", "{}")
-        if isinstance(raw_body, str):
-            body = json.loads(raw_body)
-        else:
-            body = raw_body
+        body = parsear_body(event)
 
         # Validar campos
         email = body.get("email", "").strip().lower()
         password = body.get("password", "").strip()
 
         if not email or not password:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type",
-                    "Access-Control-Allow-Methods": "POST,OPTIONS"
-                },
-                "body": json.dumps({"error": "Faltan campos: email, password"})
-            }
+            return error(400, "Faltan campos: email, password")
 
         # Buscar admin
-        response = admins_table.get_item(Key={"email": email})
+        response = obtener_tabla("admins").get_item(Key={"email": email})
 
         if "Item" not in response:
-            return {
-                "statusCode": 401,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type",
-                    "Access-Control-Allow-Methods": "POST,OPTIONS"
-                },
-                "body": json.dumps({"error": "Email o contraseña incorrectos"})
-            }
+            return error(401, "Email o contraseña incorrectos")
 
         admin = response["Item"]
 
         # Verificar contraseña
         if admin["password"] != password:
-            return {
-                "statusCode": 401,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type",
-                    "Access-Control-Allow-Methods": "POST,OPTIONS"
-                },
-                "body": json.dumps({"error": "Email o contraseña incorrectos"})
-            }
-
-        # Login exitoso
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type",
-                "Access-Control-Allow-Methods": "POST,OPTIONS"
+            return error(401, "Email o contraseña incorrectos")
+
+        # Login exitoso: token firmado (HMAC) con rol y expiración
+        token, claims = emitir_token(email, "admin")
+        return respuesta(200, {
+            "mensaje": "Login exitoso",
+            "admin": {
+                "email": admin["email"],
+                "nombre": admin["nombre"]
             },
-            "body": json.dumps({
-                "mensaje": "Login exitoso",
-                "admin": {
-                    "email": admin["email"],
-                    "nombre": admin["nombre"]
-                },
-                "token": email  # Simple token (en producción usar JWT)
-            })
-        }
+            "token": token,
+            "expira_en": claims["exp"]
+        })
 
     except Exception as e:
         print(f"Error: {str(e)}")
         traceback.print_exc()
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type",
-                "Access-Control-Allow-Methods": "POST,OPTIONS"
-            },
-            "body": json.dumps({"error": str(e)})
-        }
+        return error(500, str(e))
@@ -0,0 +1,40 @@
+import json
+import time
+import traceback
+from runtime import tabla_conexiones, endpoint_ws_configurado, obtener_api
+from metricas import instrumentar, contar, sumar_fase
+from notificaciones import RETRASO_MAX_MS, eventos_de_stream, notificar, retraso_ms
+
+# Consumidor del DynamoDB Stream de reportes: las altas, cambios y bajas se notifican
+# por WebSocket aquí, fuera del camino de la petición HTTP que las originó. El stream
+# junta los registros durante maximumBatchingWindow y cada conexión recibe un solo
+# frame por tenant y lote.
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        records = event.get("Records", [])
+        contar("items", len(records))
+
+        eventos = eventos_de_stream(records)
+        if not eventos:
+            return {"registros": len(records), "eventos": 0}
+
+        api = obtener_api(endpoint_ws_configurado())
+        resumen = notificar(api, tabla_conexiones(), eventos)
+
+        # Desde la escritura más antigua del lote hasta el último frame enviado
+        resumen["retraso_ms"] = retraso_ms(eventos, int(time.time() * 1000))
+        sumar_fase("retraso_notificacion", resumen["retraso_ms"])
+        if resumen["retraso_ms"] > RETRASO_MAX_MS:
+            contar("retraso_excedido")
+            print(f"⚠️ Retraso de notificación {resumen['retraso_ms']} ms > {RETRASO_MAX_MS} ms")
+        print(f"📡 Stream: {len(records)} registros -> {json.dumps(resumen)}")
+
+        return {"registros": len(records), **resumen}
+
+    except Exception as e:
+        # Sin reintento: reprocesar el lote volvería a enviar los mensajes ya difundidos
+        print(f"❌ Error: {str(e)}")
+        traceback.print_exc()
+        return {"registros": len(event.get("Records", [])), "error": str(e)}
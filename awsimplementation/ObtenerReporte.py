@@ -1,52 +1,88 @@
-import boto3
 import os
-import json
 import traceback
+from runtime import tabla_reportes, query_params, path_params, header, respuesta, no_modificado, error
+from metricas import instrumentar, contar, propiedad
+from tokens import autorizar
+from cache import CacheLRU, NO_EXISTE
+from etags import etag_item, coincide
 
+# Cache read-through por contenedor, clave (tenant_id, uuid)
+cache = CacheLRU(
+    max_items=int(os.environ.get("REPORTES_CACHE_SIZE", "1000")),
+    ttl=float(os.environ.get("REPORTES_CACHE_TTL", "30")),
+    ttl_negativo=float(os.environ.get("REPORTES_CACHE_TTL_404", "5"))
+)
+
+def parsear_version(valor):
+    try:
+        return int(valor) if valor not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+@instrumentar
 def lambda_handler(event, context):
     try:
-        path_params = event.get("pathParameters") or {}
-        query_params = event.get("queryStringParameters") or {}
+        _, denegado = autorizar(event)
+        if denegado:
+            return denegado
 
-        tenant_id = query_params.get("tenant_id") or "utec"
-        uuid = path_params.get("uuid")
+        params = query_params(event)
+        tenant_id = params.get("tenant_id") or "utec"
+        uuid = path_params(event).get("uuid")
 
         if not uuid:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Debe enviar uuid en la ruta /reporte/{uuid}"})
-            }
-
-        nombre_tabla = os.environ.get("TABLE_NAME", "dev-t_reportes")
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(nombre_tabla)
-
-        response = table.get_item(
-            Key={
-                "tenant_id": tenant_id,
-                "uuid": uuid
-            }
-        )
-
-        if "Item" not in response:
-            return {
-                "statusCode": 404,
-                "body": json.dumps({"error": "El reporte no existe"})
-            }
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({
-                "mensaje": "Reporte encontrado",
-                "item": response["Item"]
-            })
-        }
+            return error(400, "Debe enviar uuid en la ruta /reporte/{uuid}")
+
+        # ?version=N: el cliente ya vio la versión N (p. ej. por WebSocket),
+        # una entrada cacheada más antigua se considera obsoleta
+        clave = (tenant_id, uuid)
+        if_none_match = header(event, "If-None-Match")
+        if if_none_match:
+            # Sondeo condicional: el ETag tiene que salir de la versión vigente, no de una
+            # copia de hasta REPORTES_CACHE_TTL segundos (daría 304 a un reporte ya cambiado)
+            item = None
+            estado_cache = "BYPASS"
+            contar("cache_omitida")
+        else:
+            item = cache.obtener(clave, parsear_version(params.get("version")))
+            estado_cache = "HIT" if item is not None else "MISS"
+
+            # Aciertos y fallos en la línea EMF para dimensionar la cache
+            if item is None:
+                contar("cache_miss")
+            elif item is NO_EXISTE:
+                contar("cache_hit_negativo")
+            else:
+                contar("cache_hit")
+
+        if item is None:
+            response = tabla_reportes().get_item(
+                Key={
+                    "tenant_id": tenant_id,
+                    "uuid": uuid
+                },
+                ConsistentRead=bool(if_none_match)
+            )
+            item = response.get("Item", NO_EXISTE)
+            version = int(item.get("version", 0)) if item is not NO_EXISTE else 0
+            cache.guardar(clave, item, version)
+        propiedad("cache_items", len(cache))
+
+        if item is NO_EXISTE:
+            return respuesta(404, {"error": "El reporte no existe"}, {"X-Cache": estado_cache})
+
+        # If-None-Match con la versión vigente: 304 sin serializar el reporte
+        etag = etag_item(item)
+        if coincide(if_none_match, etag):
+            return no_modificado(etag, {"X-Cache": estado_cache})
+
+        return respuesta(200, {
+            "mensaje": "Reporte encontrado",
+            "item": item
+        }, {"X-Cache": estado_cache, "ETag": etag, "Cache-Control": "no-cache"})
 
     except Exception as e:
         print(f"Error: {str(e)}")
         traceback.print_exc()
-        
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
-        }
+
+        return error(500, str(e))
@@ -0,0 +1,48 @@
+import traceback
+from runtime import tabla_reportes, tabla_contadores, query_params, header, respuesta, no_modificado, error
+from metricas import instrumentar, contar
+from tokens import autorizar
+from paginacion import parsear_limit, proyeccion
+from contadores import leer_cambios
+from etags import etag_coleccion, coincide
+from triage import TOP_DEFAULT, MAX_TOP, kwargs_top
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        _, denegado = autorizar(event, "admin")
+        if denegado:
+            return denegado
+
+        params = query_params(event)
+        tenant_id = params.get("tenant_id") or "utec"
+
+        try:
+            limit = min(parsear_limit(params.get("limit"), default=TOP_DEFAULT), MAX_TOP)
+        except ValueError as e:
+            return error(400, str(e))
+
+        # Mismo ETag que las listas: la pantalla de triage puede sondear con If-None-Match
+        etag = etag_coleccion(tenant_id, leer_cambios(tabla_contadores(), tenant_id), dict(params, vista="top"))
+        if coincide(header(event, "If-None-Match"), etag):
+            contar("no_modificado")
+            return no_modificado(etag)
+
+        # Una query acotada sobre la cola de triage: solo abiertos, ya ordenados por
+        # urgencia y antigüedad; los resueltos no están en el índice
+        response = tabla_reportes().query(**kwargs_top(tenant_id, limit), **proyeccion(params.get("fields")))
+        items = response.get("Items", [])
+
+        print(f"Top {limit} de {tenant_id}: {len(items)} reportes abiertos")
+        contar("items", len(items))
+
+        return respuesta(200, {
+            "mensaje": "Reportes más urgentes obtenidos correctamente",
+            "items": items
+        }, {"ETag": etag, "Cache-Control": "no-cache"})
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        traceback.print_exc()
+
+        return error(500, str(e))
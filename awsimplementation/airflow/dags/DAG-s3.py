@@ -1,35 +1,42 @@
 from airflow import DAG
+from airflow.models import Variable
 from airflow.operators.python import PythonOperator
 from airflow.providers.slack.operators.slack_api import SlackAPIPostOperator
 from airflow.providers.sendgrid.operators.sendgrid import SendGridOperator
 from datetime import datetime
 import boto3
 import json
-import pandas as pd
-import openpyxl
-
-# Diccionario de tipos de incidente a nivel de urgencia
-TIPO_INCIDENTE_URGENCIA = {
-    "Robo": "Alta",
-    "Accidente": "Alta",
-    "Acoso": "Alta",
-    "Daño a propiedad": "Media",
-    "Otro": "Baja"
-}
+import os
+from estadisticas import agregar_estadisticas, estadisticas_a_excel
+from clasificacion import calcular_urgencia, actualizar_urgencia, mover_contadores, clasificar_lote
+
+# Tabla de reportes y parámetros del scan paralelo
+TABLA_REPORTES = os.environ.get("TABLE_NAME", "dev-t_reportes")
+TABLA_CONTADORES = os.environ.get("COUNTERS_TABLE", "dev-t_reportes_contadores")
+SCAN_TOTAL_SEGMENTS = int(os.environ.get("SCAN_TOTAL_SEGMENTS", "8"))
+SCAN_MAX_WORKERS = int(os.environ.get("SCAN_MAX_WORKERS", "8"))
+
+# Tenants que se clasifican en modo lote y watermark por tenant (Airflow Variable)
+TENANTS = [t.strip() for t in os.environ.get("TENANTS", "utec").split(",") if t.strip()]
+CLASIFICACION_MAX_WORKERS = int(os.environ.get("CLASIFICACION_MAX_WORKERS", "16"))
+WATERMARK_VARIABLE = "clasificacion_watermarks"
 
 # Función para clasificar el incidente
 def clasificar_incidente(**kwargs):
-    tenant_id = kwargs['dag_run'].conf.get('tenant_id')
-    uuid = kwargs['dag_run'].conf.get('uuid')
-    descripcion = kwargs['dag_run'].conf.get('descripcion')
-    tipo_incidente = kwargs['dag_run'].conf.get('tipo_incidente')
+    conf = kwargs['dag_run'].conf or {}
 
-    # Asignar nivel de urgencia basado en el tipo de incidente
-    nivel_urgencia = TIPO_INCIDENTE_URGENCIA.get(tipo_incidente, "Baja")
+    # Sin uuid en la configuración (p. ej. la corrida programada): modo lote.
+    # {"completo": true} reclasifica todo el tenant (p. ej. tras cambiar las reglas)
+    if not conf.get('uuid'):
+        return clasificar_pendientes(conf.get('tenants') or TENANTS, completo=bool(conf.get('completo')))
 
-    # Si la descripción contiene "urgente", cambiar el nivel de urgencia a "Alta"
-    if "urgente" in descripcion.lower():
-        nivel_urgencia = "Alta"
+    tenant_id = conf.get('tenant_id')
+    uuid = conf.get('uuid')
+    descripcion = conf.get('descripcion')
+    tipo_incidente = conf.get('tipo_incidente')
+    ubicacion = conf.get('ubicacion')
+
+    nivel_urgencia = calcular_urgencia(tipo_incidente, descripcion, ubicacion)
 
     # Imprimir para ver el resultado
     print(f"Clasificando incidente {uuid}: Tipo: {tipo_incidente}, Descripción: {descripcion}, Nivel de Urgencia: {nivel_urgencia}")
@@ -37,21 +44,12 @@ def clasificar_incidente(**kwargs):
     # Actualizar el incidente en DynamoDB
     try:
         dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table("tu_nombre_de_tabla_dynamodb")
-        
+        table = dynamodb.Table(TABLA_REPORTES)
+
         # Actualizamos el nivel de urgencia del reporte
-        response = table.update_item(
-            Key={
-                'tenant_id': tenant_id,
-                'uuid': uuid
-            },
-            UpdateExpression="set nivel_urgencia = :n",
-            ExpressionAttributeValues={
-                ':n': nivel_urgencia
-            },
-            ReturnValues="UPDATED_NEW"
-        )
+        response = actualizar_urgencia(table, tenant_id, uuid, nivel_urgencia)
         print(f"Reporte actualizado: {response}")
+        mover_contadores(response.get("Attributes", {}), nivel_urgencia, dynamodb.Table(TABLA_CONTADORES))
     except Exception as e:
         print(f"Error al actualizar el incidente en DynamoDB: {str(e)}")
 
@@ -63,6 +61,32 @@ def clasificar_incidente(**kwargs):
         'urgencia': nivel_urgencia
     }
 
+# Modo lote: todos los reportes sin clasificar con las reglas vigentes desde el último
+# watermark de cada tenant (sin watermark o completo: toda la partición del tenant)
+def clasificar_pendientes(tenants, completo=False):
+    watermarks = Variable.get(WATERMARK_VARIABLE, default_var={}, deserialize_json=True)
+    resumenes = []
+
+    for tenant_id in tenants:
+        resumen = clasificar_lote(
+            TABLA_REPORTES,
+            tenant_id,
+            0 if completo else int(watermarks.get(tenant_id, 0)),
+            max_workers=CLASIFICACION_MAX_WORKERS
+        )
+        print(f"Clasificación en lote: {json.dumps(resumen)}")
+        watermarks[tenant_id] = resumen["watermark"]
+        resumenes.append(resumen)
+
+    # Registrar los nuevos watermarks para la próxima corrida
+    Variable.set(WATERMARK_VARIABLE, watermarks, serialize_json=True)
+
+    return {
+        'lote': True,
+        'clasificados': sum(r['actualizados'] for r in resumenes),
+        'tenants': resumenes
+    }
+
 # Función para enviar notificación de Slack
 def enviar_notificacion_slack(incident, **kwargs):
     slack_message = f"Nuevo incidente reportado: {incident['tipo']} - {incident['descripcion']} en {incident['ubicacion']}. Urgencia: {incident['urgencia']}"
@@ -76,18 +100,18 @@ def enviar_notificacion_slack(incident, **kwargs):
 
 # Función para generar un reporte estadístico
 def generar_reporte_estadistico(**kwargs):
-    # Obtener los incidentes desde DynamoDB o base de datos
-    incidentes = [
-        {'id': 1, 'tipo': 'Robo', 'descripcion': 'Robo de celular', 'ubicacion': 'Edificio A', 'urgencia': 'Alta', 'rol': 'Estudiante'},
-        {'id': 2, 'tipo': 'Accidente', 'descripcion': 'Accidente de tráfico', 'ubicacion': 'Avenida principal', 'urgencia': 'Media', 'rol': 'Estudiante'}
-    ]
-
-    # Crear un DataFrame con los incidentes
-    df = pd.DataFrame(incidentes)
+    # Scan paralelo segmentado de la tabla de reportes, agregando por página
+    # (memoria constante: no se materializan los items)
+    estadisticas = agregar_estadisticas(
+        TABLA_REPORTES,
+        total_segmentos=SCAN_TOTAL_SEGMENTS,
+        max_workers=SCAN_MAX_WORKERS
+    )
+    print(f"Reportes procesados: {estadisticas['total']}")
 
-    # Generar un archivo Excel
+    # Generar un archivo Excel con los agregados
     filename = '/tmp/reporte_incidentes.xlsx'
-    df.to_excel(filename, index=False)
+    estadisticas_a_excel(estadisticas, filename)
 
     # Devolver la ruta del archivo para que pueda ser enviado por correo o procesado
     return filename
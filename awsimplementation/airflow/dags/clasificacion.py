@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import pandas as pd
+
+# Motor de reglas compartido con las Lambdas (se copia desde layer/python en el Dockerfile)
+from clasificador import obtener_clasificador
+from contadores import deltas_cambio, aplicar
+from triage import base_urgencia
+
+TABLA_CONTADORES = os.environ.get("COUNTERS_TABLE", "dev-t_reportes_contadores")
+
+# GSI de reportes: tenant_id (HASH) + actualizado_en (RANGE)
+ACTUALIZADO_INDEX = "tenant-actualizado-index"
+
+# Modo "adaptive" de botocore: reintentos con backoff y limitación de tasa del lado
+# del cliente cuando DynamoDB empieza a responder con throttling
+CONFIG_ESCRITURA = Config(retries={"mode": "adaptive", "max_attempts": 10}, max_pool_connections=50)
+
+_local = threading.local()
+
+
+def calcular_urgencia(tipo_incidente, descripcion, ubicacion=None):
+    # Un solo reporte (modo con uuid en la configuración del DAG)
+    return obtener_clasificador().clasificar(tipo_incidente, descripcion, ubicacion)
+
+
+def ahora_ms():
+    return int(time.time() * 1000)
+
+
+def actualizar_urgencia(table, tenant_id, uuid, nivel_urgencia):
+    # attribute_exists evita recrear un reporte eliminado mientras se clasificaba.
+    # ALL_OLD: el estado anterior completo para mover los contadores agregados.
+    # orden_urgencia (cola de triage) se calcula en DynamoDB a partir de creado_en,
+    # sin leer el reporte: rango del nivel * 10^13 + creado_en.
+    # reglas_version marca con qué reglas quedó clasificado (ver leer_pendientes).
+    return table.update_item(
+        Key={
+            'tenant_id': tenant_id,
+            'uuid': uuid
+        },
+        UpdateExpression=(
+            "set nivel_urgencia = :n, actualizado_en = :t, reglas_version = :r, "
+            "orden_urgencia = if_not_exists(creado_en, :t) + :base add version :uno"
+        ),
+        ConditionExpression="attribute_exists(tenant_id)",
+        ExpressionAttributeValues={
+            ':n': nivel_urgencia,
+            ':t': ahora_ms(),
+            ':r': obtener_clasificador().version,
+            ':base': base_urgencia(nivel_urgencia),
+            ':uno': 1
+        },
+        ReturnValues="ALL_OLD"
+    )
+
+
+def mover_contadores(anterior, nivel_urgencia, tabla_contadores=None):
+    # El reporte pasa de la combinación con su nivel anterior a la del nuevo
+    tabla_contadores = tabla_contadores or _tabla_por_hilo(TABLA_CONTADORES)
+    aplicar(tabla_contadores, deltas_cambio(anterior, dict(anterior, nivel_urgencia=nivel_urgencia)))
+
+
+def leer_pendientes(table, tenant_id, desde):
+    # Reportes del tenant sin clasificar con las reglas vigentes, página a página.
+    # Con watermark lee los modificados desde entonces (GSI de actualizado_en); sin
+    # watermark (primera corrida o corrida completa) recorre la partición del tenant en la
+    # tabla, que incluye los reportes antiguos sin actualizado_en (fuera del GSI).
+    version = obtener_clasificador().version
+    kwargs = {
+        "FilterExpression": Attr("reglas_version").not_exists() | Attr("reglas_version").ne(version),
+        "ProjectionExpression": "tenant_id, #u, tipo_incidente, descripcion, ubicacion, nivel_urgencia",
+        "ExpressionAttributeNames": {"#u": "uuid"}
+    }
+    if desde:
+        kwargs["IndexName"] = ACTUALIZADO_INDEX
+        kwargs["KeyConditionExpression"] = Key("tenant_id").eq(tenant_id) & Key("actualizado_en").gte(desde)
+    else:
+        kwargs["KeyConditionExpression"] = Key("tenant_id").eq(tenant_id)
+    while True:
+        response = table.query(**kwargs)
+        if response.get("Items"):
+            yield response["Items"]
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def _tabla_por_hilo(nombre_tabla):
+    # Los resources de boto3 no son thread-safe: uno por hilo del pool
+    if not hasattr(_local, "tablas"):
+        _local.tablas = {}
+    if nombre_tabla not in _local.tablas:
+        session = boto3.session.Session()
+        _local.tablas[nombre_tabla] = session.resource("dynamodb", config=CONFIG_ESCRITURA).Table(nombre_tabla)
+    return _local.tablas[nombre_tabla]
+
+
+def clasificar_pagina(items):
+    # Clasificación vectorizada de una página completa: (item, nivel) por reporte
+    df = pd.DataFrame(items, columns=["tipo_incidente", "descripcion", "ubicacion"])
+    niveles = obtener_clasificador().clasificar_series(df["tipo_incidente"], df["descripcion"], df["ubicacion"])
+    return zip(items, niveles)
+
+
+def clasificar_lote(nombre_tabla, tenant_id, desde, max_workers=16, tabla_factory=None, nombre_contadores=None):
+    # Clasifica todos los pendientes del tenant en una pasada y devuelve el resumen
+    # con el nuevo watermark (inicio de la lectura: lo escrito después se lee la próxima vez)
+    tabla_factory = tabla_factory or _tabla_por_hilo
+    nuevo_watermark = ahora_ms()
+    resumen = {"tenant_id": tenant_id, "leidos": 0, "actualizados": 0, "eliminados": 0, "fallidos": 0,
+               "por_urgencia": {}}
+    cambios_contadores = Counter()
+
+    def actualizar(par):
+        item, nivel = par
+        try:
+            response = actualizar_urgencia(tabla_factory(nombre_tabla), tenant_id, item["uuid"], nivel)
+            anterior = response.get("Attributes", {})
+            return nivel, "actualizado", deltas_cambio(anterior, dict(anterior, nivel_urgencia=nivel))
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return nivel, "eliminado", None
+            print(f"Error al clasificar {item['uuid']}: {str(e)}")
+            return nivel, "fallido", None
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for pagina in leer_pendientes(tabla_factory(nombre_tabla), tenant_id, desde):
+            for nivel, estado, cambios in executor.map(actualizar, clasificar_pagina(pagina)):
+                resumen["leidos"] += 1
+                if estado == "actualizado":
+                    resumen["actualizados"] += 1
+                    cambios_contadores.update(cambios)
+                    resumen["por_urgencia"][nivel] = resumen["por_urgencia"].get(nivel, 0) + 1
+                elif estado == "eliminado":
+                    resumen["eliminados"] += 1
+                else:
+                    resumen["fallidos"] += 1
+
+    # Un solo ADD por combinación al final de la corrida
+    try:
+        aplicar(tabla_factory(nombre_contadores or TABLA_CONTADORES), cambios_contadores)
+    except ClientError as e:
+        print(f"Error al actualizar contadores de {tenant_id}: {str(e)}")
+
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    # Si algo falló no se avanza el watermark: se reintenta en la próxima corrida
+    resumen["watermark"] = nuevo_watermark if resumen["fallidos"] == 0 else desde
+    return resumen
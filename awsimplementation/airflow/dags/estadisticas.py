@@ -0,0 +1,67 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pandas as pd
+
+# Campos que se agregan en el reporte estadístico
+CAMPOS_ESTADISTICOS = ("tipo_incidente", "nivel_urgencia", "ubicacion", "estado", "tipo_usuario")
+
+
+def _tabla_por_hilo(nombre_tabla):
+    # Los resources de boto3 no son thread-safe: una sesión por segmento
+    return boto3.session.Session().resource("dynamodb").Table(nombre_tabla)
+
+
+def escanear_segmento(table, segmento, total_segmentos, campos=CAMPOS_ESTADISTICOS):
+    # Recorre un segmento página a página acumulando conteos; nunca guarda los items
+    conteos = {campo: Counter() for campo in campos}
+    total = 0
+    nombres = {f"#c{i}": campo for i, campo in enumerate(campos)}
+    kwargs = {
+        "Segment": segmento,
+        "TotalSegments": total_segmentos,
+        "ProjectionExpression": ", ".join(nombres),
+        "ExpressionAttributeNames": nombres
+    }
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get("Items", []):
+            total += 1
+            for campo in campos:
+                conteos[campo][item.get(campo, "sin dato")] += 1
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return total, conteos
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def agregar_estadisticas(nombre_tabla, total_segmentos=8, max_workers=8,
+                         campos=CAMPOS_ESTADISTICOS, tabla_factory=None):
+    # Scan paralelo segmentado; cada segmento devuelve solo sus conteos
+    tabla_factory = tabla_factory or _tabla_por_hilo
+
+    def escanear(segmento):
+        return escanear_segmento(tabla_factory(nombre_tabla), segmento, total_segmentos, campos)
+
+    total = 0
+    conteos = {campo: Counter() for campo in campos}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total_segmentos))) as executor:
+        for total_segmento, conteos_segmento in executor.map(escanear, range(total_segmentos)):
+            total += total_segmento
+            for campo in campos:
+                conteos[campo].update(conteos_segmento[campo])
+
+    return {"total": total, "conteos": conteos}
+
+
+def estadisticas_a_excel(estadisticas, filename):
+    # Una hoja de resumen y una hoja por campo con conteo y porcentaje
+    total = estadisticas["total"]
+    with pd.ExcelWriter(filename, engine="openpyxl") as writer:
+        pd.DataFrame([{"total_reportes": total}]).to_excel(writer, sheet_name="Resumen", index=False)
+        for campo, conteo in estadisticas["conteos"].items():
+            df = pd.DataFrame(conteo.most_common(), columns=[campo, "cantidad"])
+            df["porcentaje"] = (df["cantidad"] / total * 100).round(2) if total else 0.0
+            df.to_excel(writer, sheet_name=campo[:31], index=False)
+    return filename
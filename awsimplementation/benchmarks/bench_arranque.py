@@ -0,0 +1,153 @@
+"""Benchmark de arranque: tiempo de import y latencia de la primera llamada por handler.
+
+Cada medición corre en un proceso nuevo (cold start real del intérprete). Las llamadas
+a AWS se responden localmente con un hook ``before-send`` de botocore, así que se mide
+la construcción real de clientes/recursos y la serialización, sin red.
+
+Uso (correr en el commit "antes" y en el "después" y comparar)::
+
+    python benchmarks/bench_arranque.py --out antes.json
+    python benchmarks/bench_arranque.py --out despues.json --compare antes.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYER_DIR = os.path.join(BASE_DIR, "layer", "python")
+
+WS_CONTEXT = {"connectionId": "bench-conn", "domainName": "ws.local", "stage": "dev"}
+
+EVENTOS = {
+    "CrearReporte": {
+        "body": json.dumps({
+            "tipo_incidente": "Robo", "ubicacion": "Edificio A",
+            "tipo_usuario": "Estudiante", "descripcion": "Robo de laptop"
+        }),
+        "requestContext": WS_CONTEXT
+    },
+    "ListarReportes": {"queryStringParameters": {"tenant_id": "utec"}},
+    "ObtenerReporte": {"pathParameters": {"uuid": "bench"}, "queryStringParameters": {"tenant_id": "utec"}},
+    "EliminarReporte": {"pathParameters": {"uuid": "bench"}, "queryStringParameters": {"tenant_id": "utec"}},
+    "LoginUsuario": {"body": json.dumps({"email": "a@utec.edu.pe", "password": "secreto"})},
+    "LoginAdmin": {"body": json.dumps({"email": "a@utec.edu.pe", "password": "secreto"})},
+    "RegistroUsuario": {"body": json.dumps({"email": "a@utec.edu.pe", "password": "secreto", "nombre": "A"})},
+    "RegistroAdmin": {"body": json.dumps({"email": "a@utec.edu.pe", "password": "secreto", "nombre": "A"})},
+    "connect": {"requestContext": WS_CONTEXT},
+    "default": {"requestContext": WS_CONTEXT, "body": json.dumps({"action": "getIncidents"})},
+    "disconnect": {"requestContext": WS_CONTEXT},
+}
+
+
+class _Raw:
+    def __init__(self, data):
+        self._data = data
+
+    def stream(self, **kwargs):
+        yield self._data
+
+
+def _instalar_stub_aws():
+    # Responde todas las llamadas a AWS en proceso, sin red
+    import boto3
+    from botocore.awsrequest import AWSResponse
+
+    def responder(request, **kwargs):
+        target = request.headers.get("X-Amz-Target", b"")
+        if isinstance(target, bytes):
+            target = target.decode()
+        if target.endswith((".Query", ".Scan")):
+            data = b'{"Items": [], "Count": 0, "ScannedCount": 0}'
+        else:
+            data = b"{}"
+        return AWSResponse(request.url, 200, {}, _Raw(data))
+
+    boto3.setup_default_session()
+    boto3.DEFAULT_SESSION.events.register("before-send", responder)
+
+
+def medir(nombre):
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    os.environ.setdefault("TOKEN_SECRET", "bench-secret")
+    sys.path[:0] = [BASE_DIR, LAYER_DIR]
+    _instalar_stub_aws()
+
+    # Token de admin para que los handlers protegidos recorran su camino completo
+    from tokens import emitir_token
+    token, _ = emitir_token("bench@utec.edu.pe", "admin")
+    evento = dict(EVENTOS[nombre], headers={"Authorization": f"Bearer {token}"})
+
+    import contextlib
+    import importlib
+    import io
+
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nombre)
+    import_ms = (time.perf_counter() - inicio) * 1000
+
+    llamadas = []
+    for _ in range(2):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            modulo.lambda_handler(json.loads(json.dumps(evento)), None)
+            llamadas.append((time.perf_counter() - inicio) * 1000)
+
+    return {"import_ms": import_ms, "primera_llamada_ms": llamadas[0], "llamada_warm_ms": llamadas[1]}
+
+
+def correr(repeticiones):
+    resultados = {}
+    for nombre in EVENTOS:
+        muestras = []
+        for _ in range(repeticiones):
+            salida = subprocess.run(
+                [sys.executable, __file__, "--handler", nombre],
+                capture_output=True, text=True, check=True
+            )
+            muestras.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+        resultados[nombre] = {
+            clave: round(statistics.median(m[clave] for m in muestras), 3)
+            for clave in muestras[0]
+        }
+    return resultados
+
+
+def imprimir(resultados, anterior=None):
+    print(f"{'handler':<18}{'import_ms':>12}{'primera_ms':>12}{'warm_ms':>10}")
+    for nombre, r in resultados.items():
+        fila = f"{nombre:<18}{r['import_ms']:>12.2f}{r['primera_llamada_ms']:>12.2f}{r['llamada_warm_ms']:>10.2f}"
+        if anterior and nombre in anterior:
+            a = anterior[nombre]
+            total = r["import_ms"] + r["primera_llamada_ms"]
+            total_antes = a["import_ms"] + a["primera_llamada_ms"]
+            fila += f"   cold total {total_antes:.2f} -> {total:.2f} ms"
+        print(fila)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--handler")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    if args.handler:
+        print(json.dumps(medir(args.handler)))
+        sys.exit(0)
+
+    resultados = correr(args.repeticiones)
+    anterior = None
+    if args.compare:
+        with open(args.compare) as f:
+            anterior = json.load(f)["handlers"]
+    imprimir(resultados, anterior)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"handlers": resultados}, f, indent=2)
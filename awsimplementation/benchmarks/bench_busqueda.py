@@ -0,0 +1,119 @@
+"""Benchmark del índice de búsqueda (``layer/python/busqueda.py``) con 100k/300k reportes.
+
+Las descripciones se arman con frases y un vocabulario de incidentes del campus (con y sin
+tildes, singular y plural) para que los postings tengan tamaños realistas: unos pocos
+términos muy frecuentes ("robo", "edificio") y una cola larga. Mide la construcción, el
+tamaño y la carga del snapshot comprimido (el arranque en frío), la aplicación de un delta
+y la latencia p50/p95 de consultas de uno y varios términos, de la primera página y de
+páginas siguientes.
+
+Uso::
+
+    python benchmarks/bench_busqueda.py --reportes 100000 300000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(BASE_DIR, "layer", "python"), os.path.dirname(os.path.abspath(__file__))]
+
+from busqueda import IndiceInvertido  # noqa: E402
+from dynamodb_local import TIPOS_INCIDENTE, UBICACIONES  # noqa: E402
+
+LUGARES = UBICACIONES + [f"{lugar} {piso}" for lugar in ("Laboratorio", "Aula", "Biblioteca") for piso in range(1, 9)] + [
+    "Cafetería", "Estacionamiento", "Coliseo", "Auditorio", "Patio central"]
+SUJETOS = ["mochila", "laptop", "celular", "billetera", "bicicleta", "casco", "proyector", "computadora",
+           "llaves", "cables", "tubería", "ventana", "puerta", "vidrio", "ascensor", "escalera", "extintor"]
+ACCIONES = ["robaron", "rompieron", "se perdió", "encontraron", "dejaron abierta", "está dañada", "no funciona",
+            "gotea", "sale humo de", "huele a quemado en", "se cayó", "bloquearon"]
+DETALLES = ["en la noche", "durante la clase", "en el baño", "cerca de la entrada", "en el segundo piso",
+            "al costado del ascensor", "sin vigilancia", "urgente", "hay un herido", "otra vez", "desde ayer",
+            "persona sospechosa", "con mucha gente", "sin luz", "alarma sonando"]
+CONSULTAS = ["robo", "mochila", "robo edificio", "mochila pabellon", "laptop robada biblioteca",
+             "fuga agua baño", "humo cafeteria alarma", "celulares perdidos estacionamiento noche", "xyz"]
+
+
+def reporte(i, rng):
+    partes = [rng.choice(ACCIONES), rng.choice(SUJETOS), rng.choice(DETALLES)]
+    if rng.random() < 0.5:
+        partes += [rng.choice(SUJETOS) + "s", rng.choice(DETALLES)]
+    return {
+        "uuid": f"{i:08d}-0000-4000-8000-000000000000",
+        "tipo_incidente": rng.choice(TIPOS_INCIDENTE),
+        "ubicacion": rng.choice(LUGARES),
+        "descripcion": " ".join(partes).capitalize()
+    }
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def latencias(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return percentil(tiempos, 50), percentil(tiempos, 95)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reportes", type=int, nargs="+", default=[100_000, 300_000])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--delta", type=int, default=200, help="altas/bajas aplicadas después del snapshot")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    resultados = []
+    for n in args.reportes:
+        rng = random.Random(n)
+        indice = IndiceInvertido()
+        inicio = time.perf_counter()
+        for i in range(n):
+            indice.agregar(reporte(i, rng))
+        construccion = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        datos = indice.a_bytes(tenant_id="bench")
+        guardado = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        indice = IndiceInvertido.desde_bytes(datos)
+        carga = time.perf_counter() - inicio
+
+        # Delta como el que aplica sincronizar(): la mitad altas, la mitad bajas
+        inicio = time.perf_counter()
+        for i in range(args.delta // 2):
+            indice.agregar(reporte(n + i, rng))
+            indice.eliminar(f"{i * 7:08d}-0000-4000-8000-000000000000")
+        delta = (time.perf_counter() - inicio) * 1000
+
+        print(f"\n== {n:,} reportes: construcción {construccion:.1f} s, snapshot {len(datos) / 1024:,.0f} KB "
+              f"(guardar {guardado * 1000:.0f} ms, cargar {carga * 1000:.0f} ms), delta de {args.delta} en {delta:.1f} ms")
+        print(f"{'consulta':<42} {'total':>8} {'p50 ms':>8} {'p95 ms':>8} {'pág. 5 p95':>11} {'total ms':>9}")
+
+        consultas = []
+        for consulta in CONSULTAS:
+            # La primera búsqueda arma los mapas doc -> impacto; después quedan cacheados
+            indice.buscar(consulta, 21)
+            p50, p95 = latencias(lambda: indice.buscar(consulta, 21), args.repeticiones)
+            _, p95_pagina = latencias(lambda: indice.buscar(consulta, 21, 80), args.repeticiones)
+            _, p95_total = latencias(lambda: indice.total(consulta), 5)
+            total = indice.total(consulta)
+            consultas.append({"consulta": consulta, "total": total, "p50_ms": round(p50, 2), "p95_ms": round(p95, 2),
+                              "pagina_5_p95_ms": round(p95_pagina, 2), "total_p95_ms": round(p95_total, 2)})
+            print(f"{consulta:<42} {total:>8,} {p50:>8.2f} {p95:>8.2f} {p95_pagina:>11.2f} {p95_total:>9.2f}")
+
+        resultados.append({"reportes": n, "construccion_s": round(construccion, 2), "snapshot_bytes": len(datos),
+                           "guardar_ms": round(guardado * 1000, 1), "cargar_ms": round(carga * 1000, 1),
+                           "delta_ms": round(delta, 2), "consultas": consultas})
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"parametros": vars(args), "resultados": resultados}, f, indent=2)
@@ -0,0 +1,121 @@
+"""Benchmark del clasificador de urgencia sobre N descripciones sintéticas.
+
+Compara la regla original del DAG (diccionario + ``"urgente" in descripcion``, registro a
+registro), un bucle ingenuo que busca cada palabra clave por separado, el motor compilado
+(``layer/python/clasificador.py``) llamado por registro y su versión vectorizada con
+pandas. Verifica que las dos variantes del motor den el mismo resultado.
+
+Referencia (100k descripciones, Python 3.11, pandas 3.0, NumPy 2.4, un núcleo): el motor
+vectorizado rinde ~200k desc/s contra ~148k del motor por registro, unas 1.4 veces más.
+
+Uso::
+
+    python benchmarks/bench_clasificador.py --descripciones 100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(BASE_DIR, "layer", "python"), os.path.dirname(os.path.abspath(__file__))]
+
+import pandas as pd  # noqa: E402
+from clasificador import Clasificador, plegar  # noqa: E402
+from dynamodb_local import DESCRIPCIONES, TIPOS_INCIDENTE, UBICACIONES  # noqa: E402
+
+# Fragmentos con y sin tildes/mayúsculas para ejercitar el plegado
+FRAGMENTOS = [
+    "", "URGENTE", "hay humo", "Emergéncia en curso", "un herido leve", "fuga de gas",
+    "pelea entre alumnos", "se escucha una amenaza", "cortocircuito en el tablero", "Sangre en el piso",
+]
+UBICACIONES_BENCH = UBICACIONES + ["Laboratorio de Química", "Almacén de químicos"]
+
+LEGADO = {"Robo": "Alta", "Accidente": "Alta", "Acoso": "Alta", "Daño a propiedad": "Media", "Otro": "Baja"}
+
+
+def datos(n, semilla=7):
+    rnd = random.Random(semilla)
+    return pd.DataFrame({
+        "tipo_incidente": [rnd.choice(TIPOS_INCIDENTE) for _ in range(n)],
+        "descripcion": [f"{rnd.choice(DESCRIPCIONES)}. {rnd.choice(FRAGMENTOS)} #{i}" for i in range(n)],
+        "ubicacion": [rnd.choice(UBICACIONES_BENCH) for _ in range(n)],
+    })
+
+
+def legado(df):
+    niveles = []
+    for tipo, descripcion in zip(df["tipo_incidente"], df["descripcion"]):
+        nivel = LEGADO.get(tipo, "Baja")
+        if "urgente" in (descripcion or "").lower():
+            nivel = "Alta"
+        niveles.append(nivel)
+    return niveles
+
+
+def ingenuo(clasificador, df):
+    # Misma regla que el motor, pero una búsqueda de subcadena por palabra clave y registro
+    niveles = []
+    for tipo, descripcion, ubicacion in zip(df["tipo_incidente"], df["descripcion"], df["ubicacion"]):
+        texto = plegar(descripcion)
+        puntaje = clasificador.tipos.get(tipo, clasificador.tipo_default)
+        puntaje += sum(peso for palabra, peso in clasificador.pesos.items() if palabra in texto)
+        indice = max(0, min(len(clasificador.niveles) - 1, puntaje))
+        lugar = plegar(ubicacion)
+        for nombre, minimo in clasificador.minimos_ubicacion.items():
+            if nombre in lugar:
+                indice = max(indice, minimo)
+        niveles.append(clasificador.niveles[indice])
+    return niveles
+
+
+def motor_por_registro(clasificador, df):
+    return [clasificador.clasificar(t, d, u)
+            for t, d, u in zip(df["tipo_incidente"], df["descripcion"], df["ubicacion"])]
+
+
+def motor_vectorizado(clasificador, df):
+    return list(clasificador.clasificar_series(df["tipo_incidente"], df["descripcion"], df["ubicacion"]))
+
+
+def medir(nombre, funcion, total, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    segundos = min(tiempos)
+    print(f"{nombre:<20} {segundos:>8.3f} s   {total / segundos:>12,.0f} desc/s")
+    return resultado, {"segundos": round(segundos, 4), "por_segundo": round(total / segundos)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--descripciones", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--reglas", help="archivo de reglas (por defecto reglas_urgencia.json)")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    df = datos(args.descripciones)
+    inicio = time.perf_counter()
+    clasificador = Clasificador.desde_archivo(args.reglas)
+    print(f"reglas compiladas en {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    n, r = args.descripciones, args.repeticiones
+    _, m_legado = medir("legado", lambda: legado(df), n, r)
+    _, m_ingenuo = medir("ingenuo", lambda: ingenuo(clasificador, df), n, r)
+    escalar, m_escalar = medir("motor_por_registro", lambda: motor_por_registro(clasificador, df), n, r)
+    vectorizado, m_vector = medir("motor_vectorizado", lambda: motor_vectorizado(clasificador, df), n, r)
+
+    iguales = escalar == vectorizado
+    print(f"resultados iguales (por registro vs vectorizado): {iguales}")
+    print(f"distribución: {pd.Series(vectorizado).value_counts().to_dict()}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"parametros": vars(args), "legado": m_legado, "ingenuo": m_ingenuo,
+                       "motor_por_registro": m_escalar, "motor_vectorizado": m_vector,
+                       "resultados_iguales": iguales}, f, indent=2)
@@ -0,0 +1,151 @@
+"""Calidad y costo de la detección de casi-duplicados (``layer/python/duplicados.py``).
+
+Genera incidentes base y, para cada uno, variantes como las que escriben distintos
+alumnos (typos, sin tildes, palabras reordenadas o agregadas, mayúsculas) más reportes
+distintos del mismo tipo y ubicación. Los buckets LSH se simulan con un dict en memoria
+(la misma clave que en la tabla de firmas), así que mide solo la parte de CPU y cuenta
+las claves que se leerían por chequeo, que es constante (``BANDAS``).
+
+Reporta recall (variantes detectadas), falsos positivos (distintos marcados como
+duplicados) y el tiempo de ``firmar`` + búsqueda por reporte.
+
+Uso::
+
+    python benchmarks/bench_duplicados.py --incidentes 200 --variantes 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(BASE_DIR, "layer", "python"), os.path.dirname(os.path.abspath(__file__))]
+
+import duplicados  # noqa: E402
+from duplicados import claves_bandas, firmar, similitud  # noqa: E402
+
+LUGARES = ["Pabellón A", "Pabellón B", "Edificio C", "Biblioteca", "Cafetería"]
+TIPOS = ["Incendio", "Robo", "Fuga de agua", "Accidente"]
+SUJETOS = ["la alarma de incendio", "humo", "una fuga de agua", "un cable pelado", "una persona herida",
+           "vidrios rotos", "un olor a gas", "la puerta de emergencia", "el ascensor", "una laptop"]
+VERBOS = ["suena", "sale", "hay", "se ve", "está bloqueada", "no funciona", "se cayó", "robaron"]
+LUGARES_FINOS = ["en el segundo piso", "en el baño de hombres", "cerca de la escalera", "en el aula 301",
+                 "junto al ascensor", "en la entrada principal", "en el laboratorio de química"]
+RELLENO = ["por favor", "urgente", "ayuda", "ahora mismo", "otra vez", "hace 5 minutos", "!!"]
+SIN_TILDE = str.maketrans("áéíóú", "aeiou")
+
+
+def incidente(rng, sujeto=None, lugar=None):
+    sujeto = sujeto or rng.choice(SUJETOS)
+    lugar = lugar or rng.choice(LUGARES_FINOS)
+    return f"{rng.choice(VERBOS)} {sujeto} {lugar}", sujeto, lugar
+
+
+def otro_incidente(rng, sujeto, lugar):
+    # Distinto de verdad: otro sujeto y otro lugar dentro del mismo tipo y ubicación
+    return incidente(rng, rng.choice([s for s in SUJETOS if s != sujeto]),
+                     rng.choice([l for l in LUGARES_FINOS if l != lugar]))[0]
+
+
+def variante(texto, rng):
+    palabras = texto.split()
+    if rng.random() < 0.5 and len(palabras) > 3:
+        i = rng.randrange(len(palabras) - 1)
+        palabras[i], palabras[i + 1] = palabras[i + 1], palabras[i]
+    if rng.random() < 0.5:
+        palabras.insert(rng.randrange(len(palabras) + 1), rng.choice(RELLENO))
+    if rng.random() < 0.5:
+        i = rng.randrange(len(palabras))
+        if len(palabras[i]) > 3:
+            j = rng.randrange(len(palabras[i]) - 1)
+            palabras[i] = palabras[i][:j] + palabras[i][j + 1] + palabras[i][j] + palabras[i][j + 2:]
+    texto = " ".join(palabras)
+    if rng.random() < 0.5:
+        texto = texto.translate(SIN_TILDE)
+    return texto.upper() if rng.random() < 0.1 else texto
+
+
+class IndiceMemoria:
+    """Buckets LSH en un dict: clave -> (uuid, firma), como la tabla de firmas."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lecturas = 0
+
+    def buscar(self, reporte, firma):
+        claves = claves_bandas(reporte, firma)
+        self.lecturas += len(claves)
+        mejor, mejor_similitud = None, duplicados.UMBRAL
+        for clave in claves:
+            candidato = self.buckets.get(clave)
+            if candidato and similitud(firma, candidato[1]) >= mejor_similitud:
+                mejor, mejor_similitud = candidato[0], similitud(firma, candidato[1])
+        return mejor
+
+    def registrar(self, reporte, firma):
+        for clave in claves_bandas(reporte, firma):
+            self.buckets[clave] = (reporte["uuid"], firma)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incidentes", type=int, default=200)
+    parser.add_argument("--variantes", type=int, default=10, help="reportes parecidos por incidente")
+    parser.add_argument("--distintos", type=int, default=3, help="reportes distintos con el mismo tipo y lugar")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    indice = IndiceMemoria()
+    detectados = perdidos = falsos = 0
+    tiempos = []
+
+    def procesar(reporte):
+        inicio = time.perf_counter()
+        firma = firmar(reporte["descripcion"])
+        padre = indice.buscar(reporte, firma)
+        if padre is None:
+            indice.registrar(reporte, firma)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        return padre
+
+    for n in range(args.incidentes):
+        # Cada incidente en su propia ubicación: en producción dos incidentes con el mismo
+        # tipo y lugar suelen caer en ventanas distintas
+        texto, sujeto, lugar = incidente(rng)
+        base = {"uuid": f"base-{n}", "tipo_incidente": rng.choice(TIPOS),
+                "ubicacion": f"{rng.choice(LUGARES)} {n}", "descripcion": texto}
+        if procesar(base) is not None:
+            falsos += 1
+        for v in range(args.variantes):
+            padre = procesar(dict(base, uuid=f"var-{n}-{v}", descripcion=variante(base["descripcion"], rng)))
+            if padre is None:
+                perdidos += 1
+            else:
+                detectados += 1
+        for d in range(args.distintos):
+            if procesar(dict(base, uuid=f"otro-{n}-{d}", descripcion=otro_incidente(rng, sujeto, lugar))):
+                falsos += 1
+
+    tiempos.sort()
+    total_variantes = args.incidentes * args.variantes
+    resultado = {
+        "recall": round(detectados / max(total_variantes, 1), 3),
+        "variantes_perdidas": perdidos,
+        "falsos_positivos": falsos,
+        "reportes": len(tiempos),
+        "claves_por_chequeo": indice.lecturas / max(len(tiempos), 1),
+        "p50_ms": round(tiempos[len(tiempos) // 2], 3),
+        "p95_ms": round(tiempos[int(len(tiempos) * 0.95)], 3),
+    }
+    print(f"umbral {duplicados.UMBRAL}, {duplicados.BANDAS} bandas x {duplicados.FILAS} filas, "
+          f"shingles de {duplicados.SHINGLE} caracteres")
+    for clave, valor in resultado.items():
+        print(f"{clave:>20}: {valor}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"parametros": vars(args), "resultado": resultado}, f, indent=2)
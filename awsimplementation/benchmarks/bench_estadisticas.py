@@ -0,0 +1,82 @@
+"""Benchmark del reporte estadístico de Airflow contra una tabla local de N reportes.
+
+Compara el enfoque ingenuo (scan secuencial que materializa todos los items en un
+DataFrame) con el scan paralelo segmentado que agrega página a página
+(``airflow/dags/estadisticas.py``). Mide tiempo total y pico de memoria (tracemalloc).
+
+Uso::
+
+    python benchmarks/bench_estadisticas.py --reportes 1000000 --segmentos 8 --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(BASE_DIR, "airflow", "dags"), os.path.dirname(os.path.abspath(__file__))]
+
+import pandas as pd  # noqa: E402
+from dynamodb_local import TablaSintetica  # noqa: E402
+from estadisticas import CAMPOS_ESTADISTICOS, agregar_estadisticas  # noqa: E402
+
+
+def secuencial_materializado(tabla):
+    items = []
+    kwargs = {}
+    while True:
+        response = tabla.scan(**kwargs)
+        items.extend(response["Items"])
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    df = pd.DataFrame(items)
+    return {"total": len(df), "conteos": {c: dict(df[c].value_counts()) for c in CAMPOS_ESTADISTICOS}}
+
+
+def paralelo_streaming(tabla, segmentos, workers):
+    estadisticas = agregar_estadisticas(
+        "bench", total_segmentos=segmentos, max_workers=workers, tabla_factory=lambda nombre: tabla
+    )
+    return {"total": estadisticas["total"], "conteos": {c: dict(v) for c, v in estadisticas["conteos"].items()}}
+
+
+def medir(nombre, funcion):
+    # Tiempo sin tracemalloc (distorsiona el tiempo) y pico de memoria en una segunda pasada
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{nombre:<26} {segundos:>8.2f} s   pico {pico / 2**20:>8.1f} MiB   {resultado['total']} reportes")
+    return resultado, {"segundos": round(segundos, 3), "pico_mib": round(pico / 2**20, 1)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reportes", type=int, default=1_000_000)
+    parser.add_argument("--segmentos", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latencia", type=float, default=0.02, help="segundos por página simulados")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    tabla = TablaSintetica(args.reportes, latencia_pagina=args.latencia)
+    base, m_base = medir("secuencial_materializado", lambda: secuencial_materializado(tabla))
+    nuevo, m_nuevo = medir("paralelo_streaming", lambda: paralelo_streaming(tabla, args.segmentos, args.workers))
+
+    iguales = base["total"] == nuevo["total"] and all(
+        {k: int(v) for k, v in base["conteos"][c].items()} == nuevo["conteos"][c] for c in CAMPOS_ESTADISTICOS
+    )
+    print(f"conteos iguales: {iguales}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"parametros": vars(args), "secuencial_materializado": m_base,
+                       "paralelo_streaming": m_nuevo, "conteos_iguales": iguales}, f, indent=2)
@@ -0,0 +1,456 @@
+"""Benchmark de carga de todos los ``lambda_handler`` contra DynamoDB local.
+
+Cada handler se invoca N veces en proceso (un contenedor "warm") sobre datos sintéticos:
+tenants, reportes, conexiones WebSocket y cuentas. DynamoDB es moto (en memoria) o
+DynamoDB Local con ``--endpoint-url``; las tablas salen de ``serverless.yml``. El
+``apigatewaymanagementapi`` es un doble con latencia y tasas de fallo inyectables.
+
+Por escenario se reportan p50/p95/p99, throughput, errores, llamadas a DynamoDB por
+invocación (por operación) y mensajes WebSocket enviados. Los resultados se guardan en
+JSON para comparar entre commits::
+
+    pip install moto pyyaml
+    python benchmarks/bench_handlers.py --out antes.json
+    python benchmarks/bench_handlers.py --out despues.json --compare antes.json
+
+``--latencia-dynamo`` suma una espera fija por llamada (p. ej. 5 ms) para acercar los
+tiempos a los de AWS; las llamadas por invocación no dependen de ella.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [BASE_DIR, os.path.join(BASE_DIR, "layer", "python"), BENCH_DIR]
+
+STAGE = "dev"
+ENTORNO = {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "bench",
+    "AWS_SECRET_ACCESS_KEY": "bench",
+    "TABLE_NAME": f"{STAGE}-t_reportes",
+    "TOMBSTONES_TABLE": f"{STAGE}-t_reportes_eliminados",
+    "COUNTERS_TABLE": f"{STAGE}-t_reportes_contadores",
+    "SIGNATURES_TABLE": f"{STAGE}-t_reportes_firmas",
+    "CONNECTIONS_TABLE": "Connections",
+    "WS_ENDPOINT": "https://ws.local/dev",
+    "TOKEN_SECRET": "bench-secret",
+}
+PASSWORD = "secreto123"
+
+
+class GoneException(Exception):
+    pass
+
+
+class ApiFalsa:
+    """Doble de ``apigatewaymanagementapi`` con latencia y fallos inyectables."""
+
+    class exceptions:
+        GoneException = GoneException
+
+    def __init__(self, latencia=0.0, tasa_gone=0.0, tasa_error=0.0, semilla=1):
+        self.latencia = latencia
+        self.tasa_gone = tasa_gone
+        self.tasa_error = tasa_error
+        self._random = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.enviados = 0
+        self.fallidos = 0
+
+    def post_to_connection(self, ConnectionId, Data):
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self._lock:
+            sorteo = self._random.random()
+            if sorteo < self.tasa_gone:
+                self.fallidos += 1
+                raise GoneException(ConnectionId)
+            if sorteo < self.tasa_gone + self.tasa_error:
+                self.fallidos += 1
+                raise RuntimeError("Fallo inyectado")
+            self.enviados += 1
+        return {}
+
+
+class ContadorDynamo:
+    """Cuenta las llamadas a DynamoDB por operación (hook ``before-call`` de botocore)."""
+
+    def __init__(self, latencia=0.0):
+        self.latencia = latencia
+        self.llamadas = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, model, **kwargs):
+        with self._lock:
+            self.llamadas[model.name] += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def reiniciar(self):
+        with self._lock:
+            llamadas, self.llamadas = self.llamadas, Counter()
+        return llamadas
+
+
+class _Contexto:
+    # Lo mínimo de un context de Lambda que usan los handlers
+    def get_remaining_time_in_millis(self):
+        return 30000
+
+
+# ---------------------------------------------------------------------------
+# Datos sintéticos
+
+
+def sembrar(dynamodb, tenants, reportes, conexiones, cuentas, semilla):
+    from dynamodb_local import reporte_sintetico
+
+    from cambios import construir_lapida
+    from contadores import aplicar, deltas
+    from runtime import tabla_contadores
+    from triage import campos_triage
+
+    rnd = random.Random(semilla)
+    ahora = int(time.time() * 1000)
+    datos = {"tenants": tenants, "uuids": {}, "conexiones": {}, "usuarios": [], "admins": []}
+
+    tabla = dynamodb.Table(ENTORNO["TABLE_NAME"])
+    todos = []
+    with tabla.batch_writer() as batch:
+        for tenant_id in tenants:
+            uuids = []
+            for i in range(reportes):
+                reporte = reporte_sintetico(i, tenant_id)
+                # Timestamps recientes: dentro de la retención de lápidas del sync incremental
+                reporte["creado_en"] = reporte["actualizado_en"] = ahora - (reportes - i) * 1000
+                reporte.update(campos_triage(reporte))
+                batch.put_item(Item=reporte)
+                uuids.append(reporte["uuid"])
+                todos.append(reporte)
+            datos["uuids"][tenant_id] = uuids
+    aplicar(tabla_contadores(), deltas(todos))
+
+    with dynamodb.Table(ENTORNO["TOMBSTONES_TABLE"]).batch_writer() as batch:
+        for tenant_id in tenants:
+            for i in range(max(1, reportes // 100)):
+                batch.put_item(Item=construir_lapida(tenant_id, f"borrado-{i:06d}", 2, ahora - i * 1000))
+
+    topicos = ["nivel_urgencia:alta", "tipo_incidente:robo", "nivel_urgencia:media"]
+    with dynamodb.Table(ENTORNO["CONNECTIONS_TABLE"]).batch_writer() as batch:
+        for tenant_id in tenants:
+            ids = []
+            for i in range(conexiones):
+                item = {"connectionId": f"conn-{tenant_id}-{i:05d}", "tenant_id": tenant_id, "username": "Anon"}
+                # La mitad con suscripción por tópicos, la otra mitad recibe todo
+                if i % 2:
+                    item["topics"] = {rnd.choice(topicos)}
+                batch.put_item(Item=item)
+                ids.append(item["connectionId"])
+            datos["conexiones"][tenant_id] = ids
+
+    for rol, tabla_cuentas in (("usuario", "usuarios"), ("admin", "admins")):
+        with dynamodb.Table(tabla_cuentas).batch_writer() as batch:
+            for i in range(cuentas):
+                email = f"{rol}{i:05d}@utec.edu.pe"
+                batch.put_item(Item={"email": email, "password": PASSWORD, "nombre": f"{rol} {i}"})
+                datos[f"{rol}s"].append(email)
+    return datos
+
+
+# ---------------------------------------------------------------------------
+# Escenarios: (nombre, módulo, función i -> event). Los destructivos van al final y
+# consumen recursos distintos en cada invocación.
+
+
+def escenarios(datos, n, semilla):
+    from dynamodb_local import DESCRIPCIONES, TIPOS_INCIDENTE, UBICACIONES, registro_stream
+    from tokens import emitir_token
+
+    rnd = random.Random(semilla)
+    tenants = datos["tenants"]
+    token_usuario, _ = emitir_token(datos["usuarios"][0], "usuario")
+    token_admin, _ = emitir_token(datos["admins"][0], "admin")
+    auth_usuario = {"Authorization": f"Bearer {token_usuario}"}
+    auth_admin = {"Authorization": f"Bearer {token_admin}"}
+    # El WebSocket toma el tenant del token de $connect: uno por tenant
+    tokens_ws = {t: emitir_token(datos["admins"][0], "admin", tenant=t)[0] for t in tenants}
+    ws = {"domainName": "ws.local", "stage": STAGE}
+    corrida = f"{int(time.time())}"
+
+    def tenant(i):
+        return tenants[i % len(tenants)]
+
+    def uuid_existente(i):
+        uuids = datos["uuids"][tenant(i)]
+        return uuids[rnd.randrange(len(uuids) // 2)]
+
+    def nuevo_reporte(i):
+        return {
+            "tenant_id": tenant(i),
+            "tipo_incidente": rnd.choice(TIPOS_INCIDENTE),
+            "ubicacion": rnd.choice(UBICACIONES),
+            "tipo_usuario": "Estudiante",
+            "descripcion": rnd.choice(DESCRIPCIONES),
+        }
+
+    def ws_event(connection_id, **extra):
+        return {"requestContext": dict(ws, connectionId=connection_id), **extra}
+
+    # Reportes que solo se usan para los escenarios de borrado (segunda mitad de cada tenant)
+    a_eliminar = {t: list(reversed(datos["uuids"][t][len(datos["uuids"][t]) // 2:])) for t in tenants}
+
+    def tomar(i, cantidad=1):
+        pool = a_eliminar[tenant(i)]
+        return [pool.pop() for _ in range(min(cantidad, len(pool)))]
+
+    desde = int(time.time() * 1000) - 60 * 1000
+
+    def lote_stream(i, altas=20):
+        # Altas del tenant más un cambio de estado, como llegarían del stream de la tabla
+        reportes = [dict(nuevo_reporte(i), uuid=f"stream-{i}-{j}", nivel_urgencia="alta", estado="pendiente",
+                         version=1) for j in range(altas)]
+        records = [registro_stream("INSERT", r, secuencia=i * 100 + j) for j, r in enumerate(reportes)]
+        records.append(registro_stream("MODIFY", dict(reportes[0], estado="en_proceso", version=2), reportes[0],
+                                       secuencia=i * 100 + altas))
+        return {"Records": records}
+
+    return [
+        ("LoginUsuario", "LoginUsuario", lambda i: {
+            "body": json.dumps({"email": datos["usuarios"][i % len(datos["usuarios"])], "password": PASSWORD})}),
+        ("LoginAdmin", "LoginAdmin", lambda i: {
+            "body": json.dumps({"email": datos["admins"][i % len(datos["admins"])], "password": PASSWORD})}),
+        ("RegistroUsuario", "RegistroUsuario", lambda i: {"body": json.dumps({
+            "email": f"nuevo{corrida}{i}@utec.edu.pe", "password": PASSWORD, "nombre": "Nuevo"})}),
+        ("RegistroAdmin", "RegistroAdmin", lambda i: {"headers": auth_admin, "body": json.dumps({
+            "email": f"nuevoadmin{corrida}{i}@utec.edu.pe", "password": PASSWORD, "nombre": "Nuevo"})}),
+        ("ImportarCuentas", "ImportarCuentas", lambda i: {
+            "headers": auth_admin, "pathParameters": {"rol": "usuario"},
+            "body": json.dumps({"cuentas": [
+                {"email": f"imp{corrida}-{i}-{j}@utec.edu.pe", "password": PASSWORD, "nombre": "Imp"}
+                for j in range(100)]})}),
+        # Ubicación propia en cada invocación: ningún bucket de duplicados coincide y se mide
+        # siempre el alta completa. La ruta del duplicado va aparte.
+        ("CrearReporte", "CrearReporte", lambda i: {
+            "headers": auth_usuario, "requestContext": dict(ws, connectionId="bench"),
+            "body": json.dumps(dict(nuevo_reporte(i), ubicacion=f"{rnd.choice(UBICACIONES)} aula {corrida}-{i}"))}),
+        # El mismo incidente repetido por tenant: la primera invocación lo crea, el resto se adjunta
+        ("CrearReporte.duplicado", "CrearReporte", lambda i: {
+            "headers": auth_usuario, "requestContext": dict(ws, connectionId="bench"),
+            "body": json.dumps({"tenant_id": tenant(i), "tipo_incidente": "Incendio",
+                                "ubicacion": f"Edificio A {corrida}", "tipo_usuario": "Estudiante",
+                                "descripcion": "Suena la alarma de incendio en el segundo piso"})}),
+        ("CrearReportesLote", "CrearReportesLote", lambda i: {
+            "headers": auth_admin, "requestContext": dict(ws, connectionId="bench"),
+            "body": json.dumps({"reportes": [nuevo_reporte(i) for _ in range(25)]})}),
+        ("ListarReportes", "ListarReportes", lambda i: {
+            "headers": auth_usuario, "queryStringParameters": {"tenant_id": tenant(i), "limit": "50"}}),
+        # Vista de pendientes por su GSI contra un filtro sin índice (query del tenant + FilterExpression)
+        ("ListarReportes.pendientes", "ListarReportes", lambda i: {
+            "headers": auth_usuario,
+            "queryStringParameters": {"tenant_id": tenant(i), "limit": "50", "estado": "pendiente"}}),
+        ("ListarReportes.sinIndice", "ListarReportes", lambda i: {
+            "headers": auth_usuario,
+            "queryStringParameters": {"tenant_id": tenant(i), "limit": "50", "tipo_usuario": "Visitante"}}),
+        ("TopReportes", "TopReportes", lambda i: {
+            "headers": auth_admin, "queryStringParameters": {"tenant_id": tenant(i), "limit": "20"}}),
+        ("ObtenerReporte", "ObtenerReporte", lambda i: {
+            "headers": auth_usuario, "pathParameters": {"uuid": uuid_existente(i)},
+            "queryStringParameters": {"tenant_id": tenant(i)}}),
+        ("CambiosReportes", "CambiosReportes", lambda i: {
+            "headers": auth_usuario, "queryStringParameters": {"tenant_id": tenant(i), "since": str(desde)}}),
+        ("EstadisticasReportes", "EstadisticasReportes", lambda i: {
+            "headers": auth_usuario, "queryStringParameters": {"tenant_id": tenant(i)}}),
+        ("ActualizarEstado", "ActualizarEstado", lambda i: {
+            "headers": auth_admin, "pathParameters": {"uuid": uuid_existente(i)},
+            "body": json.dumps({"tenant_id": tenant(i), "estado": rnd.choice(["en_proceso", "resuelto"])})}),
+        ("connect", "connect", lambda i: ws_event(
+            f"bench-{corrida}-{i}",
+            queryStringParameters={"token": tokens_ws[tenant(i)], "topics": "nivel_urgencia:alta"})),
+        ("default.subscribe", "default", lambda i: ws_event(
+            f"bench-{corrida}-{i}",
+            body=json.dumps({"action": "subscribe", "topics": ["tipo_incidente:robo"]}))),
+        ("default.getIncidents", "default", lambda i: ws_event(
+            f"bench-{corrida}-{i}", body=json.dumps({"action": "getIncidents"}))),
+        ("default.getChanges", "default", lambda i: ws_event(
+            f"bench-{corrida}-{i}", body=json.dumps({"action": "getChanges", "since": desde}))),
+        ("default.getTop", "default", lambda i: ws_event(
+            f"bench-{corrida}-{i}", body=json.dumps({"action": "getTop", "limit": 20}))),
+        ("NotificarCambios", "NotificarCambios", lote_stream),
+        ("disconnect", "disconnect", lambda i: ws_event(f"bench-{corrida}-{i}")),
+        ("EliminarReporte", "EliminarReporte", lambda i: {
+            "headers": auth_admin, "pathParameters": {"uuid": (tomar(i) or ["no-existe"])[0]},
+            "queryStringParameters": {"tenant_id": tenant(i)}}),
+        ("EliminarReportesLote", "EliminarReportesLote", lambda i: {
+            "headers": auth_admin,
+            "body": json.dumps({"tenant_id": tenant(i), "uuids": tomar(i, 25) or ["no-existe"]})}),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Medición
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(ordenados) - 1)
+    return ordenados[f] + (ordenados[c] - ordenados[f]) * (k - f)
+
+
+def correr_escenario(modulo, crear_evento, n, contador, api):
+    handler = importlib.import_module(modulo).lambda_handler
+    contexto = _Contexto()
+    eventos = [crear_evento(i) for i in range(n)]
+    contador.reiniciar()
+    enviados_antes, fallidos_antes = api.enviados, api.fallidos
+
+    tiempos = []
+    errores = 0
+    inicio_total = time.perf_counter()
+    for event in eventos:
+        # Los prints/logs de los handlers (incluidos los fallos WebSocket inyectados) no se muestran
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            inicio = time.perf_counter()
+            try:
+                resultado = handler(event, contexto)
+                if (resultado or {}).get("statusCode", 200) >= 500:
+                    errores += 1
+            except Exception:
+                errores += 1
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    total_s = time.perf_counter() - inicio_total
+    llamadas = contador.reiniciar()
+
+    return {
+        "invocaciones": n,
+        "p50_ms": round(percentil(tiempos, 50), 3),
+        "p95_ms": round(percentil(tiempos, 95), 3),
+        "p99_ms": round(percentil(tiempos, 99), 3),
+        "max_ms": round(max(tiempos), 3),
+        "throughput_rps": round(n / total_s, 1),
+        "errores": errores,
+        "dynamodb_por_invocacion": round(sum(llamadas.values()) / n, 2),
+        "dynamodb_operaciones": {op: round(c / n, 2) for op, c in sorted(llamadas.items())},
+        "ws_enviados": api.enviados - enviados_antes,
+        "ws_fallidos": api.fallidos - fallidos_antes,
+    }
+
+
+def preparar(args):
+    for clave, valor in ENTORNO.items():
+        os.environ.setdefault(clave, valor)
+    if args.endpoint_url:
+        # boto3 >= 1.28 toma el endpoint por servicio del entorno
+        os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = args.endpoint_url
+        mock = None
+    else:
+        from moto import mock_aws
+        mock = mock_aws()
+        mock.start()
+
+    # Los hooks se registran en la sesión por defecto antes de que runtime cree sus clientes
+    import boto3
+    boto3.setup_default_session()
+    contador = ContadorDynamo(args.latencia_dynamo / 1000)
+    boto3.DEFAULT_SESSION.events.register("before-call.dynamodb", contador)
+
+    import runtime
+    api = ApiFalsa(args.latencia_ws / 1000, args.tasa_gone, args.tasa_error, args.semilla)
+    runtime.obtener_api = lambda endpoint: api
+
+    from dynamodb_local import crear_tablas
+    crear_tablas(boto3.client("dynamodb"), os.path.join(BASE_DIR, "serverless.yml"), STAGE)
+    datos = sembrar(boto3.resource("dynamodb"), [f"tenant{i}" for i in range(args.tenants)],
+                    args.reportes, args.conexiones, args.cuentas, args.semilla)
+    contador.reiniciar()
+    return contador, api, datos, mock
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultados, anterior=None, umbral=0.2):
+    regresiones = []
+    print(f"{'escenario':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}{'ddb/inv':>9}{'err':>5}")
+    for nombre, r in resultados.items():
+        fila = (f"{nombre:<22}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                f"{r['throughput_rps']:>9.1f}{r['dynamodb_por_invocacion']:>9.2f}{r['errores']:>5}")
+        a = (anterior or {}).get(nombre)
+        if a:
+            fila += f"   p95 {a['p95_ms']:.2f}->{r['p95_ms']:.2f}  ddb {a['dynamodb_por_invocacion']}->{r['dynamodb_por_invocacion']}"
+            if r["p95_ms"] > a["p95_ms"] * (1 + umbral) or r["dynamodb_por_invocacion"] > a["dynamodb_por_invocacion"]:
+                fila += "  ⚠️"
+                regresiones.append(nombre)
+        print(fila)
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invocaciones", type=int, default=200, help="por escenario")
+    parser.add_argument("--tenants", type=int, default=3)
+    parser.add_argument("--reportes", type=int, default=2000, help="por tenant")
+    parser.add_argument("--conexiones", type=int, default=50, help="conexiones WebSocket por tenant")
+    parser.add_argument("--cuentas", type=int, default=200, help="usuarios y admins sembrados")
+    parser.add_argument("--latencia-dynamo", type=float, default=0.0, help="ms extra por llamada a DynamoDB")
+    parser.add_argument("--latencia-ws", type=float, default=0.0, help="ms por post_to_connection")
+    parser.add_argument("--tasa-gone", type=float, default=0.0, help="fracción de posts con GoneException")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="fracción de posts con otro error")
+    parser.add_argument("--solo", help="escenarios separados por coma")
+    parser.add_argument("--endpoint-url", help="DynamoDB Local en vez de moto, p. ej. http://localhost:8000")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    parser.add_argument("--umbral", type=float, default=0.2, help="aumento relativo de p95 que cuenta como regresión")
+    parser.add_argument("--fallar-si-regresion", action="store_true")
+    args = parser.parse_args()
+
+    contador, api, datos, mock = preparar(args)
+    solo = set(args.solo.split(",")) if args.solo else None
+    resultados = {}
+    for nombre, modulo, crear_evento in escenarios(datos, args.invocaciones, args.semilla):
+        if solo and nombre not in solo:
+            continue
+        resultados[nombre] = correr_escenario(modulo, crear_evento, args.invocaciones, contador, api)
+    if mock:
+        mock.stop()
+
+    anterior = None
+    if args.compare:
+        with open(args.compare) as f:
+            anterior = json.load(f)["escenarios"]
+    regresiones = imprimir(resultados, anterior, args.umbral)
+
+    if args.out:
+        parametros = {k: v for k, v in vars(args).items() if k not in ("out", "compare", "fallar_si_regresion")}
+        with open(args.out, "w") as f:
+            json.dump({
+                "commit": commit_actual(),
+                "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "parametros": parametros,
+                "escenarios": resultados
+            }, f, indent=2)
+
+    if regresiones and args.fallar_si_regresion:
+        print(f"Regresiones: {', '.join(regresiones)}")
+        sys.exit(1)
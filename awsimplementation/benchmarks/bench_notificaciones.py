@@ -0,0 +1,170 @@
+"""Notificaciones desde el stream: reproducción de eventos grabados, latencia y ráfagas.
+
+1. Reproduce contra ``NotificarCambios`` los eventos de ``benchmarks/eventos/*.json``
+   (registros reales de DynamoDB Streams) y muestra qué frames recibe cada conexión.
+2. Mide la latencia de ``CrearReporte`` con 0, 100 y 1000 conexiones del tenant: como el
+   fan-out ya no está en la petición, debería ser la misma en los tres casos. Al lado se
+   muestra lo que tarda el consumidor del stream en difundir esa misma alta.
+3. Ráfaga (p. ej. una evacuación): N altas entregadas una por invocación (sin ventana)
+   contra un solo lote (ventana de batching), con los ``post_to_connection`` de cada caso.
+
+DynamoDB es moto y ``apigatewaymanagementapi`` el doble de ``bench_handlers``::
+
+    pip install moto pyyaml
+    python benchmarks/bench_notificaciones.py --latencia-ws 5
+    python benchmarks/bench_notificaciones.py --eventos benchmarks/eventos/stream_mixto.json
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_handlers import BASE_DIR, ENTORNO, STAGE, ApiFalsa, percentil  # noqa: E402
+
+
+class ApiGrabadora(ApiFalsa):
+    """``ApiFalsa`` que además guarda los frames enviados por conexión."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frames = []
+
+    def post_to_connection(self, ConnectionId, Data):
+        respuesta = super().post_to_connection(ConnectionId=ConnectionId, Data=Data)
+        with self._lock:
+            self.frames.append((ConnectionId, json.loads(Data)))
+        return respuesta
+
+
+def sembrar_conexiones(tabla, tenant_id, cantidad, prefijo="conn"):
+    with tabla.batch_writer() as batch:
+        for i in range(cantidad):
+            item = {"connectionId": f"{prefijo}-{tenant_id}-{i:05d}", "tenant_id": tenant_id}
+            # Una de cada cuatro solo quiere urgencia alta
+            if i % 4 == 3:
+                item["topics"] = {"nivel_urgencia:alta"}
+            batch.put_item(Item=item)
+
+
+def silencioso(funcion, *args):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return funcion(*args)
+
+
+def reproducir(rutas, api, handler):
+    for ruta in rutas:
+        with open(ruta, encoding="utf-8") as f:
+            evento = json.load(f)
+        api.frames.clear()
+        resultado = silencioso(handler, evento, None)
+        por_tipo = Counter(frame["type"] for _, frame in api.frames)
+        conexiones = len({cid for cid, _ in api.frames})
+        print(f"{os.path.basename(ruta):<22} {len(evento['Records']):>3} registros -> "
+              f"{resultado.get('eventos', 0)} eventos, {len(api.frames)} frames a {conexiones} conexiones "
+              f"{dict(por_tipo)}")
+
+
+def medir_alta(crear, notificar, tabla_conexiones, token, conexiones, invocaciones):
+    from dynamodb_local import registro_stream
+
+    sembrar_conexiones(tabla_conexiones, "latencia", conexiones, prefijo=f"lat{conexiones}")
+    tiempos_alta, tiempos_stream = [], []
+    for i in range(invocaciones):
+        # Ubicación distinta en cada alta: con el mismo body, desde la segunda sería un
+        # duplicado del primero (sin "reporte" en la respuesta ni alta en el stream)
+        body = json.dumps({"tenant_id": "latencia", "tipo_incidente": "Robo",
+                           "ubicacion": f"Edificio A aula {conexiones}-{i}",
+                           "tipo_usuario": "Estudiante", "descripcion": "Robo de laptop"})
+        inicio = time.perf_counter()
+        resultado = silencioso(crear, {"headers": {"Authorization": f"Bearer {token}"}, "body": body}, None)
+        tiempos_alta.append((time.perf_counter() - inicio) * 1000)
+
+        reporte = json.loads(resultado["body"])["reporte"]
+        inicio = time.perf_counter()
+        silencioso(notificar, {"Records": [registro_stream("INSERT", reporte, secuencia=i)]}, None)
+        tiempos_stream.append((time.perf_counter() - inicio) * 1000)
+
+    # Las conexiones de esta medición no cuentan en la siguiente
+    with tabla_conexiones.batch_writer() as batch:
+        for i in range(conexiones):
+            batch.delete_item(Key={"connectionId": f"lat{conexiones}-latencia-{i:05d}"})
+    return percentil(tiempos_alta, 50), percentil(tiempos_alta, 95), percentil(tiempos_stream, 50)
+
+
+def rafaga(notificar, api, altas):
+    from dynamodb_local import registro_stream, reporte_sintetico
+
+    records = [registro_stream("INSERT", reporte_sintetico(i), secuencia=i) for i in range(altas)]
+    antes = api.enviados
+    for record in records:
+        silencioso(notificar, {"Records": [record]}, None)
+    sin_ventana = api.enviados - antes
+
+    antes = api.enviados
+    resumen = silencioso(notificar, {"Records": records}, None)
+    return sin_ventana, api.enviados - antes, resumen.get("frames_ahorrados", 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--eventos", nargs="+", help="por defecto benchmarks/eventos/*.json")
+    parser.add_argument("--conexiones", type=int, nargs="+", default=[0, 100, 1000])
+    parser.add_argument("--invocaciones", type=int, default=30)
+    parser.add_argument("--latencia-ws", type=float, default=2.0, help="ms por post_to_connection")
+    parser.add_argument("--rafaga", type=int, default=50, help="altas dentro de una misma ventana")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    for clave, valor in ENTORNO.items():
+        os.environ.setdefault(clave, valor)
+    from moto import mock_aws
+    mock = mock_aws()
+    mock.start()
+
+    import boto3
+    import runtime
+    from dynamodb_local import crear_tablas
+    from tokens import emitir_token
+
+    api = ApiGrabadora(args.latencia_ws / 1000)
+    runtime.obtener_api = lambda endpoint: api
+    crear_tablas(boto3.client("dynamodb"), os.path.join(BASE_DIR, "serverless.yml"), STAGE)
+    tabla_conexiones = boto3.resource("dynamodb").Table(ENTORNO["CONNECTIONS_TABLE"])
+    sembrar_conexiones(tabla_conexiones, "utec", 8)
+
+    import CrearReporte
+    import NotificarCambios
+
+    print("== eventos grabados (8 conexiones en utec, 2 solo con urgencia alta)")
+    rutas = args.eventos or sorted(glob.glob(os.path.join(BENCH_DIR, "eventos", "*.json")))
+    reproducir(rutas, api, NotificarCambios.lambda_handler)
+
+    print(f"\n== latencia de alta ({args.latencia_ws} ms por post_to_connection)")
+    print(f"{'conexiones':>10} {'crear p50':>10} {'crear p95':>10} {'stream p50':>11}")
+    token, _ = emitir_token("bench@utec.edu.pe", "usuario")
+    resultados = []
+    for conexiones in args.conexiones:
+        p50, p95, stream = medir_alta(CrearReporte.lambda_handler, NotificarCambios.lambda_handler,
+                                      tabla_conexiones, token, conexiones, args.invocaciones)
+        resultados.append({"conexiones": conexiones, "crear_p50_ms": round(p50, 3), "crear_p95_ms": round(p95, 3),
+                           "stream_p50_ms": round(stream, 3)})
+        print(f"{conexiones:>10} {p50:>10.2f} {p95:>10.2f} {stream:>11.2f}")
+
+    print(f"\n== ráfaga de {args.rafaga} altas en utec")
+    sin_ventana, con_ventana, ahorrados = rafaga(NotificarCambios.lambda_handler, api, args.rafaga)
+    print(f"post_to_connection sin ventana: {sin_ventana}, con ventana: {con_ventana} (frames ahorrados: {ahorrados})")
+    mock.stop()
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"parametros": vars(args), "latencia": resultados,
+                       "rafaga": {"sin_ventana": sin_ventana, "con_ventana": con_ventana,
+                                  "frames_ahorrados": ahorrados}}, f, indent=2)
@@ -0,0 +1,92 @@
+"""Benchmark del serializador de respuestas sobre 1k/10k/100k reportes.
+
+Los reportes llevan los números como ``Decimal``, igual que los devuelve boto3. Compara
+la serialización anterior de ``runtime.respuesta`` (``json.dumps`` con ``default``) con
+``serializacion.dumps_bytes`` (orjson si está instalado) y estima con gzip el ahorro de
+la compresión que aplica API Gateway por encima de ``minimumCompressionSize``.
+Reporta bytes y tiempo de CPU (``time.process_time``).
+
+Uso::
+
+    python benchmarks/bench_serializacion.py --reportes 1000 10000 100000
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(BASE_DIR, "layer", "python"), os.path.dirname(os.path.abspath(__file__))]
+
+import serializacion  # noqa: E402
+from serializacion import a_json, dumps_bytes  # noqa: E402
+from dynamodb_local import reporte_sintetico  # noqa: E402
+
+# Nivel por defecto de gzip; el de API Gateway no es configurable
+GZIP_NIVEL = 6
+
+
+def reportes_dynamo(n):
+    # Como los deserializa boto3: todos los números en Decimal
+    items = []
+    for i in range(n):
+        item = reporte_sintetico(i)
+        for campo in ("version", "creado_en", "actualizado_en"):
+            item[campo] = Decimal(item[campo])
+        items.append(item)
+    return {"mensaje": "Reportes obtenidos correctamente", "items": items, "cursor": None}
+
+
+def anterior(body):
+    return json.dumps(body, default=a_json).encode("utf-8")
+
+
+def cpu(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        resultado = funcion()
+        tiempos.append(time.process_time() - inicio)
+    return resultado, min(tiempos) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reportes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    backend = "orjson" if serializacion.orjson is not None else "json"
+    print(f"backend: {backend}   gzip nivel {GZIP_NIVEL}")
+    print(f"{'reportes':>9} {'json ms':>9} {'nuevo ms':>9} {'x':>6} {'gzip ms':>9} "
+          f"{'bytes':>12} {'bytes gzip':>11} {'ratio':>6}")
+
+    resultados = []
+    for n in args.reportes:
+        body = reportes_dynamo(n)
+        base, ms_json = cpu(lambda: anterior(body), args.repeticiones)
+        nuevo, ms_nuevo = cpu(lambda: dumps_bytes(body), args.repeticiones)
+        assert json.loads(base) == json.loads(nuevo), "salidas distintas"
+        comprimido, ms_gzip = cpu(lambda: gzip.compress(nuevo, compresslevel=GZIP_NIVEL, mtime=0),
+                                  args.repeticiones)
+
+        fila = {
+            "reportes": n,
+            "json_ms": round(ms_json, 2),
+            "nuevo_ms": round(ms_nuevo, 2),
+            "gzip_ms": round(ms_gzip, 2),
+            "bytes": len(base),
+            "bytes_nuevo": len(nuevo),
+            "bytes_gzip": len(comprimido),
+        }
+        resultados.append(fila)
+        print(f"{n:>9,} {ms_json:>9.1f} {ms_nuevo:>9.1f} {ms_json / max(ms_nuevo, 1e-9):>6.1f} {ms_gzip:>9.1f} "
+              f"{len(base):>12,} {len(comprimido):>11,} {len(base) / len(comprimido):>6.1f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"parametros": vars(args), "backend": backend, "resultados": resultados}, f, indent=2)
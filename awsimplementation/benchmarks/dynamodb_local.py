@@ -0,0 +1,150 @@
+"""Stand-ins locales de DynamoDB para los benchmarks (sin AWS ni Docker)."""
+import time
+
+TIPOS_INCIDENTE = ["Robo", "Accidente", "Acoso", "Daño a propiedad", "Otro"]
+NIVELES_URGENCIA = ["baja", "media", "alta"]
+UBICACIONES = [f"Edificio {letra}" for letra in "ABCDEFGH"] + [f"Pabellón {letra}" for letra in "ABCD"]
+ESTADOS = ["pendiente", "en_proceso", "resuelto"]
+TIPOS_USUARIO = ["Estudiante", "Docente", "Administrativo", "Visitante"]
+DESCRIPCIONES = [
+    "Robo de laptop en la biblioteca",
+    "Accidente en las escaleras, urgente",
+    "Acoso en el pasillo del tercer piso",
+    "Vidrio roto en el aula 302",
+    "Fuga de agua en los baños",
+    "Se perdió una mochila en la cafetería",
+]
+
+
+def reporte_sintetico(i, tenant_id="utec"):
+    # Determinístico a partir del índice: no hace falta guardar el millón de items
+    return {
+        "tenant_id": tenant_id,
+        "uuid": f"{i:08d}-0000-4000-8000-000000000000",
+        "tipo_incidente": TIPOS_INCIDENTE[i % 5],
+        "nivel_urgencia": NIVELES_URGENCIA[(i * 7) % 3],
+        "ubicacion": UBICACIONES[(i * 13) % len(UBICACIONES)],
+        "tipo_usuario": TIPOS_USUARIO[(i * 3) % len(TIPOS_USUARIO)],
+        "descripcion": DESCRIPCIONES[(i * 11) % len(DESCRIPCIONES)],
+        "estado": ESTADOS[(i * 5) % 3],
+        "version": 1,
+        "creado_en": 1700000000000 + i,
+        "actualizado_en": 1700000000000 + i,
+    }
+
+
+class TablaSintetica:
+    """Tabla de solo lectura con N reportes generados al vuelo.
+
+    Soporta ``scan`` con ``Segment``/``TotalSegments``, ``ExclusiveStartKey`` y
+    ``ProjectionExpression``. ``items_por_pagina`` imita el corte de 1 MB de DynamoDB y
+    ``latencia_pagina`` el round trip de cada página. Los items salen de un pool fijo y se
+    copian en cada página, como haría el deserializador de boto3.
+    """
+
+    TAMANO_POOL = 9973
+
+    def __init__(self, total_items, items_por_pagina=2500, latencia_pagina=0.0):
+        self.total_items = total_items
+        self.items_por_pagina = items_por_pagina
+        self.latencia_pagina = latencia_pagina
+        self._pool = [reporte_sintetico(i) for i in range(min(total_items, self.TAMANO_POOL))]
+        self._proyecciones = {}
+
+    def _pool_proyectado(self, campos):
+        if campos is None:
+            return self._pool
+        clave = tuple(campos)
+        if clave not in self._proyecciones:
+            self._proyecciones[clave] = [{c: item[c] for c in campos if c in item} for item in self._pool]
+        return self._proyecciones[clave]
+
+    def scan(self, Segment=0, TotalSegments=1, ExclusiveStartKey=None,
+             ProjectionExpression=None, ExpressionAttributeNames=None, Limit=None, **kwargs):
+        if self.latencia_pagina:
+            time.sleep(self.latencia_pagina)
+
+        campos = None
+        if ProjectionExpression:
+            nombres = ExpressionAttributeNames or {}
+            campos = [nombres.get(c.strip(), c.strip()) for c in ProjectionExpression.split(",")]
+        pool = self._pool_proyectado(campos)
+        tamano = len(pool)
+
+        inicio = ExclusiveStartKey["i"] + TotalSegments if ExclusiveStartKey else Segment
+        por_pagina = min(Limit or self.items_por_pagina, self.items_por_pagina)
+        indices = range(inicio, self.total_items, TotalSegments)[:por_pagina]
+        items = [pool[i % tamano].copy() for i in indices]
+
+        response = {"Items": items, "Count": len(items), "ScannedCount": len(items)}
+        if indices and indices[-1] + TotalSegments < self.total_items:
+            response["LastEvaluatedKey"] = {"i": indices[-1]}
+        return response
+
+
+def crear_tablas(client, serverless_yml, stage="dev"):
+    """Crea en ``client`` las tablas DynamoDB declaradas en ``serverless.yml``.
+
+    Resuelve ``${sls:stage}``, ``${self:provider.environment.X}``, los ``${param:X, 'valor'}``
+    con su valor por defecto y las propiedades que son un ``${self:...}`` completo (como
+    los índices de ``custom.indicesReportes``); devuelve ``{logical_id: nombre}``. Sirve
+    tanto para moto como para DynamoDB Local.
+    """
+    import re
+
+    import yaml
+
+    class _Loader(yaml.SafeLoader):
+        pass
+
+    # Tags de CloudFormation (!Ref, !GetAtt...) no hacen falta para crear tablas
+    _Loader.add_multi_constructor("!", lambda loader, sufijo, nodo: None)
+
+    with open(serverless_yml, encoding="utf-8") as f:
+        texto = f.read().replace("${sls:stage}", stage)
+    entorno = yaml.load(texto, Loader=_Loader)["provider"]["environment"]
+    texto = re.sub(r"\$\{self:provider\.environment\.(\w+)\}", lambda m: str(entorno[m.group(1)]), texto)
+    texto = re.sub(r"\$\{param:\w+, '([^']*)'\}", lambda m: m.group(1), texto)
+    documento = yaml.load(texto, Loader=_Loader)
+    recursos = documento["resources"]["Resources"]
+
+    def resolver(valor):
+        referencia = re.fullmatch(r"\$\{self:([\w.-]+)\}", valor) if isinstance(valor, str) else None
+        if not referencia:
+            return valor
+        nodo = documento
+        for clave in referencia.group(1).split("."):
+            nodo = nodo[clave]
+        return nodo
+
+    creadas = {}
+    for logical_id, recurso in recursos.items():
+        if recurso.get("Type") != "AWS::DynamoDB::Table":
+            continue
+        propiedades = {clave: resolver(valor) for clave, valor in recurso["Properties"].items()}
+        # TTL y Streams se configuran con otras APIs y no afectan las mediciones
+        propiedades.pop("TimeToLiveSpecification", None)
+        propiedades.pop("StreamSpecification", None)
+        client.create_table(**propiedades)
+        creadas[logical_id] = propiedades["TableName"]
+    return creadas
+
+
+def registro_stream(nombre, nuevo=None, anterior=None, secuencia=0):
+    """Registro de DynamoDB Streams (``NEW_AND_OLD_IMAGES``) como los de ``benchmarks/eventos``."""
+    from boto3.dynamodb.types import TypeSerializer
+
+    serializador = TypeSerializer()
+    base = nuevo or anterior
+    dynamodb = {
+        "ApproximateCreationDateTime": int(time.time()),
+        "Keys": {k: serializador.serialize(base[k]) for k in ("tenant_id", "uuid")},
+        "SequenceNumber": f"{secuencia:024d}",
+        "StreamViewType": "NEW_AND_OLD_IMAGES",
+    }
+    if nuevo:
+        dynamodb["NewImage"] = {k: serializador.serialize(v) for k, v in nuevo.items()}
+    if anterior:
+        dynamodb["OldImage"] = {k: serializador.serialize(v) for k, v in anterior.items()}
+    return {"eventID": f"{secuencia:x}", "eventName": nombre, "eventVersion": "1.1",
+            "eventSource": "aws:dynamodb", "awsRegion": "us-east-1", "dynamodb": dynamodb}
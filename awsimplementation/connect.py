@@ -1,29 +1,45 @@
-import json
-import boto3
 import logging
+from runtime import tabla_conexiones
+from metricas import instrumentar
 import time
+from suscripciones import normalizar_topicos
+from tokens import autorizar_conexion, tenant_de
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource("dynamodb")
-connections_table = dynamodb.Table("Connections")
-
+@instrumentar
 def lambda_handler(event, context):
     logger.info("=== WebSocket $connect ===")
-    logger.info(json.dumps(event))
 
     try:
         connection_id = event["requestContext"]["connectionId"]
 
-        # Guardar conexión
-        connections_table.put_item(Item={
+        # Sin token válido (?token=) API Gateway rechaza la conexión con el 401
+        claims, denegado = autorizar_conexion(event)
+        if denegado:
+            logger.warning(f"Conexión rechazada: {connection_id}")
+            return denegado
+
+        # Suscripción opcional: ?token=...&topics=nivel_urgencia:alta,tipo_incidente:robo
+        # El tenant sale del token, nunca del cliente
+        query_params = event.get("queryStringParameters") or {}
+        tenant_id = tenant_de(claims)
+        topicos = normalizar_topicos(query_params.get("topics"))
+
+        # Guardar conexión con la identidad verificada: $default la lee en cada acción
+        item = {
             "connectionId": connection_id,
-            "username": "Anon",
+            "username": claims["sub"],
+            "rol": claims["rol"],
+            "tenant_id": tenant_id,
             "timestamp": int(time.time())
-        })
+        }
+        if topicos:
+            item["topics"] = topicos
+        tabla_conexiones().put_item(Item=item)
 
-        logger.info(f"Conexión guardada: {connection_id}")
+        logger.info(f"Conexión guardada: {connection_id} (tenant={tenant_id}, topics={sorted(topicos)})")
 
         return {
             "statusCode": 200
@@ -1,71 +1,206 @@
-import json
-import boto3
 import logging
 import os
+from runtime import tabla_reportes, tabla_conexiones, tabla_eliminados, tabla_contadores, endpoint_ws, obtener_api, parsear_body
+from serializacion import dumps_bytes
+from metricas import instrumentar, contar, propiedad, fase
+from reportes import campos_indexados, elegir_indice, kwargs_filtrados
+from contadores import leer_contadores
+from paginacion import iterar_items, parsear_limit
+from cambios import parsear_watermark, requiere_resync, kwargs_actualizados, obtener_eliminados, calcular_watermark, watermark_con_solape
+from suscripciones import guardar_suscripcion
+from triage import TOP_DEFAULT, MAX_TOP, kwargs_top
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource("dynamodb")
-connections_table = dynamodb.Table("Connections")
-table_name = os.environ.get("TABLE_NAME", "dev-t_reportes")
-reportes_table = dynamodb.Table(table_name)
+# Cantidad de reportes por frame en getIncidents
+CHUNK_SIZE = int(os.environ.get("INCIDENTS_CHUNK_SIZE", "50"))
+MAX_CHUNK_SIZE = 200
 
+
+def parsear_chunk_size(valor):
+    try:
+        chunk_size = int(valor) if valor else CHUNK_SIZE
+    except (TypeError, ValueError):
+        chunk_size = CHUNK_SIZE
+    return max(1, min(chunk_size, MAX_CHUNK_SIZE))
+
+
+def enviar_en_chunks(api, connection_id, items, chunk_size, tipo="incidents", clave="incidents", chunk=0):
+    # Envía los elementos en frames numerados (a partir de `chunk`); el llamador cierra con enviar_done
+    total = 0
+    buffer = []
+
+    def enviar(elementos):
+        with fase("serializacion"):
+            data = dumps_bytes({"type": f"{tipo}Chunk", "chunk": chunk, clave: elementos})
+        api.post_to_connection(ConnectionId=connection_id, Data=data)
+
+    for item in items:
+        buffer.append(item)
+        if len(buffer) >= chunk_size:
+            enviar(buffer)
+            total += len(buffer)
+            chunk += 1
+            buffer = []
+    if buffer:
+        enviar(buffer)
+        total += len(buffer)
+        chunk += 1
+
+    return total, chunk
+
+
+def enviar_done(api, connection_id, tipo, **campos):
+    api.post_to_connection(
+        ConnectionId=connection_id,
+        Data=dumps_bytes({"type": f"{tipo}Done", **campos})
+    )
+
+
+def enviar_error(api, connection_id, mensaje):
+    api.post_to_connection(
+        ConnectionId=connection_id,
+        Data=dumps_bytes({"type": "error", "message": mensaje})
+    )
+
+
+def obtener_conexion(connection_id):
+    # Tenant y rol quedaron guardados en $connect a partir del token verificado
+    return tabla_conexiones().get_item(Key={"connectionId": connection_id}).get("Item")
+
+@instrumentar
 def lambda_handler(event, context):
     logger.info("=== WebSocket $default ===")
-    logger.info(json.dumps(event))
 
     try:
         connection_id = event["requestContext"]["connectionId"]
-        domain = event["requestContext"]["domainName"]
-        stage = event["requestContext"]["stage"]
-        
-        # Construir el endpoint del API Gateway Management API
-        ws_endpoint = f"https://{domain}/{stage}"
-        api = boto3.client("apigatewaymanagementapi", endpoint_url=ws_endpoint)
-        
-        body = json.loads(event.get("body", "{}"))
+
+        # Cliente del API Gateway Management API (cacheado por endpoint)
+        api = obtener_api(endpoint_ws(event))
+
+        body = parsear_body(event)
         action = body.get("action")
 
         logger.info(f"Action recibida: {action}")
+        propiedad("accion", action)
+
+        conexion = obtener_conexion(connection_id)
+        if not conexion or "rol" not in conexion:
+            # Conexión de antes de exigir token en $connect: tiene que reconectarse con uno
+            enviar_error(api, connection_id, "Conexión no autorizada, reconecte con ?token=")
+            return {"statusCode": 200}
+        # El tenant es siempre el de la conexión; un tenant_id en el body se ignora
+        tenant_id = conexion["tenant_id"]
 
         # ----- getIncidents -----
         if action == "getIncidents":
-            # Obtener todos los reportes de dev-t_reportes
-            reportes = reportes_table.scan().get("Items", [])
-            
+            chunk_size = parsear_chunk_size(body.get("chunkSize"))
+
+            # Query por tenant_id (HASH KEY) + filtros opcionales, por su GSI si lo tienen
+            filtros = body.get("filters") or {}
+            contadores = leer_contadores(tabla_contadores(), tenant_id) if len(campos_indexados(filtros)) > 1 else None
+            campo = elegir_indice(filtros, contadores)
+            query_kwargs = kwargs_filtrados(tenant_id, filtros, campo)
+            if "FilterExpression" in query_kwargs and campo is None:
+                contar("filtro_sin_indice")
+            propiedad("indice", campo or "tabla")
+
+            total, chunks = enviar_en_chunks(
+                api,
+                connection_id,
+                iterar_items(tabla_reportes().query, **query_kwargs),
+                chunk_size
+            )
+            enviar_done(api, connection_id, "incidents", chunks=chunks, total=total)
+            contar("items", total)
+            contar("chunks", chunks)
+            logger.info(f"getIncidents {tenant_id}: {total} reportes en {chunks} chunks")
+            return {"statusCode": 200}
+
+        # ----- getChanges -----
+        if action == "getChanges":
+            try:
+                desde = parsear_watermark(body.get("since"))
+            except ValueError as e:
+                api.post_to_connection(
+                    ConnectionId=connection_id,
+                    Data=dumps_bytes({"type": "changesError", "error": str(e)})
+                )
+                return {"statusCode": 200}
+
+            if requiere_resync(desde):
+                enviar_done(api, connection_id, "changes", resync=True)
+                return {"statusCode": 200}
+
+            # Se recorren los cambios mientras se envían, calculando el watermark al vuelo
+            eliminados = obtener_eliminados(tabla_eliminados(), tenant_id, desde)
+            watermark = calcular_watermark(desde, [], eliminados)
+            chunk_size = parsear_chunk_size(body.get("chunkSize"))
+
+            def actualizados():
+                nonlocal watermark
+                for item in iterar_items(tabla_reportes().query, **kwargs_actualizados(tenant_id, desde)):
+                    watermark = max(watermark, int(item["actualizado_en"]))
+                    yield item
+
+            total, chunks = enviar_en_chunks(api, connection_id, actualizados(), chunk_size, tipo="changes")
+            # Las lápidas van después de los actualizados y también en chunks: un borrado
+            # masivo en un solo frame supera el límite de 128 KB de API Gateway
+            _, chunks = enviar_en_chunks(
+                api, connection_id, eliminados, chunk_size, tipo="changes", clave="eliminados", chunk=chunks
+            )
+            enviar_done(
+                api, connection_id, "changes",
+                chunks=chunks, total=total, total_eliminados=len(eliminados), resync=False,
+                watermark=watermark_con_solape(desde, watermark)
+            )
+            logger.info(f"getChanges {tenant_id} desde {desde}: {total} actualizados, {len(eliminados)} eliminados")
+            contar("items", total)
+            contar("chunks", chunks)
+            return {"statusCode": 200}
+
+        # ----- subscribe -----
+        if action == "subscribe":
+            topicos = guardar_suscripcion(tabla_conexiones(), connection_id, tenant_id, body.get("topics"))
+
             api.post_to_connection(
                 ConnectionId=connection_id,
-                Data=json.dumps({
-                    "type": "incidentsList",
-                    "incidents": reportes
+                Data=dumps_bytes({
+                    "type": "subscribed",
+                    "tenant_id": tenant_id,
+                    "topics": sorted(topicos)
                 })
             )
             return {"statusCode": 200}
 
-        # ----- nuevoReporte -----
-        if action == "nuevoReporte":
-            data = body.get("data", {})
-            
-            # Obtener todas las conexiones activas
-            connections = connections_table.scan().get("Items", [])
-            message = {
-                "type": "nuevoReporte",
-                "data": data
-            }
-
-            # Enviar a todos los clientes conectados
-            for conn in connections:
-                try:
-                    api.post_to_connection(
-                        ConnectionId=conn["connectionId"],
-                        Data=json.dumps(message)
-                    )
-                except Exception as e:
-                    logger.error(f"Error enviando a {conn['connectionId']}: {str(e)}")
+        # ----- getTop -----
+        if action == "getTop":
+            # Los N abiertos más urgentes del tenant en un solo frame (una query acotada);
+            # solo admins, como TopReportes
+            if conexion["rol"] != "admin":
+                enviar_error(api, connection_id, "No tiene permisos para esta operación")
+                return {"statusCode": 200}
+            try:
+                limit = min(parsear_limit(body.get("limit"), default=TOP_DEFAULT), MAX_TOP)
+            except ValueError as e:
+                api.post_to_connection(
+                    ConnectionId=connection_id,
+                    Data=dumps_bytes({"type": "topError", "error": str(e)})
+                )
+                return {"statusCode": 200}
 
+            items = tabla_reportes().query(**kwargs_top(tenant_id, limit)).get("Items", [])
+            with fase("serializacion"):
+                data = dumps_bytes({"type": "topIncidents", "tenant_id": tenant_id, "total": len(items), "items": items})
+            api.post_to_connection(ConnectionId=connection_id, Data=data)
+            contar("items", len(items))
+            logger.info(f"getTop {tenant_id}: {len(items)} reportes")
             return {"statusCode": 200}
 
+        # nuevoReporte ya no es una acción del cliente: NotificarCambios difunde las altas
+        # desde el stream de la tabla, ya guardadas
+
         # Acción desconocida
         logger.warning(f"Acción desconocida: {action}")
         return {"statusCode": 200}
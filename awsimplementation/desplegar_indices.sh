@@ -0,0 +1,33 @@
+#!/usr/bin/env bash
+# Agrega los GSI de la tabla de reportes a un stage ya desplegado, de a uno por deploy.
+# DynamoDB (y CloudFormation) crean un solo GSI por actualización de la tabla: cada etapa
+# de custom.indicesReportes en serverless.yml suma un índice a la anterior.
+#
+#   ./desplegar_indices.sh dev        # etapas 1..5
+#   ./desplegar_indices.sh dev 3      # retomar desde la etapa 3 (las anteriores ya existen)
+#
+# Mientras dura, las funciones ya desplegadas pueden consultar un índice que todavía no
+# existe (p. ej. un filtro de ListarReportes) y fallar: conviene correrlo fuera de horario.
+# Un stage nuevo no lo necesita: `serverless deploy` crea la tabla con todos los índices.
+set -euo pipefail
+
+STAGE="${1:-dev}"
+DESDE="${2:-1}"
+ETAPAS=5
+TABLA="${STAGE}-t_reportes"
+
+esperar_indices() {
+  # CloudFormation termina al crear el índice, pero el backfill puede seguir en CREATING
+  while aws dynamodb describe-table --table-name "$TABLA" \
+      --query "Table.GlobalSecondaryIndexes[?IndexStatus!='ACTIVE'].IndexName" --output text | grep -q .; do
+    echo "⏳ Esperando que los índices de $TABLA queden ACTIVE..."
+    sleep 30
+  done
+}
+
+for etapa in $(seq "$DESDE" "$ETAPAS"); do
+  echo "🚀 Etapa $etapa/$ETAPAS en $STAGE"
+  serverless deploy --stage "$STAGE" --param="indicesReportes=$etapa"
+  esperar_indices
+done
+echo "✅ $TABLA con todos sus índices"
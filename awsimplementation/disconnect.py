@@ -1,21 +1,18 @@
-import json
-import boto3
 import logging
+from runtime import tabla_conexiones
+from metricas import instrumentar
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource("dynamodb")
-connections_table = dynamodb.Table("Connections")
-
+@instrumentar
 def lambda_handler(event, context):
     logger.info("=== WebSocket $disconnect ===")
-    logger.info(json.dumps(event))
 
     try:
         connection_id = event["requestContext"]["connectionId"]
 
-        connections_table.delete_item(Key={"connectionId": connection_id})
+        tabla_conexiones().delete_item(Key={"connectionId": connection_id})
 
         return {
             "statusCode": 200
@@ -0,0 +1,422 @@
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import zlib
+from array import array
+from itertools import accumulate, combinations, compress, repeat
+from operator import add, mul, sub
+from boto3.dynamodb.conditions import Key
+from clasificador import plegar
+from cambios import requiere_resync, kwargs_actualizados, obtener_eliminados, calcular_watermark
+from paginacion import iterar_items, proyeccion, combinar_kwargs
+from reportes import ahora_ms
+from runtime import obtener_s3
+
+# Índice invertido por tenant sobre tipo_incidente, ubicacion y descripcion con ranking
+# BM25. Vive en memoria del contenedor y se guarda comprimido en /tmp o en S3.
+
+# Peso de cada campo en la frecuencia del término (el tipo y el lugar son más específicos)
+CAMPOS = {"tipo_incidente": 2, "ubicacion": 2, "descripcion": 1}
+K1 = 1.2
+B = 0.75
+# El impacto BM25 de cada posting se guarda cuantizado en un byte
+_ESCALA = 255 / (K1 + 1)
+
+STOPWORDS = frozenset("""
+a al algo algun alguna alguno algunos ante antes aqui asi cerca como con contra cual cuando
+de del desde donde durante e el ella ellas ellos en entre era es esa ese eso esta estaba
+estan este esto estos fue fueron ha habia hay hasta la las le les lo los mas me mi muy
+nos o otra otro para pero poco por porque que quien se segun ser si sin sobre son su sus
+tambien tan te tiene todo todos tras tu u un una uno unos y ya
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_VOCALES = frozenset("aeiou")
+_MAGIA = b"IDX1"
+# Términos de la consulta que se usan (los más raros) y mapas doc -> impacto cacheados
+MAX_TERMINOS = 5
+MAX_MAPAS = 16
+
+# El GSI de actualizado_en es eventualmente consistente: cada sincronización vuelve a pedir
+# este margen antes del watermark y, tras un cambio, se sigue sincronizando durante él
+SOLAPE_MS = int(os.environ.get("SEARCH_INDEX_OVERLAP_MS", "5000"))
+# Snapshot nuevo cada tantos cambios aplicados o cada tantos segundos si hubo alguno
+GUARDAR_CADA = int(os.environ.get("SEARCH_INDEX_SAVE_EVERY", "500"))
+GUARDAR_MAX_S = int(os.environ.get("SEARCH_INDEX_SAVE_SECONDS", "300"))
+# Con más de esta fracción de documentos borrados el índice en memoria se compacta
+MAX_BORRADOS = 0.2
+_PROYECCION = proyeccion(["uuid", *CAMPOS, "actualizado_en"])
+
+
+def raiz(token):
+    # Plural español: "mochilas" -> "mochila", "pabellones" -> "pabellon"
+    if len(token) > 4 and token.endswith("es") and token[-3] not in _VOCALES:
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and token[-2] in _VOCALES:
+        return token[:-1]
+    return token
+
+
+def tokenizar(texto):
+    return [raiz(t) for t in _TOKEN.findall(plegar(texto)) if t not in STOPWORDS]
+
+
+def frecuencias(reporte):
+    # {termino: frecuencia ponderada por campo} y la longitud ponderada del documento
+    tf = {}
+    for campo, peso in CAMPOS.items():
+        for termino in tokenizar(reporte.get(campo)):
+            tf[termino] = tf.get(termino, 0) + peso
+    return tf, sum(tf.values())
+
+
+class IndiceInvertido:
+    # Documentos con id denso (posición en self.uuids); un borrado deja None y sus
+    # postings se ignoran hasta la siguiente compactación (al serializar).
+
+    def __init__(self):
+        self.uuids = []
+        self.posicion = {}
+        self.longitudes = array("H")
+        self.postings = {}
+        self.suma_longitudes = 0
+        self.watermark = 0
+        self.pendientes = 0
+        self.meta = {}
+        # uuid -> actualizado_en de lo aplicado dentro del solape, para no reindexarlo
+        self.recientes = {}
+        # Ids borrados que siguen en los postings hasta la compactación
+        self.borrados = set()
+        self._mapas = {}
+
+    def __len__(self):
+        return len(self.posicion)
+
+    def agregar(self, reporte):
+        # Alta o reemplazo (un MODIFY vuelve a indexar el reporte completo)
+        uuid = reporte["uuid"]
+        if uuid in self.posicion:
+            self.eliminar(uuid)
+        tf, longitud = frecuencias(reporte)
+        longitud = min(longitud, 65535)
+        doc = len(self.uuids)
+        self.uuids.append(uuid)
+        self.posicion[uuid] = doc
+        self.longitudes.append(longitud)
+        self.suma_longitudes += longitud
+
+        promedio = self.suma_longitudes / len(self.posicion)
+        norma = K1 * (1 - B + B * longitud / promedio)
+        for termino, f in tf.items():
+            posting = self.postings.get(termino)
+            if posting is None:
+                posting = self.postings[termino] = (array("I"), array("B"))
+            impacto = max(1, round(f * (K1 + 1) / (f + norma) * _ESCALA))
+            posting[0].append(doc)
+            posting[1].append(impacto)
+            mapa = self._mapas.get(termino)
+            if mapa is not None:
+                mapa[doc] = impacto
+
+    def eliminar(self, uuid):
+        doc = self.posicion.pop(uuid, None)
+        if doc is not None:
+            self.uuids[doc] = None
+            self.borrados.add(doc)
+            self.suma_longitudes -= self.longitudes[doc]
+
+    def _idf(self, termino):
+        # df incluye los borrados hasta la compactación: el orden casi no cambia
+        df = len(self.postings[termino][0])
+        n = len(self.posicion)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5)) / _ESCALA
+
+    def _mapa(self, termino):
+        # doc -> impacto del término; se arma en C con dict(zip()) y se cachea
+        mapa = self._mapas.get(termino)
+        if mapa is None:
+            if len(self._mapas) >= MAX_MAPAS:
+                self._mapas.pop(next(iter(self._mapas)))
+            docs, impactos = self.postings[termino]
+            mapa = self._mapas[termino] = dict(zip(docs, impactos))
+        return mapa
+
+    def _mejores_un_termino(self, termino, necesarios):
+        # Top-k sin recorrer el posting en Python: por cada impacto, de mayor a menor,
+        # rfind (memchr) sobre los bytes de impactos; los empates salen del más nuevo
+        docs, impactos = self.postings[termino]
+        datos = impactos.tobytes()
+        mejores = []
+        for q in sorted(set(datos), reverse=True):
+            marca = bytes((q,))
+            fin = len(datos)
+            while len(mejores) < necesarios:
+                i = datos.rfind(marca, 0, fin)
+                if i < 0:
+                    break
+                fin = i
+                if docs[i] not in self.borrados:
+                    mejores.append((q, docs[i]))
+            if len(mejores) >= necesarios:
+                break
+        return mejores
+
+    def _terminos(self, consulta):
+        # Términos de la consulta presentes en el índice, los más raros primero
+        terminos = {t for t in tokenizar(consulta) if t in self.postings}
+        return sorted(terminos, key=lambda t: len(self.postings[t][0]))[:MAX_TERMINOS]
+
+    def total(self, consulta):
+        terminos = self._terminos(consulta)
+        if not terminos:
+            return 0
+        if len(terminos) == 1:
+            docs = self.postings[terminos[0]][0]
+            return len(docs) - (len(self.borrados.intersection(docs)) if self.borrados else 0)
+        return len(set().union(*(self._mapa(t) for t in terminos)) - self.borrados)
+
+    def _puntuar(self, docs, pesos, necesarios):
+        # BM25 de muchos documentos sin bucle en Python: map/dict.get/zip corren en C
+        docs = list(docs)
+        puntajes = None
+        for mapa, idf in pesos:
+            parcial = map(mul, map(mapa.get, docs, repeat(0)), repeat(idf))
+            puntajes = list(parcial) if puntajes is None else list(map(add, puntajes, parcial))
+        return heapq.nlargest(necesarios, zip(puntajes, docs))
+
+    def buscar(self, consulta, limit=20, offset=0):
+        # [(uuid, puntaje)] por niveles de coincidencia: primero los reportes con todos los
+        # términos, luego con todos menos uno, etc.; dentro de cada nivel por BM25. Los
+        # niveles se arman con operaciones de conjuntos sobre las claves de los mapas y solo
+        # se puntúan los necesarios para llenar la página. Términos fuera del índice se ignoran.
+        terminos = self._terminos(consulta)
+        necesarios = offset + limit
+        if not terminos or not necesarios:
+            return []
+
+        if len(terminos) == 1:
+            idf = self._idf(terminos[0])
+            mejores = self._mejores_un_termino(terminos[0], necesarios)
+            return [(self.uuids[d], round(q * idf, 4)) for q, d in mejores[offset:]]
+
+        mapas = [self._mapa(t) for t in terminos]
+        pesos = [(mapa, self._idf(t)) for mapa, t in zip(mapas, terminos)]
+        resultados = []
+        for tamano in range(len(terminos), 0, -1):
+            nivel = set()
+            for combinacion in combinations(range(len(terminos)), tamano):
+                # Exactamente estos términos: los que coinciden con más ya salieron antes
+                candidatos = set(mapas[combinacion[0]])
+                for i in combinacion[1:]:
+                    candidatos = candidatos & mapas[i].keys()
+                for i in range(len(terminos)):
+                    if i not in combinacion and candidatos:
+                        candidatos = candidatos - mapas[i].keys()
+                nivel |= candidatos
+            nivel -= self.borrados
+            if nivel:
+                resultados.extend(self._puntuar(nivel, pesos, necesarios - len(resultados)))
+            if len(resultados) >= necesarios:
+                break
+        return [(self.uuids[d], round(s, 4)) for s, d in resultados[offset:necesarios]]
+
+    def a_bytes(self, **meta):
+        # Compacta (quita borrados, ids densos de nuevo) y serializa:
+        # MAGIA + zlib(len(cabecera) + cabecera JSON + uuids + longitudes + postings).
+        # Los ids de cada posting van como diferencias: números chicos que zlib comprime bien.
+        vivos = [d for d, uuid in enumerate(self.uuids) if uuid is not None]
+        # vivo[d] = 1 si el doc sigue; nuevo_id[d] = su id compactado (todo con map/compress en C)
+        vivo = bytearray(len(self.uuids))
+        nuevo_id = array("I", bytes(4 * len(self.uuids)))
+        for i, d in enumerate(vivos):
+            vivo[d] = 1
+            nuevo_id[d] = i
+        terminos, conteos, bloques = [], [], []
+        for termino, (docs, impactos) in self.postings.items():
+            if self.borrados:
+                mascara = list(map(vivo.__getitem__, docs))
+                docs = array("I", map(nuevo_id.__getitem__, compress(docs, mascara)))
+                impactos = array("B", compress(impactos, mascara))
+            if not docs:
+                continue
+            diferencias = array("I", docs[:1])
+            diferencias.extend(map(sub, docs[1:], docs[:-1]))
+            terminos.append(termino)
+            conteos.append(len(docs))
+            bloques.append(diferencias.tobytes())
+            bloques.append(impactos.tobytes())
+
+        cabecera = json.dumps({
+            **meta,
+            "watermark": self.watermark,
+            "documentos": len(vivos),
+            "suma_longitudes": self.suma_longitudes,
+            "terminos": terminos,
+            "conteos": conteos
+        }, separators=(",", ":")).encode("utf-8")
+        uuids = "\n".join(self.uuids[d] for d in vivos).encode("utf-8")
+        longitudes = array("H", [self.longitudes[d] for d in vivos])
+        cuerpo = b"".join([struct.pack("<II", len(cabecera), len(uuids)), cabecera, uuids,
+                           longitudes.tobytes(), *bloques])
+        # Nivel 3: casi el tamaño del 6 en un tercio del tiempo (el guardado corre en una petición)
+        return _MAGIA + zlib.compress(cuerpo, 3)
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        if not datos or datos[:4] != _MAGIA:
+            raise ValueError("Índice inválido")
+        cuerpo = memoryview(zlib.decompress(datos[4:]))
+        largo_cabecera, largo_uuids = struct.unpack_from("<II", cuerpo)
+        pos = 8
+        cabecera = json.loads(bytes(cuerpo[pos:pos + largo_cabecera]))
+        pos += largo_cabecera
+
+        indice = cls()
+        n = cabecera["documentos"]
+        indice.uuids = bytes(cuerpo[pos:pos + largo_uuids]).decode("utf-8").split("\n") if n else []
+        pos += largo_uuids
+        indice.posicion = {uuid: d for d, uuid in enumerate(indice.uuids)}
+        indice.longitudes = array("H")
+        indice.longitudes.frombytes(cuerpo[pos:pos + 2 * n])
+        pos += 2 * n
+        indice.suma_longitudes = cabecera["suma_longitudes"]
+        indice.watermark = cabecera["watermark"]
+
+        for termino, conteo in zip(cabecera["terminos"], cabecera["conteos"]):
+            diferencias = array("I")
+            diferencias.frombytes(cuerpo[pos:pos + 4 * conteo])
+            pos += 4 * conteo
+            impactos = array("B")
+            impactos.frombytes(cuerpo[pos:pos + conteo])
+            pos += conteo
+            indice.postings[termino] = (array("I", accumulate(diferencias)), impactos)
+        indice.meta = cabecera
+        return indice
+
+
+class AlmacenLocal:
+    # Un archivo por tenant; en Lambda /tmp sobrevive mientras el contenedor siga "warm"
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+
+    def _ruta(self, tenant_id):
+        return os.path.join(self.directorio, f"{tenant_id}.idx")
+
+    def leer(self, tenant_id):
+        try:
+            with open(self._ruta(tenant_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def guardar(self, tenant_id, datos):
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = self._ruta(tenant_id) + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, self._ruta(tenant_id))
+
+
+class AlmacenS3:
+    # Compartido entre contenedores: el último snapshot guardado gana; los cambios
+    # posteriores a su watermark se vuelven a aplicar al cargarlo
+
+    def __init__(self, client, bucket, prefijo="indices/"):
+        self.client = client
+        self.bucket = bucket
+        self.prefijo = prefijo
+
+    def leer(self, tenant_id):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=f"{self.prefijo}{tenant_id}.idx")
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read()
+
+    def guardar(self, tenant_id, datos):
+        self.client.put_object(Bucket=self.bucket, Key=f"{self.prefijo}{tenant_id}.idx", Body=datos,
+                               ContentType="application/octet-stream")
+
+
+def almacen():
+    bucket = os.environ.get("SEARCH_INDEX_BUCKET")
+    if bucket:
+        return AlmacenS3(obtener_s3(), bucket)
+    return AlmacenLocal(os.environ.get("SEARCH_INDEX_DIR", "/tmp/indices_busqueda"))
+
+
+def reconstruir(reports_table, tenant_id):
+    # Índice completo desde la tabla; lo escrito durante la lectura entra por el solape
+    indice = IndiceInvertido()
+    indice.watermark = ahora_ms()
+    for item in iterar_items(reports_table.query, KeyConditionExpression=Key("tenant_id").eq(tenant_id),
+                             **_PROYECCION):
+        indice.agregar(item)
+    indice.pendientes = len(indice)
+    return indice
+
+
+def sincronizar(indice, reports_table, tombstones_table, tenant_id):
+    # Aplica el log de cambios (GSI de actualizado_en + lápidas) desde el watermark.
+    # Devuelve la cantidad de cambios aplicados.
+    desde = max(0, indice.watermark - SOLAPE_MS)
+    actualizados = list(iterar_items(reports_table.query,
+                                     **combinar_kwargs(kwargs_actualizados(tenant_id, desde), _PROYECCION)))
+    eliminados = obtener_eliminados(tombstones_table, tenant_id, desde)
+
+    aplicados = 0
+    for item in actualizados:
+        actualizado_en = int(item["actualizado_en"])
+        if indice.recientes.get(item["uuid"]) == actualizado_en:
+            continue
+        indice.agregar(item)
+        indice.recientes[item["uuid"]] = actualizado_en
+        aplicados += 1
+    for lapida in eliminados:
+        if lapida["uuid"] in indice.posicion:
+            indice.eliminar(lapida["uuid"])
+            aplicados += 1
+
+    indice.watermark = calcular_watermark(indice.watermark, actualizados, eliminados)
+    limite = indice.watermark - SOLAPE_MS
+    indice.recientes = {uuid: t for uuid, t in indice.recientes.items() if t >= limite}
+    indice.pendientes += aplicados
+    return aplicados
+
+
+def cargar(reports_table, tombstones_table, tenant_id, destino=None):
+    # Snapshot guardado + cambios posteriores; sin snapshot (o muy viejo) se reconstruye
+    destino = destino or almacen()
+    indice = None
+    datos = destino.leer(tenant_id)
+    if datos:
+        try:
+            indice = IndiceInvertido.desde_bytes(datos)
+        except (ValueError, zlib.error) as e:
+            print(f"⚠️ Snapshot de búsqueda inválido para {tenant_id}: {str(e)}")
+    if indice is None or requiere_resync(indice.watermark):
+        indice = reconstruir(reports_table, tenant_id)
+    else:
+        sincronizar(indice, reports_table, tombstones_table, tenant_id)
+    return indice
+
+
+def guardar_si_corresponde(indice, tenant_id, destino=None, forzar=False):
+    # Devuelve el índice a usar: compactado si acumuló demasiados borrados
+    viejo = ahora_ms() - indice.meta.get("guardado_en", 0) > GUARDAR_MAX_S * 1000
+    if not indice.pendientes or not (forzar or indice.pendientes >= GUARDAR_CADA or viejo):
+        return indice
+    datos = indice.a_bytes(tenant_id=tenant_id, guardado_en=ahora_ms())
+    (destino or almacen()).guardar(tenant_id, datos)
+    print(f"✅ Snapshot de búsqueda de {tenant_id}: {len(indice)} reportes, {len(datos)} bytes")
+    if len(indice.borrados) > MAX_BORRADOS * len(indice.uuids):
+        compacto = IndiceInvertido.desde_bytes(datos)
+        compacto.recientes = indice.recientes
+        return compacto
+    indice.pendientes = 0
+    indice.meta["guardado_en"] = ahora_ms()
+    return indice
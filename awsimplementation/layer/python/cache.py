@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+
+# Marca para entradas negativas (el item no existe)
+NO_EXISTE = object()
+
+
+class CacheLRU:
+    # Cache LRU con TTL que vive mientras el contenedor siga "warm".
+    # Una invocación de Lambda a la vez por contenedor, así que no usa locks.
+
+    def __init__(self, max_items=1000, ttl=30, ttl_negativo=5):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self._items = OrderedDict()
+        self.hits = 0
+        self.hits_negativos = 0
+        self.misses = 0
+        self.expirados = 0
+        self.obsoletos = 0
+        self.evictions = 0
+
+    def obtener(self, clave, version_minima=None):
+        # Devuelve el valor cacheado, NO_EXISTE o None si hay que ir a DynamoDB
+        entrada = self._items.get(clave)
+        if entrada is None:
+            self.misses += 1
+            return None
+
+        valor, version, expira = entrada
+        if expira <= time.monotonic():
+            del self._items[clave]
+            self.expirados += 1
+            self.misses += 1
+            return None
+
+        # El cliente conoce una versión más nueva que la cacheada
+        if version_minima is not None and (valor is NO_EXISTE or version < version_minima):
+            del self._items[clave]
+            self.obsoletos += 1
+            self.misses += 1
+            return None
+
+        self._items.move_to_end(clave)
+        if valor is NO_EXISTE:
+            self.hits_negativos += 1
+        else:
+            self.hits += 1
+        return valor
+
+    def guardar(self, clave, valor, version=0, ttl=None):
+        # ttl explícito: entradas que no deben sobrevivir a su propia expiración
+        if ttl is None:
+            ttl = self.ttl_negativo if valor is NO_EXISTE else self.ttl
+        self._items[clave] = (valor, version, time.monotonic() + ttl)
+        self._items.move_to_end(clave)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._items)
+
+    def invalidar(self, clave):
+        self._items.pop(clave, None)
+
+    def stats(self):
+        consultas = self.hits + self.hits_negativos + self.misses
+        return {
+            "items": len(self._items),
+            "hits": self.hits,
+            "hits_negativos": self.hits_negativos,
+            "misses": self.misses,
+            "expirados": self.expirados,
+            "obsoletos": self.obsoletos,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.hits_negativos) / consultas, 4) if consultas else 0.0
+        }
@@ -0,0 +1,75 @@
+import os
+from boto3.dynamodb.conditions import Key
+from paginacion import iterar_items
+from reportes import ahora_ms
+
+# GSI de reportes: tenant_id (HASH) + actualizado_en (RANGE)
+ACTUALIZADO_INDEX = os.environ.get("REPORTES_ACTUALIZADO_INDEX", "tenant-actualizado-index")
+
+# Tiempo que se guardan las lápidas; un watermark más antiguo obliga a recargar todo
+RETENCION_LAPIDAS_S = int(os.environ.get("TOMBSTONES_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# El GSI de actualizado_en es eventualmente consistente y otra Lambda puede escribir con una
+# marca anterior a la de un cambio ya visible: el watermark devuelto retrocede este margen,
+# así el siguiente delta vuelve a pedirlo (el cliente aplica los cambios por uuid y versión)
+SOLAPE_MS = int(os.environ.get("CHANGES_OVERLAP_MS", "5000"))
+
+
+def parsear_watermark(valor):
+    if valor in (None, ""):
+        return 0
+    try:
+        desde = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError("since debe ser un timestamp en milisegundos")
+    if desde < 0:
+        raise ValueError("since debe ser un timestamp en milisegundos")
+    return desde
+
+
+def requiere_resync(desde):
+    # Las lápidas anteriores a la retención ya expiraron: el delta estaría incompleto
+    return 0 < desde < ahora_ms() - RETENCION_LAPIDAS_S * 1000
+
+
+def construir_lapida(tenant_id, uuid, version, eliminado_en=None):
+    eliminado_en = eliminado_en or ahora_ms()
+    return {
+        "tenant_id": tenant_id,
+        "clave": f"{eliminado_en:013d}#{uuid}",
+        "uuid": uuid,
+        "version": version,
+        "eliminado_en": eliminado_en,
+        # TTL de DynamoDB (segundos)
+        "expira_en": eliminado_en // 1000 + RETENCION_LAPIDAS_S
+    }
+
+
+def kwargs_actualizados(tenant_id, desde):
+    # Reportes creados o modificados desde el watermark (inclusive), en orden de cambio
+    return {
+        "IndexName": ACTUALIZADO_INDEX,
+        "KeyConditionExpression": Key("tenant_id").eq(tenant_id) & Key("actualizado_en").gte(desde)
+    }
+
+
+def obtener_eliminados(tombstones_table, tenant_id, desde):
+    return [
+        {"uuid": item["uuid"], "version": item["version"], "eliminado_en": item["eliminado_en"]}
+        for item in iterar_items(
+            tombstones_table.query,
+            KeyConditionExpression=Key("tenant_id").eq(tenant_id) & Key("clave").gte(f"{desde:013d}")
+        )
+    ]
+
+
+def calcular_watermark(desde, actualizados, eliminados):
+    marcas = [int(item["actualizado_en"]) for item in actualizados]
+    marcas += [int(item["eliminado_en"]) for item in eliminados]
+    return max([desde] + marcas)
+
+
+def watermark_con_solape(desde, marca):
+    # Watermark que se devuelve al cliente: la marca más nueva vista menos el margen,
+    # sin retroceder más allá de desde
+    return max(desde, marca - SOLAPE_MS)
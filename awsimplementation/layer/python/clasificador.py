@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+# Reglas por defecto junto al módulo; CLASIFICADOR_REGLAS apunta a otro archivo
+REGLAS_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reglas_urgencia.json")
+
+
+# Marcas diacríticas combinantes que quedan sueltas tras NFKD (tildes, diéresis, virgulilla)
+_DIACRITICOS = re.compile("[\u0300-\u036f]")
+# Separador de filas en la versión por columnas: no es espacio ni carácter de palabra
+_SEPARADOR = "\x00"
+
+
+def plegar(texto):
+    # Minúsculas sin tildes y espacios colapsados: "Pabellón  A" -> "pabellon a"
+    texto = str(texto or "")
+    if not texto.isascii():
+        texto = _DIACRITICOS.sub("", unicodedata.normalize("NFKD", texto))
+    return " ".join(texto.split()).lower()
+
+
+def _patron(frases):
+    # Una sola alternancia compilada; las frases largas primero para que ganen al solapar.
+    # Sin \b inicial: así re puede saltar directo a los caracteres con que empiezan las
+    # frases; el borde izquierdo se valida en _buscar.
+    frases = sorted(frases, key=len, reverse=True)
+    if not frases:
+        return None
+    return re.compile(r"(?:" + "|".join(re.escape(f) for f in frases) + r")\b")
+
+
+def _buscar(regex, texto):
+    # Coincidencias que empiezan en borde de palabra: (posición, frase)
+    for m in regex.finditer(texto):
+        inicio = m.start()
+        if inicio == 0 or not (texto[inicio - 1].isalnum() or texto[inicio - 1] == "_"):
+            yield inicio, m.group()
+
+
+class Clasificador:
+    # Reglas compiladas una vez: puntaje = peso del tipo + pesos de las palabras clave
+    # encontradas (cada una cuenta una vez), acotado a los niveles; la ubicación puede
+    # imponer un nivel mínimo.
+
+    def __init__(self, reglas):
+        self.niveles = list(reglas["niveles"])
+        self.tipos = dict(reglas.get("tipos", {}))
+        self.tipo_default = int(reglas.get("tipo_default", 0))
+        self.pesos = {plegar(k): int(v) for k, v in reglas.get("palabras_clave", {}).items()}
+        self.minimos_ubicacion = {
+            plegar(k): self.niveles.index(v) for k, v in reglas.get("ubicaciones", {}).items()
+        }
+        self._regex_palabras = _patron(self.pesos)
+        self._regex_ubicaciones = _patron(self.minimos_ubicacion)
+        # Huella de las reglas: se guarda en cada reporte clasificado (reglas_version)
+        canonico = json.dumps(reglas, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        self.version = hashlib.sha256(canonico).hexdigest()[:12]
+
+    @classmethod
+    def desde_archivo(cls, ruta=None):
+        with open(ruta or os.environ.get("CLASIFICADOR_REGLAS", REGLAS_DEFAULT), encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _indice(self, puntaje):
+        return max(0, min(len(self.niveles) - 1, puntaje))
+
+    def indice_nivel(self, nivel):
+        nivel = plegar(nivel)
+        return self.niveles.index(nivel) if nivel in self.niveles else None
+
+    def clasificar(self, tipo_incidente, descripcion, ubicacion=None):
+        puntaje = self.tipos.get(tipo_incidente, self.tipo_default)
+        if self._regex_palabras is not None:
+            encontradas = {p for _, p in _buscar(self._regex_palabras, plegar(descripcion))}
+            puntaje += sum(self.pesos[p] for p in encontradas)
+        indice = self._indice(puntaje)
+
+        if ubicacion and self._regex_ubicaciones is not None:
+            for _, lugar in _buscar(self._regex_ubicaciones, plegar(ubicacion)):
+                indice = max(indice, self.minimos_ubicacion[lugar])
+        return self.niveles[indice]
+
+    def clasificar_series(self, tipos, descripciones, ubicaciones=None):
+        # Versión por columnas: los textos se unen en un solo string con un separador,
+        # se pliegan y se recorren con el regex compilado una única vez (todo en C); cada
+        # coincidencia se asigna a su fila por offset y los puntajes se suman con NumPy.
+        import numpy as np
+        import pandas as pd
+
+        indice = tipos.index if isinstance(tipos, pd.Series) else None
+        tipos = pd.Series(_lista(tipos), dtype=object)
+        total = len(tipos)
+        puntaje = tipos.map(self.tipos).fillna(self.tipo_default).to_numpy(dtype=np.int64)
+
+        if self._regex_palabras is not None and total:
+            filas, palabras = _coincidencias(descripciones, self._regex_palabras)
+            if len(filas):
+                claves = list(self.pesos)
+                posicion = {p: i for i, p in enumerate(claves)}
+                codigos = filas * len(claves) + np.array([posicion[p] for p in palabras])
+                # Cada palabra clave cuenta una vez por fila
+                codigos = np.unique(codigos)
+                pesos = np.array([self.pesos[p] for p in claves])
+                np.add.at(puntaje, codigos // len(claves), pesos[codigos % len(claves)])
+
+        niveles = np.clip(puntaje, 0, len(self.niveles) - 1)
+
+        if ubicaciones is not None and self._regex_ubicaciones is not None and total:
+            filas, lugares = _coincidencias(ubicaciones, self._regex_ubicaciones)
+            if len(filas):
+                minimos = np.array([self.minimos_ubicacion[l] for l in lugares])
+                np.maximum.at(niveles, filas, minimos)
+
+        return pd.Series(np.asarray(self.niveles, dtype=object)[niveles], index=indice)
+
+
+def _lista(valores):
+    # Series / arrays a lista de Python: iterarlos elemento a elemento es mucho más lento
+    return valores.tolist() if hasattr(valores, "tolist") else list(valores)
+
+
+def _coincidencias(valores, regex):
+    # (filas, textos) de cada coincidencia del regex sobre una columna de textos
+    import numpy as np
+
+    textos = ["" if v is None or v != v else str(v) for v in _lista(valores)]
+    unido = _SEPARADOR.join(textos)
+    if unido.count(_SEPARADOR) != len(textos) - 1:
+        # Algún texto trae el separador: se reemplaza antes de unir
+        unido = _SEPARADOR.join(t.replace(_SEPARADOR, " ") for t in textos)
+    unido = plegar(unido)
+    # Offset de inicio de cada fila ya plegada (el plegado puede cambiar longitudes)
+    largos = np.fromiter(map(len, unido.split(_SEPARADOR)), dtype=np.int64, count=len(textos)) + 1
+    inicios = np.cumsum(largos) - largos
+
+    posiciones, encontrados = [], []
+    for inicio, frase in _buscar(regex, unido):
+        posiciones.append(inicio)
+        encontrados.append(frase)
+    filas = np.searchsorted(inicios, np.array(posiciones, dtype=np.int64), side="right") - 1
+    return filas, encontrados
+
+
+_clasificador = None
+
+
+def obtener_clasificador():
+    # Se compila una vez por contenedor / proceso
+    global _clasificador
+    if _clasificador is None:
+        _clasificador = Clasificador.desde_archivo()
+    return _clasificador
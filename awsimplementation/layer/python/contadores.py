@@ -0,0 +1,122 @@
+import time
+from collections import Counter
+from boto3.dynamodb.conditions import Key
+
+# Un contador por tenant x combinación de estas dimensiones
+DIMENSIONES = ("tipo_incidente", "nivel_urgencia", "estado")
+SIN_VALOR = "desconocido"
+# Item por tenant con el número de escrituras: versión de la colección para los ETag
+CLAVE_CAMBIOS = "_cambios"
+
+# Solo depende de boto3: lo usan tanto las Lambdas (layer) como el DAG de Airflow
+
+
+def dimensiones(reporte):
+    return tuple(str(reporte.get(campo) or SIN_VALOR) for campo in DIMENSIONES)
+
+
+def clave(dims):
+    return "#".join(dims)
+
+
+def deltas(reportes, signo=1):
+    # {(tenant_id, dims): delta} de una lista de reportes; signo=-1 para eliminaciones
+    cambios = Counter()
+    for reporte in reportes:
+        cambios[(reporte.get("tenant_id", "utec"), dimensiones(reporte))] += signo
+    return cambios
+
+
+def deltas_cambio(antes, despues):
+    # Mover un reporte de una combinación a otra (cambio de estado o de urgencia)
+    cambios = Counter()
+    origen = (antes.get("tenant_id", "utec"), dimensiones(antes))
+    destino = (despues.get("tenant_id", "utec"), dimensiones(despues))
+    if origen != destino:
+        cambios[origen] -= 1
+        cambios[destino] += 1
+    else:
+        # Sin movimiento en los contadores, pero el tenant igual cambió
+        cambios[origen] += 0
+    return cambios
+
+
+def aplicar(table, cambios):
+    # ADD atómico por combinación: no hace falta leer el valor actual ni bloquear.
+    # Se llama después de escribir los reportes, así que también marca el cambio del tenant.
+    ahora = int(time.time() * 1000)
+    for (tenant_id, dims), delta in cambios.items():
+        if not delta:
+            continue
+        table.update_item(
+            Key={"tenant_id": tenant_id, "clave": clave(dims)},
+            UpdateExpression="ADD #total :n SET #tipo = :tipo, #nivel = :nivel, #estado = :estado, #act = :ahora",
+            ExpressionAttributeNames={
+                "#total": "total",
+                "#tipo": "tipo_incidente",
+                "#nivel": "nivel_urgencia",
+                "#estado": "estado",
+                "#act": "actualizado_en"
+            },
+            ExpressionAttributeValues={
+                ":n": delta,
+                ":tipo": dims[0],
+                ":nivel": dims[1],
+                ":estado": dims[2],
+                ":ahora": ahora
+            }
+        )
+    marcar_cambios(table, {tenant_id for tenant_id, _ in cambios}, ahora)
+
+
+def marcar_cambios(table, tenant_ids, ahora=None):
+    ahora = ahora or int(time.time() * 1000)
+    for tenant_id in tenant_ids:
+        table.update_item(
+            Key={"tenant_id": tenant_id, "clave": CLAVE_CAMBIOS},
+            UpdateExpression="ADD #cambios :uno SET #act = :ahora",
+            ExpressionAttributeNames={"#cambios": "cambios", "#act": "actualizado_en"},
+            ExpressionAttributeValues={":uno": 1, ":ahora": ahora}
+        )
+
+
+def leer_cambios(table, tenant_id):
+    # Lectura consistente: justo después de una escritura no debe devolver la versión anterior
+    response = table.get_item(
+        Key={"tenant_id": tenant_id, "clave": CLAVE_CAMBIOS},
+        ProjectionExpression="#cambios",
+        ExpressionAttributeNames={"#cambios": "cambios"},
+        ConsistentRead=True
+    )
+    return int(response.get("Item", {}).get("cambios", 0))
+
+
+def leer_contadores(table, tenant_id):
+    # Todas las combinaciones del tenant con una sola query por clave (pocas decenas de items)
+    kwargs = {"KeyConditionExpression": Key("tenant_id").eq(tenant_id)}
+    items = []
+    while True:
+        response = table.query(**kwargs)
+        items.extend(item for item in response.get("Items", []) if item.get("clave") != CLAVE_CAMBIOS)
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def resumir(items, filtros=None):
+    # Totales por dimensión a partir de los contadores, opcionalmente filtrados por igualdad
+    filtros = {c: v for c, v in (filtros or {}).items() if c in DIMENSIONES and v not in (None, "")}
+    resumen = {"total": 0, **{f"por_{c}": Counter() for c in DIMENSIONES}, "combinaciones": []}
+    for item in items:
+        total = int(item.get("total", 0))
+        if total <= 0 or any(item.get(c) != v for c, v in filtros.items()):
+            continue
+        resumen["total"] += total
+        for campo in DIMENSIONES:
+            resumen[f"por_{campo}"][item.get(campo)] += total
+        resumen["combinaciones"].append({**{c: item.get(c) for c in DIMENSIONES}, "total": total})
+
+    for campo in DIMENSIONES:
+        resumen[f"por_{campo}"] = dict(resumen[f"por_{campo}"])
+    resumen["combinaciones"].sort(key=lambda c: -c["total"])
+    return resumen
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import random
+import re
+import struct
+import zlib
+from clasificador import plegar
+from lotes import escribir_en_lotes, leer_en_lotes
+
+# Detección de casi-duplicados al crear un reporte (p. ej. decenas de alumnos reportando
+# la misma alarma). MinHash sobre shingles de caracteres de la descripción + LSH por
+# bandas: cada banda es un bucket en la tabla de firmas cuya clave incluye tipo_incidente
+# y ubicacion, así que esos dos campos tienen que coincidir exactamente (tras plegar).
+# Buscar es un BatchGetItem de BANDAS claves y registrar un BatchWriteItem, sin importar
+# cuántos reportes tenga el tenant. Los buckets expiran con la ventana (TTL).
+
+VENTANA_S = int(os.environ.get("DUPLICATE_WINDOW_SECONDS", "900"))
+# Jaccard estimado mínimo entre descripciones para considerarlas el mismo incidente
+UMBRAL = float(os.environ.get("DUPLICATE_THRESHOLD", "0.5"))
+SHINGLE = 5
+BANDAS = 10
+FILAS = 2
+PERMUTACIONES = BANDAS * FILAS
+
+_PRIMO = (1 << 61) - 1
+_MASCARA = (1 << 32) - 1
+# Semilla fija: las firmas tienen que ser iguales en todos los contenedores
+_rnd = random.Random(20240611)
+_COEFICIENTES = [(_rnd.randrange(1, _PRIMO), _rnd.randrange(0, _PRIMO)) for _ in range(PERMUTACIONES)]
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def shingles(texto):
+    # 5-gramas de caracteres del texto plegado: tolera typos, tildes y orden de palabras cercano
+    texto = _NO_ALFANUMERICO.sub(" ", plegar(texto)).strip()
+    if len(texto) <= SHINGLE:
+        return {texto} if texto else set()
+    return {texto[i:i + SHINGLE] for i in range(len(texto) - SHINGLE + 1)}
+
+
+def firmar(texto):
+    # MinHash: por cada permutación (a*x + b mod p), el mínimo sobre los shingles
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(texto)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIMO for h in hashes) & _MASCARA for a, b in _COEFICIENTES]
+
+
+def similitud(firma, otra):
+    # Fracción de mínimos iguales = Jaccard estimado entre los conjuntos de shingles
+    return sum(x == y for x, y in zip(firma, otra)) / len(firma)
+
+
+def a_bytes(firma):
+    return struct.pack(f"<{len(firma)}I", *firma)
+
+
+def desde_bytes(datos):
+    datos = bytes(getattr(datos, "value", datos))
+    return list(struct.unpack(f"<{len(datos) // 4}I", datos))
+
+
+def claves_bandas(reporte, firma):
+    # Clave de cada bucket: tipo y ubicación exactos + hash de las FILAS de la banda
+    prefijo = f"{plegar(reporte.get('tipo_incidente'))}|{plegar(reporte.get('ubicacion'))}"
+    claves = []
+    for banda in range(BANDAS):
+        filas = a_bytes(firma[banda * FILAS:(banda + 1) * FILAS])
+        claves.append(f"{prefijo}|{banda}|{hashlib.blake2b(filas, digest_size=8).hexdigest()}")
+    return claves
+
+
+def buscar_padre(signatures_table, reporte, firma, ahora):
+    # uuid del reporte más parecido dentro de la ventana, o None
+    tenant_id = reporte["tenant_id"]
+    keys = [{"tenant_id": tenant_id, "clave": clave} for clave in claves_bandas(reporte, firma)]
+    mejor, mejor_similitud = None, UMBRAL
+    vistos = set()
+    for item in leer_en_lotes(signatures_table.name, keys):
+        if item["uuid"] in vistos or int(item.get("creado_en", 0)) < ahora - VENTANA_S * 1000:
+            continue
+        vistos.add(item["uuid"])
+        parecido = similitud(firma, desde_bytes(item["firma"]))
+        if parecido >= mejor_similitud:
+            mejor, mejor_similitud = item["uuid"], parecido
+    return mejor
+
+
+def registrar(signatures_table, reporte, firma):
+    # El reporte pasa a ser el candidato de sus buckets (pisa al anterior de cada uno)
+    datos = a_bytes(firma)
+    requests = [{"PutRequest": {"Item": {
+        "tenant_id": reporte["tenant_id"],
+        "clave": clave,
+        "uuid": reporte["uuid"],
+        "firma": datos,
+        "creado_en": reporte["creado_en"],
+        # TTL de DynamoDB (segundos)
+        "expira_en": reporte["creado_en"] // 1000 + VENTANA_S
+    }}} for clave in claves_bandas(reporte, firma)]
+    return escribir_en_lotes(signatures_table.name, requests)
+
+
+def adjuntar(reports_table, tenant_id, padre, ahora):
+    # Suma el duplicado al padre si sigue abierto (cola solo existe en abiertos, ver triage.py).
+    # Devuelve el nuevo contador o None si el padre ya no está abierto.
+    try:
+        response = reports_table.update_item(
+            Key={"tenant_id": tenant_id, "uuid": padre},
+            UpdateExpression="SET actualizado_en = :t, ultimo_duplicado_en = :t ADD duplicados :uno, version :uno",
+            ConditionExpression="attribute_exists(cola)",
+            ExpressionAttributeValues={":t": ahora, ":uno": 1},
+            ReturnValues="UPDATED_NEW"
+        )
+    except reports_table.meta.client.exceptions.ConditionalCheckFailedException:
+        return None
+    return int(response["Attributes"]["duplicados"])
@@ -0,0 +1,30 @@
+import hashlib
+
+# ETag de un reporte: su versión (ActualizarEstado y la clasificación la incrementan).
+# ETag de una lista: el contador de cambios del tenant (contadores.leer_cambios) más los
+# parámetros de la consulta, para que cada página/proyección tenga el suyo.
+
+
+def etag_item(item):
+    version = item.get("version")
+    if version is None:
+        # Reportes anteriores al campo version
+        version = f"t{item.get('actualizado_en') or item.get('creado_en') or 0}"
+    return f'"{item.get("uuid")}.{version}"'
+
+
+def etag_coleccion(tenant_id, cambios, params=None):
+    consulta = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()) if v not in (None, ""))
+    huella = hashlib.blake2b(consulta.encode("utf-8"), digest_size=6).hexdigest()
+    return f'"{tenant_id}.{cambios}.{huella}"'
+
+
+def coincide(if_none_match, etag):
+    # If-None-Match admite varios ETag separados por comas, W/ (comparación débil) y *
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
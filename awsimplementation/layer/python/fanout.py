@@ -0,0 +1,53 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from serializacion import dumps_bytes
+from metricas import sumar_fase, contar, medir_bytes
+
+# Número máximo de envíos simultáneos a API Gateway
+MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "32"))
+
+
+def difundir(api, connections_table, connection_ids, message, max_workers=None):
+    inicio = time.perf_counter()
+
+    # Serializar una sola vez para todas las conexiones
+    data = dumps_bytes(message)
+    gone_exception = api.exceptions.GoneException
+
+    def enviar(connection_id):
+        try:
+            api.post_to_connection(ConnectionId=connection_id, Data=data)
+            return "enviado"
+        except gone_exception:
+            return "desconectado"
+        except Exception as e:
+            print(f"⚠️ Error enviando a {connection_id}: {str(e)}")
+            return "fallido"
+
+    connection_ids = list(connection_ids)
+    workers = max(1, min(max_workers or MAX_WORKERS, len(connection_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        resultados = list(executor.map(enviar, connection_ids))
+
+    # Borrar en lote las conexiones muertas para no volver a intentarlas
+    desconectadas = [cid for cid, r in zip(connection_ids, resultados) if r == "desconectado"]
+    if desconectadas:
+        try:
+            with connections_table.batch_writer() as batch:
+                for connection_id in desconectadas:
+                    batch.delete_item(Key={"connectionId": connection_id})
+        except Exception as e:
+            print(f"⚠️ No se pudieron eliminar conexiones caídas: {str(e)}")
+
+    stats = {
+        "enviados": resultados.count("enviado"),
+        "desconectados": len(desconectadas),
+        "fallidos": resultados.count("fallido"),
+        "duracion_ms": round((time.perf_counter() - inicio) * 1000, 2)
+    }
+    sumar_fase("fanout", stats["duracion_ms"])
+    medir_bytes("fanout_bytes", len(data) * len(connection_ids))
+    for clave in ("enviados", "desconectados", "fallidos"):
+        contar(f"fanout_{clave}", stats[clave])
+    return stats
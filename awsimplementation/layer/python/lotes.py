@@ -0,0 +1,88 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+from runtime import obtener_dynamodb
+
+# Límites de BatchWriteItem y BatchGetItem
+BATCH_SIZE = 25
+BATCH_GET_SIZE = 100
+MAX_INTENTOS = 6
+BACKOFF_BASE = 0.05
+BACKOFF_MAX = 2.0
+MAX_WORKERS = 4
+
+ERRORES_REINTENTABLES = (
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError"
+)
+
+
+def _esperar(intento):
+    # Backoff exponencial con jitter completo
+    time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** intento))))
+
+
+def _escribir_chunk(client, table_name, requests):
+    # El cliente del resource (de)serializa los tipos de DynamoDB por nosotros
+    pendientes = requests
+    for intento in range(MAX_INTENTOS):
+        try:
+            response = client.batch_write_item(RequestItems={table_name: pendientes})
+            pendientes = response.get("UnprocessedItems", {}).get(table_name, [])
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ERRORES_REINTENTABLES:
+                print(f"⚠️ BatchWriteItem falló en {table_name}: {str(e)}")
+                break
+        if not pendientes:
+            return []
+        _esperar(intento)
+    return pendientes
+
+
+def escribir_en_lotes(table_name, requests, max_workers=None):
+    # Escribe en chunks de 25 en paralelo, reintentando UnprocessedItems.
+    # Devuelve los requests que no se pudieron escribir tras los reintentos.
+    client = obtener_dynamodb().meta.client
+    chunks = [requests[i:i + BATCH_SIZE] for i in range(0, len(requests), BATCH_SIZE)]
+    if not chunks:
+        return []
+
+    workers = max(1, min(max_workers or MAX_WORKERS, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        resultados = executor.map(lambda chunk: _escribir_chunk(client, table_name, chunk), chunks)
+        return [request for fallidos in resultados for request in fallidos]
+
+
+def _leer_chunk(client, table_name, keys, extra):
+    items = []
+    pendientes = {table_name: {"Keys": keys, **extra}}
+    for intento in range(MAX_INTENTOS):
+        try:
+            response = client.batch_get_item(RequestItems=pendientes)
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            pendientes = response.get("UnprocessedKeys") or {}
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ERRORES_REINTENTABLES:
+                print(f"⚠️ BatchGetItem falló en {table_name}: {str(e)}")
+                raise
+        if not pendientes:
+            return items
+        _esperar(intento)
+    raise RuntimeError(f"BatchGetItem no terminó tras {MAX_INTENTOS} intentos en {table_name}")
+
+
+def leer_en_lotes(table_name, keys, max_workers=None, **extra):
+    # Lee en chunks de 100 en paralelo (extra: ProjectionExpression, etc.). Solo
+    # devuelve los items que existen; el orden no está garantizado.
+    client = obtener_dynamodb().meta.client
+    chunks = [keys[i:i + BATCH_GET_SIZE] for i in range(0, len(keys), BATCH_GET_SIZE)]
+    if not chunks:
+        return []
+
+    workers = max(1, min(max_workers or MAX_WORKERS, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        resultados = executor.map(lambda chunk: _leer_chunk(client, table_name, chunk, extra), chunks)
+        return [item for items in resultados for item in items]
@@ -0,0 +1,149 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Métricas por invocación en formato CloudWatch Embedded Metric Format (EMF): una línea
+# JSON por invocación que CloudWatch convierte en métricas sin llamar a PutMetricData.
+NAMESPACE = os.environ.get("METRICS_NAMESPACE", "Reportes")
+# Fracción de invocaciones que registran el event completo (siempre si hay error)
+TASA_LOG_EVENTO = float(os.environ.get("EVENT_LOG_SAMPLE_RATE", "0.01"))
+
+_lock = threading.Lock()
+_cold_start = True
+# Registro de la invocación en curso: una invocación a la vez por contenedor, pero
+# las fases pueden sumarse desde los hilos de fan-out y de lotes
+_actual = None
+
+
+class _Registro:
+    def __init__(self):
+        self.fases = {}
+        self.conteos = {}
+        self.bytes = {}
+        self.propiedades = {}
+
+
+def _sumar(destino, clave, valor):
+    registro = _actual
+    if registro is None:
+        return
+    with _lock:
+        dic = getattr(registro, destino)
+        dic[clave] = dic.get(clave, 0) + valor
+
+
+def sumar_fase(nombre, ms):
+    _sumar("fases", nombre, ms)
+
+
+def contar(nombre, cantidad=1):
+    _sumar("conteos", nombre, cantidad)
+
+
+def medir_bytes(nombre, cantidad):
+    _sumar("bytes", nombre, cantidad)
+
+
+def propiedad(nombre, valor):
+    # Dato de contexto en la línea EMF (no es métrica)
+    if _actual is not None:
+        _actual.propiedades[nombre] = valor
+
+
+@contextmanager
+def fase(nombre):
+    # Las fases pueden solaparse (p. ej. dynamodb dentro de fanout)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        sumar_fase(nombre, (time.perf_counter() - inicio) * 1000)
+
+
+def instrumentar_cliente(client, nombre):
+    # Tiempo y cantidad de llamadas de un cliente de boto3 (hooks de botocore)
+    def antes(context, **kwargs):
+        context["_metricas_inicio"] = time.perf_counter()
+
+    def despues(context, **kwargs):
+        inicio = context.pop("_metricas_inicio", None)
+        if inicio is not None:
+            sumar_fase(nombre, (time.perf_counter() - inicio) * 1000)
+            contar(f"{nombre}_llamadas")
+
+    client.meta.events.register("before-call", antes)
+    client.meta.events.register("after-call", despues)
+    return client
+
+
+def _redactar(event):
+    # El event muestreado no debe llevar tokens ni contraseñas a los logs
+    event = dict(event or {})
+    if event.get("headers"):
+        event["headers"] = {
+            k: ("***" if k.lower() == "authorization" else v) for k, v in event["headers"].items()
+        }
+    if "password" in str(event.get("body") or ""):
+        event["body"] = "***"
+    return event
+
+
+def _emitir(nombre, registro, duracion_ms, status, cold_start):
+    valores = {"duracion_ms": ("Milliseconds", duracion_ms), "cold_start": ("Count", int(cold_start))}
+    for fase_, ms in registro.fases.items():
+        valores[f"{fase_}_ms"] = ("Milliseconds", ms)
+    for conteo, cantidad in registro.conteos.items():
+        valores[conteo] = ("Count", cantidad)
+    for medida, cantidad in registro.bytes.items():
+        valores[medida] = ("Bytes", cantidad)
+
+    linea = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [["handler"]],
+                "Metrics": [{"Name": k, "Unit": unidad} for k, (unidad, _) in valores.items()]
+            }]
+        },
+        "handler": nombre,
+        "status": status,
+        **registro.propiedades,
+        **{k: round(v, 3) if isinstance(v, float) else v for k, (_, v) in valores.items()}
+    }
+    print(json.dumps(linea, default=str))
+
+
+def instrumentar(handler):
+    # Decorador para lambda_handler: cold/warm, fases, tamaños y conteos en una línea EMF
+    nombre = handler.__module__
+
+    @wraps(handler)
+    def envoltura(event, context):
+        global _actual, _cold_start
+        cold_start, _cold_start = _cold_start, False
+        _actual = registro = _Registro()
+        request_id = getattr(context, "aws_request_id", None)
+        if request_id:
+            registro.propiedades["request_id"] = request_id
+
+        status = 500
+        inicio = time.perf_counter()
+        try:
+            resultado = handler(event, context)
+            if isinstance(resultado, dict):
+                status = resultado.get("statusCode", 200)
+            return resultado
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            _actual = None
+            if status >= 500 or random.random() < TASA_LOG_EVENTO:
+                print(json.dumps({"handler": nombre, "request_id": request_id, "status": status,
+                                  "event": _redactar(event)}, default=str))
+            _emitir(nombre, registro, duracion_ms, status, cold_start)
+
+    return envoltura
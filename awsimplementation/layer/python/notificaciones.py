@@ -0,0 +1,151 @@
+import os
+from boto3.dynamodb.types import TypeDeserializer
+from fanout import difundir
+from metricas import contar
+from suscripciones import obtener_conexiones, topicos_de_reporte
+
+# Eventos por frame agrupado (~400 B por reporte, lejos de los 128 KB de API Gateway)
+MAX_EVENTOS_FRAME = int(os.environ.get("NOTIFICATION_MAX_EVENTS_PER_FRAME", "100"))
+# Retraso máximo prometido entre la escritura y el frame: la ventana de batching del
+# stream (maximumBatchingWindow) más el procesamiento. Si se pasa, queda en las métricas.
+RETRASO_MAX_MS = int(os.environ.get("NOTIFICATION_MAX_DELAY_MS", "3000"))
+# Campos que cambian en cada escritura (o que derivan de otros, como la cola de triage):
+# un MODIFY que solo toca estos no se notifica como reporteActualizado. Los de duplicados
+# (duplicados.adjuntar) salen como un reporteDuplicado compacto, ver eventos_de_stream.
+CAMPOS_CONTROL = {"version", "actualizado_en", "reglas_version", "cola", "orden_urgencia",
+                  "duplicados", "ultimo_duplicado_en"}
+
+_deserializador = TypeDeserializer()
+
+
+def imagen(record, clave):
+    # NewImage/OldImage del stream vienen en el formato tipado de DynamoDB ({"S": ...})
+    raw = (record.get("dynamodb") or {}).get(clave)
+    if not raw:
+        return None
+    return {k: _deserializador.deserialize(v) for k, v in raw.items()}
+
+
+def campos_cambiados(anterior, nuevo):
+    claves = set(anterior) | set(nuevo)
+    return sorted(c for c in claves if c not in CAMPOS_CONTROL and anterior.get(c) != nuevo.get(c))
+
+
+def eventos_de_stream(records):
+    # [(tenant_id, mensaje, reporte, creado_ms)] en el orden del stream (por shard = por reporte)
+    eventos = []
+    for record in records:
+        nombre = record.get("eventName")
+        nuevo = imagen(record, "NewImage")
+        anterior = imagen(record, "OldImage")
+        creado = int((record.get("dynamodb") or {}).get("ApproximateCreationDateTime") or 0) * 1000
+
+        if nombre == "INSERT" and nuevo:
+            eventos.append((nuevo.get("tenant_id", "utec"), {"type": "nuevoReporte", "data": nuevo}, nuevo, creado))
+        elif nombre == "MODIFY" and nuevo:
+            cambios = campos_cambiados(anterior or {}, nuevo)
+            if not cambios and nuevo.get("duplicados") != (anterior or {}).get("duplicados"):
+                # Solo llegó un duplicado: el contador, no el reporte completo
+                mensaje = {
+                    "type": "reporteDuplicado",
+                    "tenant_id": nuevo.get("tenant_id", "utec"),
+                    "uuid": nuevo.get("uuid"),
+                    "duplicados": int(nuevo["duplicados"]),
+                    "version": int(nuevo.get("version", 0))
+                }
+                eventos.append((mensaje["tenant_id"], mensaje, nuevo, creado))
+                continue
+            if not cambios:
+                contar("stream_sin_cambios")
+                continue
+            mensaje = {"type": "reporteActualizado", "data": nuevo, "cambios": cambios}
+            eventos.append((nuevo.get("tenant_id", "utec"), mensaje, nuevo, creado))
+        elif nombre == "REMOVE" and anterior:
+            # Misma versión que la lápida de EliminarReporte: el borrado cuenta como escritura
+            mensaje = {
+                "type": "reporteEliminado",
+                "tenant_id": anterior.get("tenant_id", "utec"),
+                "uuid": anterior.get("uuid"),
+                "version": int(anterior.get("version", 0)) + 1
+            }
+            eventos.append((mensaje["tenant_id"], mensaje, anterior, creado))
+    return ultimo_duplicado_por_reporte(eventos)
+
+
+def ultimo_duplicado_por_reporte(eventos):
+    # Una ráfaga de duplicados del mismo reporte en la ventana del stream sale como un solo
+    # reporteDuplicado con el último contador: a lo sumo uno por reporte y lote
+    ultimo = {}
+    for i, (_, mensaje, _, _) in enumerate(eventos):
+        if mensaje["type"] == "reporteDuplicado":
+            ultimo[mensaje["uuid"]] = i
+    filtrados = [
+        evento for i, evento in enumerate(eventos)
+        if evento[1]["type"] != "reporteDuplicado" or ultimo[evento[1]["uuid"]] == i
+    ]
+    contar("duplicados_coalescidos", len(eventos) - len(filtrados))
+    return filtrados
+
+
+def retraso_ms(eventos, ahora_ms):
+    # ApproximateCreationDateTime tiene resolución de segundos
+    creados = [creado for _, _, _, creado in eventos if creado]
+    return max(0, ahora_ms - min(creados)) if creados else 0
+
+
+def frames(mensajes):
+    # Un solo evento viaja como siempre; varios van juntos y en orden, partidos cada
+    # MAX_EVENTOS_FRAME para no pasar el límite de 128 KB por frame. El frame se llama
+    # nuevosReportes si trae alguna alta y cambiosReportes si solo trae cambios o bajas;
+    # en ambos el cliente aplica cada evento de `eventos` según su propio type.
+    if len(mensajes) == 1:
+        return [mensajes[0]]
+    return [
+        {"type": tipo_frame(parte), "total": len(parte), "eventos": parte}
+        for parte in (mensajes[i:i + MAX_EVENTOS_FRAME] for i in range(0, len(mensajes), MAX_EVENTOS_FRAME))
+    ]
+
+
+def tipo_frame(mensajes):
+    return "nuevosReportes" if any(m["type"] == "nuevoReporte" for m in mensajes) else "cambiosReportes"
+
+
+def por_tenant(eventos):
+    agrupados = {}
+    for tenant_id, mensaje, reporte, _ in eventos:
+        agrupados.setdefault(tenant_id, []).append((mensaje, reporte))
+    return agrupados
+
+
+def notificar(api, connections_table, eventos):
+    # Coalescencia: todos los eventos del lote (la ventana de batching del stream) de un
+    # tenant salen en un frame por conexión. Las conexiones que reciben el mismo subconjunto
+    # de eventos (según sus tópicos) comparten una sola serialización y un solo difundir.
+    resumen = {"eventos": len(eventos), "frames": 0, "frames_ahorrados": 0, "enviados": 0,
+               "desconectados": 0, "fallidos": 0, "tenants_fallidos": []}
+    for tenant_id, eventos_tenant in por_tenant(eventos).items():
+        try:
+            topicos = [topicos_de_reporte(reporte) for _, reporte in eventos_tenant]
+            grupos = {}
+            for connection_id, suyos in obtener_conexiones(connections_table, tenant_id):
+                indices = tuple(i for i, t in enumerate(topicos) if not suyos or suyos & t)
+                if indices:
+                    grupos.setdefault(indices, []).append(connection_id)
+
+            for indices, connection_ids in grupos.items():
+                salientes = frames([eventos_tenant[i][0] for i in indices])
+                for frame in salientes:
+                    stats = difundir(api, connections_table, connection_ids, frame)
+                    for clave in ("enviados", "desconectados", "fallidos"):
+                        resumen[clave] += stats.get(clave, 0)
+                # Sin coalescer habría sido un frame por evento y conexión
+                resumen["frames"] += len(salientes) * len(connection_ids)
+                resumen["frames_ahorrados"] += (len(indices) - len(salientes)) * len(connection_ids)
+        except Exception as e:
+            # Best effort, como antes en CrearReporte: los clientes se resincronizan con getChanges
+            print(f"⚠️ No se pudo notificar al tenant {tenant_id}: {str(e)}")
+            resumen["tenants_fallidos"].append(tenant_id)
+
+    contar("frames", resumen["frames"])
+    contar("frames_ahorrados", resumen["frames_ahorrados"])
+    return resumen
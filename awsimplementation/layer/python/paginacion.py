@@ -0,0 +1,111 @@
+import base64
+import json
+import os
+from decimal import Decimal
+from serializacion import dumps_bytes
+
+MAX_LIMIT = 1000
+# Página por defecto si el cliente no manda limit: nunca se devuelve el tenant completo
+# en una respuesta (el límite de Lambda es 6 MB)
+LIMIT_DEFAULT = int(os.environ.get("PAGE_SIZE_DEFAULT", "50"))
+
+
+def codificar_cursor(last_key):
+    # Cursor opaco a partir de LastEvaluatedKey
+    if not last_key:
+        return None
+    return base64.urlsafe_b64encode(dumps_bytes(last_key)).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode("utf-8")
+        last_key = json.loads(raw, parse_int=Decimal, parse_float=Decimal)
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(last_key, dict):
+        raise ValueError("Cursor inválido")
+    return last_key
+
+
+def parsear_limit(valor, default=LIMIT_DEFAULT):
+    if valor in (None, ""):
+        return default
+    try:
+        limit = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError("limit debe ser un número entero")
+    if limit < 1 or limit > MAX_LIMIT:
+        raise ValueError(f"limit debe estar entre 1 y {MAX_LIMIT}")
+    return limit
+
+
+def proyeccion(fields):
+    # "uuid,estado" -> kwargs de ProjectionExpression con nombres escapados
+    if not fields:
+        return {}
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    fields = [f.strip() for f in fields if f and f.strip()]
+    if not fields:
+        return {}
+    nombres = {f"#p{i}": f for i, f in enumerate(fields)}
+    return {
+        "ProjectionExpression": ", ".join(nombres),
+        "ExpressionAttributeNames": nombres
+    }
+
+
+def combinar_kwargs(*partes):
+    # Une kwargs de query sin pisar ExpressionAttributeNames/Values
+    resultado = {}
+    for parte in partes:
+        for clave, valor in parte.items():
+            if clave in ("ExpressionAttributeNames", "ExpressionAttributeValues"):
+                resultado.setdefault(clave, {}).update(valor)
+            else:
+                resultado[clave] = valor
+    return resultado
+
+
+def obtener_pagina(operacion, limit=LIMIT_DEFAULT, cursor=None, **kwargs):
+    # Llena hasta `limit` items siguiendo LastEvaluatedKey (un FilterExpression puede
+    # devolver páginas cortas). Devuelve (items, last_key).
+    limit = limit or LIMIT_DEFAULT
+    if cursor:
+        kwargs["ExclusiveStartKey"] = cursor
+    items = []
+    while True:
+        kwargs["Limit"] = limit - len(items)
+        response = operacion(**kwargs)
+        items.extend(response.get("Items", []))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key or len(items) >= limit:
+            return items, last_key
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def paginas_con_cursor(operacion, **kwargs):
+    # (items, LastEvaluatedKey) por página; la última trae None. La clave sirve como
+    # cursor para retomar justo después de esa página, en la misma tabla o índice.
+    while True:
+        response = operacion(**kwargs)
+        last_key = response.get("LastEvaluatedKey")
+        yield response.get("Items", []), last_key
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def iterar_paginas(operacion, **kwargs):
+    # Recorre todas las páginas de un query/scan, una página en memoria a la vez
+    for items, _ in paginas_con_cursor(operacion, **kwargs):
+        yield items
+
+
+def iterar_items(operacion, **kwargs):
+    for pagina in iterar_paginas(operacion, **kwargs):
+        yield from pagina
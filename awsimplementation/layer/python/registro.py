@@ -0,0 +1,129 @@
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+from runtime import obtener_tabla, parsear_body, body_crudo, header, respuesta, error
+
+# rol -> tabla de cuentas
+TABLAS = {"usuario": "usuarios", "admin": "admins"}
+DOMINIO = "@utec.edu.pe"
+MIN_PASSWORD = 6
+MAX_CUENTAS_IMPORTACION = 10000
+MAX_WORKERS = 32
+
+
+def validar_cuenta(entrada):
+    # (cuenta, None) si es válida; (None, mensaje) si no
+    if not isinstance(entrada, dict):
+        return None, "La cuenta debe ser un objeto"
+    email = str(entrada.get("email") or "").strip().lower()
+    password = str(entrada.get("password") or "").strip()
+    nombre = str(entrada.get("nombre") or "").strip()
+
+    if not email or not password or not nombre:
+        return None, "Faltan campos: email, password, nombre"
+    if not email.endswith(DOMINIO):
+        return None, f"Solo se aceptan emails {DOMINIO}"
+    if len(password) < MIN_PASSWORD:
+        return None, f"La contraseña debe tener al menos {MIN_PASSWORD} caracteres"
+
+    return {
+        "email": email,
+        "password": password,  # En producción, encriptar con bcrypt
+        "nombre": nombre
+    }, None
+
+
+def crear_cuenta(table, cuenta):
+    # Put condicional: la unicidad del email se garantiza en un solo round trip y sin
+    # carrera entre dos registros simultáneos. False si ya existía. Va por el cliente
+    # (thread-safe, a diferencia del resource) porque la importación escribe en paralelo.
+    try:
+        table.meta.client.put_item(
+            TableName=table.name,
+            Item=cuenta,
+            ConditionExpression="attribute_not_exists(email)"
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+
+
+def registrar(rol, body):
+    cuenta, mensaje = validar_cuenta(body)
+    if mensaje:
+        return error(400, mensaje)
+
+    if not crear_cuenta(obtener_tabla(TABLAS[rol]), cuenta):
+        return error(409, "El email ya está registrado")
+
+    return respuesta(201, {
+        "mensaje": f"{rol.capitalize()} registrado exitosamente",
+        rol: {"email": cuenta["email"], "nombre": cuenta["nombre"]}
+    })
+
+
+def parsear_cuentas(event):
+    # CSV (Content-Type text/csv o {"csv": "..."}) con cabecera email,password,nombre,
+    # o JSON: {"cuentas": [...]} / [...]
+    content_type = (header(event, "Content-Type") or "").lower()
+    if "csv" in content_type:
+        texto = body_crudo(event) or ""
+    else:
+        body = parsear_body(event)
+        if isinstance(body, list):
+            return body
+        if "csv" not in body:
+            return body.get("cuentas")
+        texto = body["csv"]
+
+    if isinstance(texto, bytes):
+        texto = texto.decode("utf-8")
+    # Los CSV exportados desde Excel traen BOM
+    texto = texto.lstrip("\ufeff")
+    return [{(k or "").strip().lower(): v for k, v in fila.items()} for fila in csv.DictReader(io.StringIO(texto))]
+
+
+def importar(rol, entradas, max_workers=None):
+    # Valida todo el archivo antes de escribir y luego crea las cuentas válidas en
+    # paralelo. Devuelve (resultados por fila, resumen).
+    resultados = []
+    validas = []
+    vistos = set()
+    for indice, entrada in enumerate(entradas):
+        cuenta, mensaje = validar_cuenta(entrada)
+        if mensaje:
+            resultados.append({"indice": indice, "estado": "invalido", "error": mensaje})
+        elif cuenta["email"] in vistos:
+            resultados.append({"indice": indice, "estado": "duplicado", "email": cuenta["email"],
+                               "error": "Email repetido en el archivo"})
+        else:
+            vistos.add(cuenta["email"])
+            resultado = {"indice": indice, "estado": None, "email": cuenta["email"]}
+            resultados.append(resultado)
+            validas.append((resultado, cuenta))
+
+    table = obtener_tabla(TABLAS[rol])
+
+    def escribir(par):
+        resultado, cuenta = par
+        try:
+            if crear_cuenta(table, cuenta):
+                resultado["estado"] = "creado"
+            else:
+                resultado["estado"] = "duplicado"
+                resultado["error"] = "El email ya está registrado"
+        except ClientError as e:
+            resultado["estado"] = "error"
+            resultado["error"] = e.response["Error"]["Code"]
+
+    if validas:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers or MAX_WORKERS, len(validas)))) as executor:
+            list(executor.map(escribir, validas))
+
+    resumen = {estado: 0 for estado in ("creado", "duplicado", "invalido", "error")}
+    for resultado in resultados:
+        resumen[resultado["estado"]] += 1
+    return resultados, resumen
@@ -0,0 +1,127 @@
+import os
+import time
+import uuid
+from boto3.dynamodb.conditions import Attr, Key
+from clasificador import obtener_clasificador
+from contadores import resumir
+from triage import campos_triage
+
+CAMPOS_REQUERIDOS = ["tipo_incidente", "ubicacion", "tipo_usuario", "descripcion"]
+ESTADOS = ("pendiente", "en_proceso", "resuelto")
+# Campos que se pueden filtrar por igualdad
+FILTROS_PERMITIDOS = ("estado", "nivel_urgencia", "tipo_incidente", "ubicacion", "tipo_usuario")
+# GSI (tenant_id + campo) de los filtros frecuentes: la query lee solo los reportes que
+# coinciden. No son dispersos: los tres campos están en todos los reportes.
+INDICES_FILTRO = {
+    "estado": os.environ.get("REPORTES_ESTADO_INDEX", "tenant-estado-index"),
+    "nivel_urgencia": os.environ.get("REPORTES_URGENCIA_INDEX", "tenant-urgencia-index"),
+    "tipo_incidente": os.environ.get("REPORTES_TIPO_INDEX", "tenant-tipo-index")
+}
+
+
+def ahora_ms():
+    return int(time.time() * 1000)
+
+
+def campos_faltantes(body):
+    return [x for x in CAMPOS_REQUERIDOS if x not in body]
+
+
+def campos_invalidos(body):
+    # tenant_id y tipo_incidente son claves de la tabla o de sus GSI: un null o un número
+    # hace fallar el PutItem. Todos los campos de texto tienen que ser strings no vacíos.
+    return [
+        x for x in ["tenant_id"] + CAMPOS_REQUERIDOS
+        if x in body and not (isinstance(body[x], str) and body[x].strip())
+    ]
+
+
+def error_validacion(body):
+    # Mensaje para el 400 (o el resultado "invalido" del lote), o None si el reporte es válido
+    if not isinstance(body, dict):
+        return "El reporte debe ser un objeto"
+    missing = campos_faltantes(body)
+    if missing:
+        return f"Faltan campos: {missing}"
+    invalidos = campos_invalidos(body)
+    if invalidos:
+        return f"Campos vacíos o que no son texto: {invalidos}"
+    return None
+
+
+def nivel_urgencia(body):
+    # El motor de reglas clasifica al escribir; un nivel enviado por el cliente solo
+    # puede subir la urgencia, nunca bajarla
+    clasificador = obtener_clasificador()
+    nivel = clasificador.clasificar(body["tipo_incidente"], body["descripcion"], body["ubicacion"])
+    enviado = clasificador.indice_nivel(body.get("nivel_urgencia"))
+    if enviado is not None and enviado > clasificador.indice_nivel(nivel):
+        return clasificador.niveles[enviado]
+    return nivel
+
+
+def construir_reporte(body):
+    ahora = ahora_ms()
+    reporte = {
+        "tenant_id": body.get("tenant_id", "utec"),
+        "uuid": str(uuid.uuid4()),
+        "tipo_incidente": body["tipo_incidente"],
+        "nivel_urgencia": nivel_urgencia(body),
+        "ubicacion": body["ubicacion"],
+        "tipo_usuario": body["tipo_usuario"],
+        "descripcion": body["descripcion"],
+        "estado": "pendiente",
+        # Se incrementa en cada escritura; los lectores detectan copias obsoletas
+        "version": 1,
+        # Epoch en milisegundos; actualizado_en es la clave del índice de cambios
+        "creado_en": ahora,
+        "actualizado_en": ahora,
+        # Clasificado al escribir con estas reglas: el lote de Airflow solo lo vuelve a
+        # procesar si las reglas cambian
+        "reglas_version": obtener_clasificador().version
+    }
+    # Clave de la cola de triage (urgencia + antigüedad) y su marca de abierto
+    reporte.update(campos_triage(reporte))
+    return reporte
+
+
+def construir_filtro(filters, excluir=None):
+    filtro = None
+    for campo in FILTROS_PERMITIDOS:
+        valor = filters.get(campo)
+        if valor in (None, "") or campo == excluir:
+            continue
+        condicion = Attr(campo).eq(valor)
+        filtro = condicion if filtro is None else filtro & condicion
+    return filtro
+
+
+def campos_indexados(filters):
+    return [c for c in INDICES_FILTRO if filters.get(c) not in (None, "")]
+
+
+def elegir_indice(filters, contadores=None, cursor=None):
+    # Campo cuyo GSI se usa, o None (query del tenant + FilterExpression). Una página
+    # siguiente sigue en el índice de la primera (su LastEvaluatedKey lo incluye). Con
+    # varios filtros indexados gana el que deja menos reportes según los contadores.
+    candidatos = campos_indexados(filters)
+    if cursor:
+        campo = next((c for c in INDICES_FILTRO if c in cursor), None)
+        if campo is not None and campo not in candidatos:
+            raise ValueError("El cursor no corresponde a los filtros")
+        return campo
+    if len(candidatos) > 1 and contadores is not None:
+        return min(candidatos, key=lambda c: resumir(contadores, {c: filters[c]})["total"])
+    return candidatos[0] if candidatos else None
+
+
+def kwargs_filtrados(tenant_id, filters, campo=None):
+    # kwargs de query: por el GSI de `campo` si hay uno, el resto de filtros en FilterExpression
+    kwargs = {"KeyConditionExpression": Key("tenant_id").eq(tenant_id)}
+    if campo:
+        kwargs["IndexName"] = INDICES_FILTRO[campo]
+        kwargs["KeyConditionExpression"] &= Key(campo).eq(filters[campo])
+    filtro = construir_filtro(filters, excluir=campo)
+    if filtro is not None:
+        kwargs["FilterExpression"] = filtro
+    return kwargs
@@ -0,0 +1,168 @@
+import base64
+import json
+import os
+import threading
+
+import boto3
+from metricas import instrumentar_cliente, fase, medir_bytes
+from serializacion import dumps
+
+# Clientes y tablas cacheados por contenedor: se crean en la primera llamada
+# y se reutilizan en todas las invocaciones "warm"
+_lock = threading.Lock()
+_resource = None
+_tables = {}
+_apis = {}
+_s3 = None
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization,If-None-Match",
+    "Access-Control-Allow-Methods": "GET,POST,DELETE,OPTIONS",
+    "Access-Control-Expose-Headers": "ETag"
+}
+
+
+def obtener_dynamodb():
+    global _resource
+    if _resource is None:
+        with _lock:
+            if _resource is None:
+                _resource = boto3.resource("dynamodb")
+                instrumentar_cliente(_resource.meta.client, "dynamodb")
+    return _resource
+
+
+def obtener_tabla(nombre):
+    table = _tables.get(nombre)
+    if table is None:
+        dynamodb = obtener_dynamodb()
+        with _lock:
+            table = _tables.get(nombre)
+            if table is None:
+                table = dynamodb.Table(nombre)
+                _tables[nombre] = table
+    return table
+
+
+def tabla_reportes():
+    return obtener_tabla(os.environ.get("TABLE_NAME", "dev-t_reportes"))
+
+
+def tabla_eliminados():
+    return obtener_tabla(os.environ.get("TOMBSTONES_TABLE", "dev-t_reportes_eliminados"))
+
+
+def tabla_contadores():
+    return obtener_tabla(os.environ.get("COUNTERS_TABLE", "dev-t_reportes_contadores"))
+
+
+def tabla_firmas():
+    return obtener_tabla(os.environ.get("SIGNATURES_TABLE", "dev-t_reportes_firmas"))
+
+
+def tabla_conexiones():
+    return obtener_tabla(os.environ.get("CONNECTIONS_TABLE", "Connections"))
+
+
+def endpoint_ws(event):
+    request_context = event["requestContext"]
+    return f"https://{request_context['domainName']}/{request_context['stage']}"
+
+
+def endpoint_ws_configurado():
+    # Para handlers sin requestContext del WebSocket (p. ej. el consumidor del stream)
+    return os.environ["WS_ENDPOINT"]
+
+
+def obtener_api(endpoint):
+    # Un cliente de apigatewaymanagementapi por endpoint (dominio + stage)
+    api = _apis.get(endpoint)
+    if api is None:
+        with _lock:
+            api = _apis.get(endpoint)
+            if api is None:
+                api = instrumentar_cliente(
+                    boto3.client("apigatewaymanagementapi", endpoint_url=endpoint), "websocket"
+                )
+                _apis[endpoint] = api
+    return api
+
+
+def obtener_s3():
+    global _s3
+    if _s3 is None:
+        with _lock:
+            if _s3 is None:
+                _s3 = instrumentar_cliente(boto3.client("s3"), "s3")
+    return _s3
+
+
+def body_crudo(event):
+    # API Gateway entrega en base64 los bodies que considera binarios
+    raw_body = event.get("body")
+    if raw_body and event.get("isBase64Encoded") and isinstance(raw_body, str):
+        raw_body = base64.b64decode(raw_body).decode("utf-8")
+    return raw_body
+
+
+def parsear_body(event):
+    # El body puede venir como string o dict dependiendo de cómo lo envíe API Gateway
+    raw_body = body_crudo(event)
+    if not raw_body:
+        return {}
+    if isinstance(raw_body, (str, bytes)):
+        medir_bytes("request_bytes", len(raw_body))
+        with fase("parse"):
+            return json.loads(raw_body)
+    return raw_body
+
+
+def query_params(event):
+    return event.get("queryStringParameters") or {}
+
+
+def path_params(event):
+    return event.get("pathParameters") or {}
+
+
+def header(event, nombre):
+    # API Gateway no normaliza mayúsculas en los headers
+    nombre = nombre.lower()
+    for clave, valor in (event.get("headers") or {}).items():
+        if clave.lower() == nombre:
+            return valor
+    return None
+
+
+def respuesta(status_code, body, headers=None):
+    # La compresión de las respuestas grandes la hace API Gateway (minimumCompressionSize)
+    response_headers = dict(CORS_HEADERS)
+    if headers:
+        response_headers.update(headers)
+    with fase("serializacion"):
+        cuerpo = dumps(body)
+    medir_bytes("response_bytes", len(cuerpo))
+    return {
+        "statusCode": status_code,
+        "headers": response_headers,
+        "body": cuerpo
+    }
+
+
+def no_modificado(etag, headers=None):
+    # 304 sin cuerpo: el cliente ya tiene la representación actual. no-cache hace que
+    # el navegador revalide cada sondeo con If-None-Match en lugar de reusar sin preguntar
+    response_headers = {k: v for k, v in CORS_HEADERS.items() if k != "Content-Type"}
+    response_headers.update(headers or {})
+    response_headers.update({"ETag": etag, "Cache-Control": "no-cache"})
+    return {
+        "statusCode": 304,
+        "headers": response_headers,
+        "body": ""
+    }
+
+
+def error(status_code, mensaje):
+    return respuesta(status_code, {"error": mensaje})
@@ -0,0 +1,35 @@
+import base64
+import json
+from decimal import Decimal
+
+# Backend JSON rápido si está instalado en el layer (pip install orjson -t layer/python);
+# si no, json de la librería estándar con la misma salida compacta
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def a_json(valor):
+    # Tipos que devuelve DynamoDB y que JSON no conoce: Decimal (todos los números),
+    # sets (SS/NS) y bytes (B)
+    if isinstance(valor, Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor)
+    if isinstance(valor, (bytes, bytearray)):
+        return base64.b64encode(valor).decode("ascii")
+    raise TypeError(f"Tipo no serializable: {type(valor)}")
+
+
+if orjson is not None:
+    def dumps_bytes(valor):
+        return orjson.dumps(valor, default=a_json)
+else:
+    def dumps_bytes(valor):
+        return json.dumps(valor, default=a_json, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps(valor):
+    return dumps_bytes(valor).decode("utf-8")
+
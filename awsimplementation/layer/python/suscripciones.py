@@ -0,0 +1,60 @@
+import os
+from boto3.dynamodb.conditions import Key
+from paginacion import iterar_items
+
+# GSI de Connections: tenant_id (HASH) + connectionId (RANGE), proyecta topics
+TENANT_INDEX = os.environ.get("CONNECTIONS_TENANT_INDEX", "tenant-index")
+
+# Campos del reporte a los que se puede suscribir un cliente ("campo:valor")
+CAMPOS_TOPICO = ("nivel_urgencia", "tipo_incidente")
+
+
+def normalizar_topicos(topics):
+    # Acepta lista o string separado por comas; descarta tópicos desconocidos
+    if not topics:
+        return set()
+    if isinstance(topics, str):
+        topics = topics.split(",")
+    normalizados = set()
+    for topico in topics:
+        campo, _, valor = str(topico).strip().partition(":")
+        campo = campo.strip().lower()
+        valor = valor.strip().lower()
+        if campo in CAMPOS_TOPICO and valor:
+            normalizados.add(f"{campo}:{valor}")
+    return normalizados
+
+
+def topicos_de_reporte(reporte):
+    return normalizar_topicos([f"{campo}:{reporte.get(campo, '')}" for campo in CAMPOS_TOPICO])
+
+
+def guardar_suscripcion(connections_table, connection_id, tenant_id, topics):
+    # Actualiza tenant y tópicos de una conexión existente
+    topicos = normalizar_topicos(topics)
+    if topicos:
+        connections_table.update_item(
+            Key={"connectionId": connection_id},
+            UpdateExpression="SET tenant_id = :t, topics = :s",
+            ExpressionAttributeValues={":t": tenant_id, ":s": topicos}
+        )
+    else:
+        connections_table.update_item(
+            Key={"connectionId": connection_id},
+            UpdateExpression="SET tenant_id = :t REMOVE topics",
+            ExpressionAttributeValues={":t": tenant_id}
+        )
+    return topicos
+
+
+def obtener_conexiones(connections_table, tenant_id):
+    # Todas las conexiones del tenant con sus tópicos, para repartir varios mensajes
+    # con una sola query
+    return [
+        (item["connectionId"], set(item.get("topics") or ()))
+        for item in iterar_items(
+            connections_table.query,
+            IndexName=TENANT_INDEX,
+            KeyConditionExpression=Key("tenant_id").eq(tenant_id)
+        )
+    ]
@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from cache import CacheLRU
+from runtime import header, error
+
+ROLES = ("usuario", "admin")
+# Las cuentas no guardan tenant: todas son del campus por defecto
+TENANT_DEFAULT = os.environ.get("DEFAULT_TENANT", "utec")
+TTL_TOKEN_S = int(os.environ.get("TOKEN_TTL_SECONDS", str(12 * 3600)))
+
+# Tokens ya verificados por contenedor: un hit evita decodificar y recalcular el HMAC
+_verificados = CacheLRU(
+    max_items=int(os.environ.get("TOKEN_CACHE_SIZE", "1000")),
+    ttl=float(os.environ.get("TOKEN_CACHE_TTL", "300"))
+)
+
+
+def _b64(datos):
+    return base64.urlsafe_b64encode(datos).rstrip(b"=").decode("ascii")
+
+
+def _b64_decodificar(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _secreto():
+    secreto = os.environ.get("TOKEN_SECRET")
+    if not secreto:
+        raise RuntimeError("TOKEN_SECRET no está configurado")
+    return secreto.encode("utf-8")
+
+
+def _firma(payload):
+    return _b64(hmac.new(_secreto(), payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def emitir_token(email, rol, ttl=None, tenant=None):
+    # <payload base64url>.<HMAC-SHA256 base64url>, sin estado en el servidor
+    if rol not in ROLES:
+        raise ValueError(f"Rol inválido: {rol}")
+    ahora = int(time.time())
+    claims = {"sub": email, "rol": rol, "tenant": tenant or TENANT_DEFAULT, "iat": ahora,
+              "exp": ahora + (ttl or TTL_TOKEN_S)}
+    payload = _b64(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_firma(payload)}", claims
+
+
+def verificar_token(token):
+    # Devuelve los claims o lanza ValueError; sin ir a DynamoDB
+    ahora = time.time()
+    claims = _verificados.obtener(token)
+    if claims is not None:
+        if claims["exp"] > ahora:
+            return claims
+        _verificados.invalidar(token)
+        raise ValueError("Token expirado")
+
+    try:
+        payload, firma = token.split(".")
+    except (AttributeError, ValueError):
+        raise ValueError("Token inválido")
+    if not hmac.compare_digest(firma, _firma(payload)):
+        raise ValueError("Token inválido")
+    try:
+        claims = json.loads(_b64_decodificar(payload))
+    except ValueError:
+        raise ValueError("Token inválido")
+    if claims.get("rol") not in ROLES or not isinstance(claims.get("exp"), int):
+        raise ValueError("Token inválido")
+    if claims["exp"] <= ahora:
+        raise ValueError("Token expirado")
+
+    # Nunca se cachea más allá de la expiración del token
+    _verificados.guardar(token, claims, ttl=min(_verificados.ttl, claims["exp"] - ahora))
+    return claims
+
+
+def tenant_de(claims):
+    # Los tokens emitidos antes del claim "tenant" son del tenant por defecto
+    return claims.get("tenant") or TENANT_DEFAULT
+
+
+def autorizar(event, *roles):
+    # (claims, None) si el request trae un token válido con alguno de los roles
+    # (admin puede todo); (None, respuesta de error) si no
+    autorizacion = header(event, "Authorization") or ""
+    token = autorizacion[7:].strip() if autorizacion[:7].lower() == "bearer " else autorizacion.strip()
+    return autorizar_token(token, roles)
+
+
+def autorizar_conexion(event, *roles):
+    # $connect del WebSocket: el navegador no puede mandar headers al abrir la conexión,
+    # así que el token llega como ?token=
+    token = ((event.get("queryStringParameters") or {}).get("token") or "").strip()
+    return autorizar_token(token, roles)
+
+
+def autorizar_token(token, roles):
+    if not token:
+        return None, error(401, "Falta el token de sesión")
+    try:
+        claims = verificar_token(token)
+    except ValueError as e:
+        return None, error(401, str(e))
+    if roles and claims["rol"] != "admin" and claims["rol"] not in roles:
+        return None, error(403, "No tiene permisos para esta operación")
+    return claims, None
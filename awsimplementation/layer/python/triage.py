@@ -0,0 +1,55 @@
+import os
+from boto3.dynamodb.conditions import Key
+from clasificador import obtener_clasificador
+
+# Cola de triage: los reportes abiertos del tenant ordenados por urgencia y antigüedad.
+# GSI disperso cola (HASH) + orden_urgencia (RANGE):
+#   - cola = tenant_id mientras el reporte está abierto; se borra al resolverlo, así el
+#     índice solo tiene abiertos y el top no depende de cuántos resueltos haya.
+#   - orden_urgencia = rango * 10^13 + creado_en (ms): rango 0 es el nivel más urgente y
+#     dentro de un nivel sale primero el más antiguo. Orden ascendente = orden de atención.
+# Solo depende de boto3 y del clasificador: lo usan las Lambdas (layer) y el DAG de Airflow.
+TRIAGE_INDEX = os.environ.get("REPORTES_TRIAGE_INDEX", "triage-index")
+ESTADOS_CERRADOS = ("resuelto",)
+TOP_DEFAULT = 20
+MAX_TOP = 100
+_BASE = 10 ** 13
+
+
+def rango(nivel_urgencia):
+    # 0 = más urgente; un nivel desconocido va detrás de todos
+    clasificador = obtener_clasificador()
+    indice = clasificador.indice_nivel(nivel_urgencia) if nivel_urgencia else None
+    if indice is None:
+        return len(clasificador.niveles)
+    return len(clasificador.niveles) - 1 - indice
+
+
+def base_urgencia(nivel_urgencia):
+    return rango(nivel_urgencia) * _BASE
+
+
+def orden_urgencia(nivel_urgencia, creado_en):
+    return base_urgencia(nivel_urgencia) + int(creado_en)
+
+
+def abierto(estado):
+    return estado not in ESTADOS_CERRADOS
+
+
+def campos_triage(reporte):
+    # Atributos de la cola para un reporte completo (alta)
+    campos = {"orden_urgencia": orden_urgencia(reporte.get("nivel_urgencia"), reporte["creado_en"])}
+    if abierto(reporte.get("estado")):
+        campos["cola"] = reporte["tenant_id"]
+    return campos
+
+
+def kwargs_top(tenant_id, limit):
+    # Una sola query acotada: los `limit` abiertos más urgentes del tenant
+    return {
+        "IndexName": TRIAGE_INDEX,
+        "KeyConditionExpression": Key("cola").eq(tenant_id),
+        "ScanIndexForward": True,
+        "Limit": limit
+    }
@@ -10,6 +10,8 @@ interface Reporte {
   tipo_usuario: string
   descripcion: string
   estado?: string
+  version?: number
+  duplicados?: number
 }
 
 interface Admin {
@@ -25,6 +27,12 @@ const WS_URL =
   import.meta.env.VITE_WS_URL ||
   "wss://9uubdx8ktg.execute-api.us-east-1.amazonaws.com/dev"
 
+// Token de sesión (login) que exige cada endpoint de reportes
+const authHeaders = (): Record<string, string> => {
+  const token = localStorage.getItem("token")
+  return token ? { Authorization: `Bearer ${token}` } : {}
+}
+
 function App() {
   const TENANT_ID = "utec"
 
@@ -34,9 +42,21 @@ function App() {
   const [error, setError] = useState<string>("")
   const [searchTerm, setSearchTerm] = useState<string>("")
   const [filterType, setFilterType] = useState<string>("tipo")
+  const [mostrarRegistro, setMostrarRegistro] = useState<boolean>(false)
+  const [nuevoAdmin, setNuevoAdmin] = useState({ nombre: "", email: "", password: "" })
+  const [registroMsg, setRegistroMsg] = useState<string>("")
 
   const ws = useRef<WebSocket | null>(null)
   const reconnectTimeout = useRef<any>(null)
+  // getIncidents llega en varios incidentsChunk; se reemplaza la lista al recibir incidentsDone
+  const incidentsBuffer = useRef<Reporte[]>([])
+
+  // Token vencido o inválido (401): volver al login
+  const cerrarSesion = () => {
+    localStorage.removeItem("admin")
+    localStorage.removeItem("token")
+    setAdmin(null)
+  }
 
   // Verificar si hay sesión activa
   useEffect(() => {
@@ -56,15 +76,53 @@ function App() {
     // Solo conectar si hay admin
     if (!admin) return
 
+    // Aplica un evento del stream a la lista (también cada uno de un frame agrupado)
+    const aplicarEvento = (evento: any) => {
+      // 👉 Nuevo reporte en tiempo real
+      if (evento.type === "nuevoReporte") {
+        setReportes((prev) => [...prev.filter((r) => r.uuid !== evento.data.uuid), evento.data])
+      }
+
+      // 👉 newIncident también llega en algunos flujos
+      if (evento.type === "newIncident") {
+        setReportes((prev) => [...prev, evento.incident])
+      }
+
+      // 👉 Cambio de estado u otros campos: se reemplaza si no es más viejo que el que hay
+      if (evento.type === "reporteActualizado") {
+        setReportes((prev) =>
+          prev.map((r) =>
+            r.uuid === evento.data.uuid && (r.version ?? 0) <= (evento.data.version ?? 0) ? evento.data : r
+          )
+        )
+      }
+
+      // 👉 Reporte eliminado (por otro admin o en lote)
+      if (evento.type === "reporteEliminado") {
+        setReportes((prev) => prev.filter((r) => r.uuid !== evento.uuid))
+      }
+
+      // 👉 Llegó un duplicado: solo cambia el contador
+      if (evento.type === "reporteDuplicado") {
+        setReportes((prev) =>
+          prev.map((r) => (r.uuid === evento.uuid ? { ...r, duplicados: evento.duplicados, version: evento.version } : r))
+        )
+      }
+    }
+
     const connectWS = () => {
       console.log("Conectando WebSocket ADMIN...")
 
-      ws.current = new WebSocket(WS_URL)
+      // El navegador no manda headers al abrir el WebSocket: el token va en la URL y
+      // $connect toma de él el tenant y el rol de la conexión
+      const token = localStorage.getItem("token") ?? ""
+      ws.current = new WebSocket(`${WS_URL}?token=${encodeURIComponent(token)}`)
 
       ws.current.onopen = () => {
         console.log("WS Conectado ✔️")
 
-        // 👉 Pedir lista completa de incidentes
+        // 👉 Pedir lista completa de incidentes (llega por partes)
+        incidentsBuffer.current = []
         ws.current?.send(JSON.stringify({ action: "getIncidents" }))
 
         // 👉 Registrar admin
@@ -80,20 +138,22 @@ function App() {
         const msg = JSON.parse(event.data)
         console.log("📩 WS message:", msg)
 
-        // 👉 Lista completa de incidentes
-        if (msg.type === "incidentsList") {
-          console.log("📋 Lista de incidentes recibida")
-          setReportes(msg.incidents ?? [])
+        // 👉 Lista completa de incidentes, en chunks numerados
+        if (msg.type === "incidentsChunk") {
+          incidentsBuffer.current.push(...(msg.incidents ?? []))
         }
 
-        // 👉 Nuevo reporte en tiempo real
-        if (msg.type === "nuevoReporte") {
-          setReportes((prev) => [...prev, msg.data])
+        if (msg.type === "incidentsDone") {
+          console.log(`📋 Lista de incidentes recibida: ${msg.total} en ${msg.chunks} chunks`)
+          setReportes(incidentsBuffer.current)
+          incidentsBuffer.current = []
         }
 
-        // 👉 newIncident también llega en algunos flujos
-        if (msg.type === "newIncident") {
-          setReportes((prev) => [...prev, msg.incident])
+        // 👉 Eventos en tiempo real, sueltos o agrupados por ventana del stream
+        if (msg.type === "nuevosReportes" || msg.type === "cambiosReportes") {
+          (msg.eventos ?? []).forEach(aplicarEvento)
+        } else {
+          aplicarEvento(msg)
         }
 
         // 👉 Error WS
@@ -135,19 +195,34 @@ function App() {
       setError("")
 
       try {
-        const url = `${API_BASE_URL}/reporte/listar?tenant_id=${TENANT_ID}`
-        const resp = await fetch(url)
-
-        if (!resp.ok) {
-          throw new Error(`HTTP Error ${resp.status}`)
-        }
-
-        let data = await resp.json()
-        if (typeof data.body === "string") {
-          data = JSON.parse(data.body)
-        }
-
-        setReportes(data.items || [])
+        // La lista llega paginada: se sigue `cursor` hasta que venga null y se va
+        // mostrando lo que ya llegó
+        const todos: Reporte[] = []
+        let cursor: string | null = null
+
+        do {
+          const params = new URLSearchParams({ tenant_id: TENANT_ID, limit: "200" })
+          if (cursor) params.set("cursor", cursor)
+          const url = `${API_BASE_URL}/reporte/listar?${params}`
+          // Cada página trae ETag + Cache-Control: no-cache: el navegador la revalida con
+          // If-None-Match y un 304 reutiliza la copia que ya tiene
+          const resp = await fetch(url, { headers: authHeaders() })
+
+          if (resp.status === 401) {
+            cerrarSesion()
+            return
+          }
+
+          if (!resp.ok) {
+            throw new Error(`HTTP Error ${resp.status}`)
+          }
+
+          const data = await resp.json()
+
+          todos.push(...(data.items || []))
+          setReportes([...todos])
+          cursor = data.cursor ?? null
+        } while (cursor)
       } catch (err) {
         setError(err instanceof Error ? err.message : "Error al cargar reportes")
       } finally {
@@ -163,11 +238,7 @@ function App() {
     setAdmin(adminData)
   }
 
-  const handleLogout = () => {
-    localStorage.removeItem("admin")
-    localStorage.removeItem("token")
-    setAdmin(null)
-  }
+  const handleLogout = cerrarSesion
 
   console.log("🔍 Estado actual de admin:", admin)
 
@@ -201,14 +272,16 @@ function App() {
       const url = `${API_BASE_URL}/reporte/${uuid}?tenant_id=${TENANT_ID}`
       console.log("🗑️ Eliminando reporte:", uuid)
       
-      const resp = await fetch(url, { method: "DELETE" })
+      const resp = await fetch(url, { method: "DELETE", headers: authHeaders() })
       console.log("📡 Status:", resp.status)
 
-      let data = await resp.json()
-      if (typeof data.body === "string") {
-        data = JSON.parse(data.body)
+      if (resp.status === 401) {
+        cerrarSesion()
+        return
       }
 
+      const data = await resp.json()
+
       // ✅ PRIMERO verificar si el backend respondió bien
       if (!resp.ok) {
         throw new Error(data.error || data.mensaje)
@@ -225,7 +298,42 @@ function App() {
   }
 
   // ========================================================
-  // UI (NO MODIFIQUÉ NADA)
+  // 🔵 Registrar otro administrador (requiere sesión de admin)
+  // ========================================================
+  const handleRegistrarAdmin = async () => {
+    setRegistroMsg("")
+
+    try {
+      if (!nuevoAdmin.email.endsWith("@utec.edu.pe")) {
+        throw new Error("Solo se aceptan emails @utec.edu.pe")
+      }
+
+      const resp = await fetch(`${API_BASE_URL}/auth/registro/admin`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json", ...authHeaders() },
+        body: JSON.stringify(nuevoAdmin)
+      })
+
+      if (resp.status === 401) {
+        cerrarSesion()
+        return
+      }
+
+      const data = await resp.json()
+
+      if (!resp.ok) {
+        throw new Error(data.error || "Error al registrar administrador")
+      }
+
+      setNuevoAdmin({ nombre: "", email: "", password: "" })
+      setRegistroMsg(`✅ ${data.mensaje}`)
+    } catch (err) {
+      setRegistroMsg(`❌ ${err instanceof Error ? err.message : "Error desconocido"}`)
+    }
+  }
+
+  // ========================================================
+  // UI
   // ========================================================
   return (
     <div className="min-h-screen bg-white p-8">
@@ -299,6 +407,50 @@ function App() {
           )}
         </div>
 
+        {/* REGISTRO DE ADMINISTRADORES */}
+        <div className="bg-gray-50 border border-gray-300 rounded-lg p-6 mb-8">
+          <button
+            onClick={() => setMostrarRegistro(!mostrarRegistro)}
+            className="text-black font-semibold"
+          >
+            {mostrarRegistro ? "▾" : "▸"} Registrar administrador
+          </button>
+
+          {mostrarRegistro && (
+            <div className="flex gap-3 flex-wrap mt-4">
+              <input
+                type="text"
+                placeholder="Nombre completo"
+                value={nuevoAdmin.nombre}
+                onChange={(e) => setNuevoAdmin({ ...nuevoAdmin, nombre: e.target.value })}
+                className="flex-1 px-4 py-3 rounded-lg bg-white text-black placeholder-gray-500 border border-gray-300 focus:outline-none focus:ring-2 focus:ring-blue-500"
+              />
+              <input
+                type="email"
+                placeholder="Correo (@utec.edu.pe)"
+                value={nuevoAdmin.email}
+                onChange={(e) => setNuevoAdmin({ ...nuevoAdmin, email: e.target.value })}
+                className="flex-1 px-4 py-3 rounded-lg bg-white text-black placeholder-gray-500 border border-gray-300 focus:outline-none focus:ring-2 focus:ring-blue-500"
+              />
+              <input
+                type="password"
+                placeholder="Contraseña"
+                value={nuevoAdmin.password}
+                onChange={(e) => setNuevoAdmin({ ...nuevoAdmin, password: e.target.value })}
+                className="flex-1 px-4 py-3 rounded-lg bg-white text-black placeholder-gray-500 border border-gray-300 focus:outline-none focus:ring-2 focus:ring-blue-500"
+              />
+              <button
+                onClick={handleRegistrarAdmin}
+                className="px-6 py-3 bg-blue-600 hover:bg-blue-700 text-white font-semibold rounded-lg transition-colors"
+              >
+                Registrar
+              </button>
+            </div>
+          )}
+
+          {registroMsg && <p className="text-gray-700 text-sm mt-3">{registroMsg}</p>}
+        </div>
+
         {/* LISTA */}
         <div>
           {loading && reportes.length === 0 ? (
@@ -349,6 +501,11 @@ function App() {
                     <span className="px-3 py-1 bg-blue-100 text-blue-800 text-xs rounded-full">
                       {r.estado || "pendiente"}
                     </span>
+                    {!!r.duplicados && (
+                      <span className="px-3 py-1 bg-yellow-100 text-yellow-800 text-xs rounded-full">
+                        +{r.duplicados} duplicados
+                      </span>
+                    )}
                   </div>
 
                   <button
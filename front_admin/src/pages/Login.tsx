@@ -6,10 +6,8 @@ interface LoginProps {
 }
 
 export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
-  const [mode, setMode] = useState<"login" | "registro">("login")
   const [email, setEmail] = useState("")
   const [password, setPassword] = useState("")
-  const [nombre, setNombre] = useState("")
   const [error, setError] = useState("")
   const [loading, setLoading] = useState(false)
 
@@ -24,14 +22,8 @@ export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
         body: JSON.stringify({ email, password })
       })
 
-      let data = await resp.json()
-      console.log("🔍 Respuesta original:", data)
-
-      // Si el body viene como string, parsearlo
-      if (typeof data.body === "string") {
-        data = JSON.parse(data.body)
-        console.log("🔍 Después de parsear body:", data)
-      }
+      const data = await resp.json()
+      console.log("🔍 Respuesta:", data)
 
       if (!resp.ok) {
         throw new Error(data.error || "Error al iniciar sesión")
@@ -54,45 +46,6 @@ export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
     }
   }
 
-  const handleRegistro = async () => {
-    setError("")
-    setLoading(true)
-
-    try {
-      if (!email.endsWith("@utec.edu.pe")) {
-        throw new Error("Solo se aceptan emails @utec.edu.pe")
-      }
-
-      const resp = await fetch(`${apiUrl}/auth/registro/admin`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ email, password, nombre })
-      })
-
-      let data = await resp.json()
-
-      // Si el body viene como string, parsearlo
-      if (typeof data.body === "string") {
-        data = JSON.parse(data.body)
-      }
-
-      if (!resp.ok) {
-        throw new Error(data.error || "Error al registrarse")
-      }
-
-      // Auto-login después de registro
-      setEmail("")
-      setPassword("")
-      setNombre("")
-      setMode("login")
-      setError("")
-    } catch (err) {
-      setError(err instanceof Error ? err.message : "Error desconocido")
-    } finally {
-      setLoading(false)
-    }
-  }
-
   return (
     <div className="min-h-screen bg-white flex items-center justify-center p-8">
       <div className="w-full max-w-md bg-white border border-gray-300 rounded-lg p-8">
@@ -100,7 +53,7 @@ export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
           Panel Admin UTEC
         </h1>
         <p className="text-gray-600 text-center mb-8">
-          {mode === "login" ? "Inicia sesión como administrador" : "Regístrate como administrador"}
+          Inicia sesión como administrador
         </p>
 
         {error && (
@@ -110,16 +63,6 @@ export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
         )}
 
         <div className="space-y-4">
-          {mode === "registro" && (
-            <input
-              type="text"
-              placeholder="Nombre completo"
-              value={nombre}
-              onChange={(e) => setNombre(e.target.value)}
-              className="w-full px-4 py-3 border border-gray-300 rounded-lg text-black placeholder-gray-500 focus:outline-none focus:ring-2 focus:ring-blue-500"
-            />
-          )}
-
           <input
             type="email"
             placeholder="Correo (@utec.edu.pe)"
@@ -137,25 +80,17 @@ export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
           />
 
           <button
-            onClick={mode === "login" ? handleLogin : handleRegistro}
+            onClick={handleLogin}
             disabled={loading}
             className="w-full px-6 py-3 bg-blue-600 hover:bg-blue-700 text-white font-semibold rounded-lg transition-colors disabled:opacity-50"
           >
-            {loading ? "Cargando..." : mode === "login" ? "Iniciar Sesión" : "Registrarse"}
+            {loading ? "Cargando..." : "Iniciar Sesión"}
           </button>
         </div>
 
-        <p className="text-center text-gray-600 mt-6">
-          {mode === "login" ? "¿No tienes cuenta?" : "¿Ya tienes cuenta?"}{" "}
-          <button
-            onClick={() => {
-              setMode(mode === "login" ? "registro" : "login")
-              setError("")
-            }}
-            className="text-blue-600 hover:text-blue-700 font-semibold"
-          >
-            {mode === "login" ? "Regístrate" : "Inicia sesión"}
-          </button>
+        {/* Los administradores nuevos los registra otro admin desde el panel */}
+        <p className="text-center text-gray-600 mt-6 text-sm">
+          ¿No tienes cuenta? Pide a un administrador que te registre.
         </p>
       </div>
     </div>
@@ -62,7 +62,9 @@ function App() {
 
     const connectWebSocket = () => {
       console.log("Conectando a WebSocket:", WS_URL)
-      const ws = new WebSocket(WS_URL)
+      // El token de sesión va en la URL: $connect rechaza conexiones sin él
+      const token = localStorage.getItem("token") ?? ""
+      const ws = new WebSocket(`${WS_URL}?token=${encodeURIComponent(token)}`)
 
       ws.onopen = () => {
         console.log("WebSocket conectado")
@@ -78,6 +80,20 @@ function App() {
         }, 500)
       }
 
+      // Eventos del stream, sueltos o como parte de un frame agrupado
+      const manejarEvento = (data: any) => {
+        if (data.type === "nuevoReporte") {
+          console.log("Nuevo reporte recibido:", data.data)
+          // Aquí podrías agregar el nuevo reporte a la lista
+        } else if (data.type === "reporteActualizado") {
+          console.log(`Reporte ${data.data.uuid} actualizado:`, data.cambios)
+        } else if (data.type === "reporteEliminado") {
+          console.log("Reporte eliminado:", data.uuid)
+        } else if (data.type === "reporteDuplicado") {
+          console.log(`Reporte ${data.uuid} con ${data.duplicados} duplicados`)
+        }
+      }
+
       ws.onmessage = (event) => {
         console.log("Mensaje recibido:", event.data)
         try {
@@ -85,14 +101,18 @@ function App() {
           console.log("Datos parseados:", data)
           
           // Manejar diferentes tipos de mensajes
-          if (data.type === "incidentsList") {
-            console.log("Incidentes recibidos:", data.incidents)
-            // Aquí podrías actualizar el estado con los incidentes del servidor
-          } else if (data.type === "nuevoReporte") {
-            console.log("Nuevo reporte recibido:", data.data)
-            // Aquí podrías agregar el nuevo reporte a la lista
+          if (data.type === "nuevosReportes" || data.type === "cambiosReportes") {
+            console.log(`Eventos agrupados recibidos: ${data.total}`)
+            ;(data.eventos ?? []).forEach(manejarEvento)
+          } else if (data.type === "incidentsChunk") {
+            console.log(`Incidentes recibidos (chunk ${data.chunk}):`, data.incidents)
+            // Aquí podrías acumular los incidentes del servidor hasta incidentsDone
+          } else if (data.type === "incidentsDone") {
+            console.log(`Incidentes completos: ${data.total} en ${data.chunks} chunks`)
           } else if (data.type === "error") {
             console.error("Error del servidor:", data.message)
+          } else {
+            manejarEvento(data)
           }
         } catch (err) {
           console.error("Error al parsear mensaje:", err)
@@ -143,27 +163,28 @@ function App() {
 
   console.log("✅ Usuario existe, mostrando app")
 
-  // Función para enviar mensajes por WebSocket
-  const sendWebSocketMessage = (message: any) => {
-    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
-      wsRef.current.send(JSON.stringify(message))
-      console.log("Mensaje enviado por WebSocket:", message)
-    } else {
-      console.warn("WebSocket no está conectado")
-    }
-  }
-
   // ==============================
   // API CALL
   // ==============================
   async function crearIncidente(data: BackendPayload) {
     try {
+      // El endpoint exige el token de sesión del login
+      const token = localStorage.getItem("token")
       const resp = await fetch(API_URL, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          ...(token ? { Authorization: `Bearer ${token}` } : {})
+        },
         body: JSON.stringify(data)
       })
 
+      // Token vencido o inválido: volver al login
+      if (resp.status === 401) {
+        handleLogout()
+        throw new Error("La sesión expiró, vuelve a iniciar sesión")
+      }
+
       if (!resp.ok) {
         const text = await resp.text()
         console.error("API error:", resp.status, text)
@@ -204,12 +225,8 @@ function App() {
 
     // Intentar enviar al backend
     try {
+      // La notificación a los dashboards sale del backend cuando el reporte queda guardado
       await crearIncidente(payload)
-      // Enviar notificación por WebSocket también
-      sendWebSocketMessage({
-        action: "nuevoReporte",
-        data: payload
-      })
     } catch (err) {
       console.error("Failed to enviar reporte:", err)
       alert("No se pudo enviar el reporte al servidor.")
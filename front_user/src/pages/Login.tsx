@@ -24,14 +24,8 @@ export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
         body: JSON.stringify({ email, password })
       })
 
-      let data = await resp.json()
-      console.log("🔍 Respuesta original:", data)
-
-      // Si el body viene como string, parsearlo
-      if (typeof data.body === "string") {
-        data = JSON.parse(data.body)
-        console.log("🔍 Después de parsear body:", data)
-      }
+      const data = await resp.json()
+      console.log("🔍 Respuesta:", data)
 
       if (!resp.ok) {
         throw new Error(data.error || "Error al iniciar sesión")
@@ -69,12 +63,7 @@ export default function Login({ onLoginSuccess, apiUrl }: LoginProps) {
         body: JSON.stringify({ email, password, nombre })
       })
 
-      let data = await resp.json()
-
-      // Si el body viene como string, parsearlo
-      if (typeof data.body === "string") {
-        data = JSON.parse(data.body)
-      }
+      const data = await resp.json()
 
       if (!resp.ok) {
         throw new Error(data.error || "Error al registrarse")